@@ -0,0 +1,531 @@
+"""
+Application Factory para o Apollo Project Orchestrator - CORRIGIDO
+"""
+
+import os
+import sys
+import logging
+from pathlib import Path
+import click
+from flask import Flask, jsonify
+from werkzeug.exceptions import HTTPException
+
+# Adicionar o diretório pai ao Python path para importações absolutas
+if __name__ == '__main__':
+    current_dir = Path(__file__).parent
+    backend_dir = current_dir.parent
+    sys.path.insert(0, str(backend_dir))
+
+try:
+    # Tentar importação relativa (quando usado como módulo)
+    from .config import get_config
+    from .extensions import db, migrate, jwt, cors, cache, limiter, mail
+    from .services.ai_jobs import ai_jobs
+    from .services.ai_stream import stream_slots
+    from .services.llm_client import llm_client
+    from .services.audit import audit_writer
+    from .services.login_tracking import login_attempts, last_login_buffer
+    from .services.password_hashing import password_hasher
+    from .services.sessions import session_activity
+    from .services.token_revocation import token_revocation
+except ImportError:
+    # Fallback para importação absoluta (quando executado diretamente)
+    from config import get_config
+    from extensions import db, migrate, jwt, cors, cache, limiter, mail
+    from services.ai_jobs import ai_jobs
+    from services.ai_stream import stream_slots
+    from services.llm_client import llm_client
+    from services.audit import audit_writer
+    from services.login_tracking import login_attempts, last_login_buffer
+    from services.password_hashing import password_hasher
+    from services.sessions import session_activity
+    from services.token_revocation import token_revocation
+
+
+def create_app(config_name=None):
+    """
+    Factory para criar a aplicação Flask
+    
+    Args:
+        config_name (str): Nome da configuração ('development', 'testing', 'production')
+    
+    Returns:
+        Flask: Instância da aplicação configurada
+    """
+    
+    app = Flask(__name__)
+    # CORS correto: apenas esta linha!
+    from flask_cors import CORS
+    CORS(app, origins=['http://localhost:5173', 'http://localhost:3000'])
+
+    # =============================================================================
+    # CONFIGURAÇÃO
+    # =============================================================================
+    
+    if config_name is None:
+        config_name = os.environ.get('FLASK_ENV', 'development')
+    
+    config_class = get_config()
+    app.config.from_object(config_class)
+    
+    # Inicializar configurações específicas
+    config_class.init_app(app)
+    
+    # =============================================================================
+    # INICIALIZAR EXTENSÕES
+    # =============================================================================
+    
+    db.init_app(app)
+    migrate.init_app(app, db)
+    jwt.init_app(app)
+    # REMOVA ou COMENTE esta linha para evitar conflito:
+    # cors.init_app(app)
+    cache.init_app(app)
+    limiter.init_app(app)
+    mail.init_app(app)
+    audit_writer.init_app(app)
+    password_hasher.init_app(app)
+    login_attempts.init_app(app)
+    last_login_buffer.init_app(app)
+    session_activity.init_app(app)
+    token_revocation.init_app(app)
+    llm_client.init_app(app)
+    ai_jobs.init_app(app)
+    stream_slots.init_app(app)
+    
+    # =============================================================================
+    # REGISTRAR BLUEPRINTS
+    # =============================================================================
+    
+    register_blueprints(app)
+    
+    # =============================================================================
+    # HANDLERS DE ERRO
+    # =============================================================================
+    
+    register_error_handlers(app)
+    
+    # =============================================================================
+    # COMANDOS CLI
+    # =============================================================================
+    
+    register_commands(app)
+    
+    # =============================================================================
+    # HOOKS DE REQUEST
+    # =============================================================================
+    
+    register_hooks(app)
+    
+    return app
+
+
+def register_blueprints(app):
+    """Registrar todos os blueprints da aplicação"""
+    
+    try:
+        # Tentar importação relativa primeiro
+        from .routes.auth import auth_bp
+        from .routes.projects import projects_bp
+        from .routes.users import users_bp
+        from .routes.ai import ai_bp
+        from .routes.admin import admin_bp
+    except ImportError:
+        # Fallback para importação absoluta
+        from routes.auth import auth_bp
+        from routes.projects import projects_bp
+        from routes.users import users_bp
+        from routes.ai import ai_bp
+        from routes.admin import admin_bp
+    
+    # Registrar blueprints com prefixos
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(projects_bp, url_prefix='/api/projects')
+    app.register_blueprint(users_bp, url_prefix='/api/users')
+    app.register_blueprint(ai_bp, url_prefix='/api/ai')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    
+    # Rota raiz para health check
+    @app.route('/api/health')
+    def api_health_check():
+        return jsonify({
+            'status': 'ok',
+            'message': 'API está funcionando!',
+            'version': app.config.get('APP_VERSION', '1.0.0'),
+            'environment': os.environ.get('FLASK_ENV', 'development')
+        })
+    
+    # Rota para informações da API
+    @app.route('/api')
+    def api_info():
+        return jsonify({
+            'name': app.config['APP_NAME'],
+            'version': app.config['APP_VERSION'],
+            'api_version': app.config['API_VERSION'],
+            'endpoints': {
+                'auth': '/api/auth',
+                'projects': '/api/projects',
+                'users': '/api/users',
+                'ai': '/api/ai'
+            },
+            'docs': '/api/docs'
+        })
+
+
+def register_error_handlers(app):
+    """Registrar handlers para tratamento de erros"""
+    
+    @app.errorhandler(HTTPException)
+    def handle_http_exception(e):
+        """Handler para exceções HTTP"""
+        return jsonify({
+            'error': e.name,
+            'message': e.description,
+            'status_code': e.code
+        }), e.code
+    
+    @app.errorhandler(400)
+    def bad_request(error):
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'Requisição malformada'
+        }), 400
+    
+    @app.errorhandler(401)
+    def unauthorized(error):
+        return jsonify({
+            'error': 'Unauthorized',
+            'message': 'Credenciais inválidas ou token expirado'
+        }), 401
+    
+    @app.errorhandler(403)
+    def forbidden(error):
+        return jsonify({
+            'error': 'Forbidden',
+            'message': 'Acesso negado'
+        }), 403
+    
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({
+            'error': 'Not Found',
+            'message': 'Recurso não encontrado'
+        }), 404
+    
+    @app.errorhandler(429)
+    def rate_limit_exceeded(error):
+        return jsonify({
+            'error': 'Too Many Requests',
+            'message': 'Limite de requisições excedido. Tente novamente mais tarde.'
+        }), 429
+    
+    @app.errorhandler(500)
+    def internal_error(error):
+        app.logger.error(f'Erro interno do servidor: {error}')
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Erro interno do servidor'
+        }), 500
+
+
+def register_commands(app):
+    """Registrar comandos CLI customizados"""
+    
+    @app.cli.command()
+    def init_db():
+        """Inicializar o banco de dados"""
+        db.create_all()
+        print("Banco de dados inicializado!")
+    
+    @app.cli.command()
+    def create_admin():
+        """Criar usuário administrador"""
+        try:
+            from .models.database import User
+        except ImportError:
+            from models.database import User
+        
+        email = input("Email do administrador: ")
+        name = input("Nome do administrador: ")
+        password = input("Senha do administrador: ")
+        
+        if User.query.filter_by(email=email).first():
+            print("Usuário já existe!")
+            return
+        
+        admin = User(
+            name=name,
+            email=email,
+            password=password,
+            user_level='admin',
+            email_verified=True,
+            is_active=True
+        )
+        
+        db.session.add(admin)
+        db.session.commit()
+        print(f"Administrador {name} criado com sucesso!")
+    
+    @app.cli.command()
+    def init_search_index():
+        """Instalar/reconstruir o índice de busca textual de projetos"""
+        try:
+            from .services.search import install_search_index
+        except ImportError:
+            from services.search import install_search_index
+        
+        if install_search_index():
+            db.session.commit()
+            print("Índice de busca instalado!")
+        else:
+            print("⚠️  Banco sem suporte a busca textual (use SQLite ou PostgreSQL).")
+    
+    @app.cli.command()
+    def repair_step_counters():
+        """Recalcular contadores de etapas e conclusão de todos os projetos"""
+        try:
+            from .models.database import Project
+        except ImportError:
+            from models.database import Project
+        
+        updated = Project.rebuild_step_counters()
+        db.session.commit()
+        print(f"Contadores de etapas recalculados para {updated} projetos!")
+    
+    @app.cli.command()
+    @click.option('--days', default=None, type=int, help='Retenção em dias (padrão: SYNC_TOMBSTONE_RETENTION_DAYS)')
+    def purge_sync_tombstones(days):
+        """Remover tombstones de sincronização antigos"""
+        try:
+            from .services.sync import purge_sync_tombstones as purge
+        except ImportError:
+            from services.sync import purge_sync_tombstones as purge
+        
+        removed = purge(days)
+        db.session.commit()
+        print(f"{removed} tombstones removidos!")
+    
+    @app.cli.command()
+    def audit_maintenance():
+        """Criar partições do log de auditoria e arquivar meses fora da retenção"""
+        try:
+            from .services.audit_archive import maintain_audit_log
+        except ImportError:
+            from services.audit_archive import maintain_audit_log
+        
+        archived = maintain_audit_log()
+        for month, count in archived:
+            print(f"📦 {month:%Y-%m}: {count} registros arquivados")
+        print("Manutenção do log de auditoria concluída!")
+    
+    @app.cli.command()
+    @click.argument('month', required=False)
+    @click.option('--user-id', default=None, type=int, help='Filtrar por usuário')
+    @click.option('--action', default=None, help='Filtrar por ação')
+    @click.option('--resource-type', default=None, help='Filtrar por tipo de recurso')
+    @click.option('--resource-id', default=None, type=int, help='Filtrar por recurso')
+    def audit_archive_query(month, user_id, action, resource_type, resource_id):
+        """Consultar um mês arquivado (YYYY-MM) em NDJSON; sem mês, lista os disponíveis"""
+        try:
+            from .services.audit_archive import iter_archived_logs, list_archived_months, parse_month
+        except ImportError:
+            from services.audit_archive import iter_archived_logs, list_archived_months, parse_month
+        import json
+        
+        if not month:
+            for archived_month in list_archived_months():
+                print(f"{archived_month:%Y-%m}")
+            return
+        
+        try:
+            records = iter_archived_logs(
+                parse_month(month),
+                user_id=user_id,
+                action=action,
+                resource_type=resource_type,
+                resource_id=resource_id
+            )
+            for record in records:
+                click.echo(json.dumps(record, ensure_ascii=False))
+        except ValueError as e:
+            print(f"❌ {e}")
+        except FileNotFoundError:
+            print(f"❌ Mês {month} não está arquivado")
+    
+    @app.cli.command()
+    def rebuild_auth_stats():
+        """Recalcular rollups de autenticação e contadores de usuários"""
+        try:
+            from .services.auth_stats import rebuild_auth_stats as rebuild
+        except ImportError:
+            from services.auth_stats import rebuild_auth_stats as rebuild
+        
+        rebuild()
+        db.session.commit()
+        print("Estatísticas de autenticação recalculadas!")
+    
+    @app.cli.command()
+    def purge_user_sessions():
+        """Remover sessões revogadas ou expiradas"""
+        try:
+            from .services.sessions import purge_sessions
+        except ImportError:
+            from services.sessions import purge_sessions
+        
+        removed = purge_sessions()
+        db.session.commit()
+        print(f"{removed} sessões removidas!")
+    
+    @app.cli.command()
+    def purge_revoked_tokens():
+        """Remover tokens revogados já expirados"""
+        try:
+            from .services.token_revocation import token_revocation as revocation
+        except ImportError:
+            from services.token_revocation import token_revocation as revocation
+        
+        removed = revocation.purge_expired()
+        print(f"{removed} tokens revogados removidos!")
+    
+    @app.cli.command()
+    def purge_ai_cache():
+        """Remover análises de IA vencidas ou além de AI_CACHE_MAX_ENTRIES"""
+        try:
+            from .services.ai_cache import evict_analysis_cache
+        except ImportError:
+            from services.ai_cache import evict_analysis_cache
+        
+        removed = evict_analysis_cache()
+        print(f"{removed} análises removidas do cache!")
+    
+    @app.cli.command()
+    @click.option('--once', is_flag=True, help='Executar os jobs na fila e sair')
+    @click.option('--poll-interval', default=2.0, type=float, help='Segundos entre consultas à fila')
+    def ai_worker(once, poll_interval):
+        """Executar as análises de IA enfileiradas (AI_JOB_EXECUTOR = 'external')"""
+        import time
+        
+        print("Worker de análises iniciado")
+        while True:
+            executed = ai_jobs.run_pending()
+            if executed:
+                print(f"{executed} análises executadas")
+            if once:
+                break
+            time.sleep(poll_interval)
+
+    @app.cli.command()
+    @click.option('--logins', default=50, type=int, help='Logins (verificações de senha) simulados')
+    @click.option('--concurrency', default=8, type=int, help='Requisições simultâneas')
+    @click.option('--method', default=None, help='Método de hash (padrão: PASSWORD_HASH_METHOD)')
+    def benchmark_password_hashing(logins, concurrency, method):
+        """Medir a vazão de logins por worker (verificação de senha pelo pool)"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        if method:
+            password_hasher.method = method
+        password_hash = password_hasher.hash('Benchmark1!')
+
+        def timed_verify(_):
+            started = time.perf_counter()
+            password_hasher.verify(password_hash, 'Benchmark1!')
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as requests:
+            latencies = sorted(requests.map(timed_verify, range(logins)))
+        elapsed = time.perf_counter() - started
+
+        print(f"Método: {password_hasher.method} | pool: {password_hasher.workers} | concorrência: {concurrency}")
+        print(f"{logins} logins em {elapsed:.2f}s -> {logins / elapsed:.1f} logins/s por worker")
+        print(f"Latência p50: {latencies[len(latencies) // 2] * 1000:.0f} ms | "
+              f"p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms")
+
+    @app.cli.command()
+    @click.argument('file', type=click.File('r', encoding='utf-8'))
+    @click.option('--owner-email', required=True, help='Email do usuário dono dos projetos')
+    @click.option('--chunk-size', default=None, type=int, help='Projetos por transação')
+    def import_projects(file, owner_email, chunk_size):
+        """Importar projetos em lote de um arquivo JSON (lista) ou NDJSON"""
+        try:
+            from .models.database import User
+            from .services.project_import import bulk_create_projects
+        except ImportError:
+            from models.database import User
+            from services.project_import import bulk_create_projects
+        import json
+        
+        owner = User.query.filter_by(email=owner_email.lower()).first()
+        if not owner:
+            print("Usuário dono não encontrado!")
+            return
+        
+        content = file.read().strip()
+        if content.startswith('['):
+            items = json.loads(content)
+        else:
+            items = [json.loads(line) for line in content.splitlines() if line.strip()]
+        
+        result = bulk_create_projects(
+            items,
+            owner_id=owner.id,
+            chunk_size=chunk_size or app.config.get('BULK_IMPORT_CHUNK_SIZE', 200)
+        )
+        
+        for error in result['errors']:
+            print(f"  item {error['index']}: {error['error']}")
+        print(f"{len(result['created'])} projetos importados, {len(result['errors'])} com erro.")
+    
+    @app.cli.command()
+    def seed_data():
+        """Popular banco com dados de exemplo"""
+        try:
+            try:
+                from .utils.seed import seed_database
+            except ImportError:
+                from utils.seed import seed_database
+            seed_database()
+            print("Dados de exemplo criados!")
+        except ImportError:
+            print("⚠️  Módulo utils.seed não encontrado. Comando não disponível.")
+
+
+def register_hooks(app):
+    """Registrar hooks de request/response"""
+    
+    @app.before_request
+    def before_request():
+        """Executado antes de cada requisição"""
+        pass
+    
+    @app.after_request
+    def track_session_activity(response):
+        """Acumular o último acesso da sessão do token (gravado em lote)"""
+        session_activity.record_request()
+        return response
+    
+    @app.after_request
+    def add_cors_headers(response):
+        response.headers['Access-Control-Allow-Origin'] = 'http://localhost:5173'
+        response.headers['Access-Control-Allow-Credentials'] = 'true'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
+        response.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
+        return response
+    
+    @app.teardown_appcontext
+    def teardown_db(error):
+        """Limpar recursos após cada requisição"""
+        if error:
+            db.session.rollback()
+        db.session.remove()
+
+
+# Proteção para execução direta
+if __name__ == '__main__':
+    print("⚠️  AVISO: app.py não deve ser executado diretamente!")
+    print("📝 Use o main.py para iniciar o servidor:")
+    print("   python main.py")
+    print("   ou")
+    print("   python -m src.main")
+    sys.exit(1)
\ No newline at end of file
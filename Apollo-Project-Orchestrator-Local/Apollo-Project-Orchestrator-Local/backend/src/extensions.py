@@ -0,0 +1,138 @@
+"""
+Extensões do Flask - Inicializadas separadamente para evitar imports circulares
+"""
+
+from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
+from flask_jwt_extended import JWTManager
+from flask_cors import CORS
+from flask_caching import Cache
+from flask_caching.backends import SimpleCache
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from flask_mail import Mail
+
+# =============================================================================
+# INICIALIZAÇÃO DAS EXTENSÕES
+# =============================================================================
+
+# Banco de dados
+db = SQLAlchemy()
+
+# Migrações
+migrate = Migrate()
+
+# JWT para autenticação
+jwt = JWTManager()
+
+# CORS para requisições cross-origin
+cors = CORS(
+    supports_credentials=True,
+    resources={
+        r"/api/*": {
+            "origins": ["http://localhost:5173", "http://localhost:3000", "http://localhost:5174"],
+            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "allow_headers": ["Content-Type", "Authorization"],
+            "expose_headers": ["Authorization"],
+            "supports_credentials": True,
+            "max_age": 3600
+        }
+    }
+)
+
+# Cache para performance
+cache = Cache()
+
+
+def is_cache_shared():
+    """
+    Cache visível a todos os workers (Redis, Memcached...)
+
+    Com o 'simple' cada processo tem o seu: invalidar uma chave após o commit
+    só limpa o worker que fez a alteração.
+    """
+    return not isinstance(cache.cache, SimpleCache)
+
+# Rate limiting para segurança
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=["200 per day", "50 per hour"]
+)
+
+# Email
+mail = Mail()
+
+# =============================================================================
+# CONFIGURAÇÕES JWT
+# =============================================================================
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    """Verificar se o token, a sessão ou a geração de tokens do usuário foi revogado"""
+    from src.services.sessions import is_session_revoked, is_token_generation_revoked
+    from src.services.token_revocation import token_revocation
+    
+    if token_revocation.is_revoked(jwt_payload['jti']):
+        return True
+    
+    if is_token_generation_revoked(jwt_payload['sub'], jwt_payload.get('gen')):
+        return True
+    
+    session_id = jwt_payload.get('sid')
+    if session_id:
+        return is_session_revoked(session_id)
+    return False
+
+@jwt.user_lookup_loader
+def load_current_user(jwt_header, jwt_payload):
+    """Usuário autenticado (flask_jwt_extended.current_user), servido do cache"""
+    from src.services.current_user import get_current_user_snapshot
+    return get_current_user_snapshot(jwt_payload['sub'])
+
+@jwt.user_lookup_error_loader
+def user_lookup_error_callback(jwt_header, jwt_payload):
+    """Callback para token de usuário inexistente"""
+    return {
+        'message': 'Usuário não encontrado',
+        'error': 'user_not_found'
+    }, 401
+
+@jwt.expired_token_loader
+def expired_token_callback(jwt_header, jwt_payload):
+    """Callback para token expirado"""
+    return {
+        'message': 'Token expirado',
+        'error': 'token_expired'
+    }, 401
+
+@jwt.invalid_token_loader
+def invalid_token_callback(error):
+    """Callback para token inválido"""
+    return {
+        'message': 'Token inválido',
+        'error': 'invalid_token'
+    }, 401
+
+@jwt.unauthorized_loader
+def missing_token_callback(error):
+    """Callback para token ausente"""
+    return {
+        'message': 'Token de acesso necessário',
+        'error': 'authorization_required'
+    }, 401
+
+@jwt.needs_fresh_token_loader
+def token_not_fresh_callback(jwt_header, jwt_payload):
+    """Callback para token não-fresh"""
+    return {
+        'message': 'Token fresh necessário',
+        'error': 'fresh_token_required'
+    }, 401
+
+@jwt.revoked_token_loader
+def revoked_token_callback(jwt_header, jwt_payload):
+    """Callback para token revogado"""
+    return {
+        'message': 'Token foi revogado',
+        'error': 'token_revoked'
+    }, 401
\ No newline at end of file
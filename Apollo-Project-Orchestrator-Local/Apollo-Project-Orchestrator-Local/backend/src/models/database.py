@@ -0,0 +1,944 @@
+import os
+from xml.parsers.expat import errors
+print(f"DEBUG: Este arquivo database.py está em: {os.path.abspath(__file__)}")
+
+"""
+Modelos de dados melhorados para o Apollo Project Orchestrator
+"""
+
+from datetime import datetime, timedelta
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Index, and_, event
+from sqlalchemy.ext.hybrid import hybrid_property
+import re
+
+from src.extensions import db
+from src.services.password_hashing import password_hasher
+
+# =============================================================================
+# MIXINS
+# =============================================================================
+
+class TimestampMixin:
+    """Mixin para adicionar timestamps automáticos"""
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+class AuditMixin(TimestampMixin):
+    """Mixin para auditoria completa"""
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    updated_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+
+# =============================================================================
+# MODELOS PRINCIPAIS
+# =============================================================================
+
+class User(TimestampMixin, db.Model):
+    """Modelo de usuário com validações e funcionalidades aprimoradas"""
+    
+    __tablename__ = 'users'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(255), unique=True, nullable=False, index=True)
+    password_hash = db.Column(db.String(255), nullable=False)
+    company = db.Column(db.String(100))
+    role = db.Column(db.String(50))
+    user_level = db.Column(db.String(20), default='user', nullable=False)  # 'admin', 'user'
+    email_verified = db.Column(db.Boolean, default=False, nullable=False)
+    last_login = db.Column(db.DateTime)
+    is_active = db.Column(db.Boolean, default=True, nullable=False)
+    login_attempts = db.Column(db.Integer, default=0)
+    locked_until = db.Column(db.DateTime)
+    token_generation = db.Column(db.Integer, default=0, nullable=False)  # claim 'gen' dos tokens (services/sessions.py)
+    
+    # Índices para performance
+    __table_args__ = (
+        Index('idx_user_email_active', 'email', 'is_active'),
+        Index('idx_user_level', 'user_level'),
+        Index('idx_user_created_at', 'created_at'),
+    )
+    
+    # Relacionamentos
+    owned_projects = db.relationship('Project', foreign_keys='Project.owner_id', backref='owner', lazy='dynamic')
+    project_permissions_as_user = db.relationship(
+        'ProjectPermission', 
+        foreign_keys='ProjectPermission.user_id', 
+        backref='user_permission', 
+        lazy='dynamic'
+    )
+    project_permissions_as_granter = db.relationship(
+        'ProjectPermission', 
+        foreign_keys='ProjectPermission.granted_by', 
+        backref='granter_permission', 
+        lazy='dynamic'
+    )
+    audit_logs_as_user = db.relationship(
+        'AuditLog', 
+        foreign_keys='AuditLog.user_id', 
+        backref='user_audit_log', 
+        lazy='dynamic'
+    )
+    
+    @hybrid_property
+    def password(self):
+        """Propriedade write-only para senha"""
+        raise AttributeError('Password is not a readable attribute')
+    
+    @password.setter
+    def password(self, password):
+        """Setter para hash da senha (método de PASSWORD_HASH_METHOD)"""
+        self.password_hash = password_hasher.hash(password)
+    
+    def verify_password(self, password):
+        """Verificar senha"""
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Hash gravado com método/custo diferente do configurado"""
+        return password_hasher.needs_rehash(self.password_hash)
+    
+    def is_admin(self):
+        """Verificar se é administrador"""
+        return self.user_level == 'admin'
+    
+    def is_locked(self):
+        """Verificar se conta está bloqueada"""
+        if self.locked_until:
+            return datetime.utcnow() < self.locked_until
+        return False
+    
+    def lock_account(self, minutes=15):
+        """Bloquear conta temporariamente"""
+        self.locked_until = datetime.utcnow() + timedelta(minutes=minutes)
+        self.login_attempts = 0
+    
+    def unlock_account(self):
+        """Desbloquear conta"""
+        self.locked_until = None
+        self.login_attempts = 0
+    
+    def validate(self):
+        """Validações customizadas"""
+        errors = []
+        
+        # Validar nome
+        if not self.name or len(self.name.strip()) < 2:
+            errors.append("Nome deve ter pelo menos 2 caracteres")
+        
+        # Validar email
+        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+        if not self.email or not re.match(email_pattern, self.email):
+            errors.append("Email inválido")
+        
+        # Validar user_level
+        if self.user_level not in ['admin', 'user']:
+            errors.append("Nível de usuário deve ser 'admin' ou 'user'")
+        
+        if errors:
+            raise ValueError('; '.join(errors))
+    
+    def to_dict(self, include_sensitive=False):
+        """Converter para dicionário"""
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'company': self.company,
+            'role': self.role,
+            'user_level': self.user_level,
+            'email_verified': self.email_verified,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'last_login': self.last_login.isoformat() if self.last_login else None,
+            'is_active': self.is_active
+        }
+        
+        if include_sensitive:
+            data.update({
+                'login_attempts': self.login_attempts,
+                'locked_until': self.locked_until.isoformat() if self.locked_until else None
+            })
+        
+        return data
+
+
+class Project(AuditMixin, db.Model):
+    """Modelo de projeto com validações e funcionalidades aprimoradas"""
+    
+    __tablename__ = 'projects'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    client = db.Column(db.String(100), nullable=False)
+    responsible = db.Column(db.String(100), nullable=False)
+    objective = db.Column(db.Text, nullable=False)
+    description = db.Column(db.Text)
+    status = db.Column(db.String(50), default='active', nullable=False)
+    priority = db.Column(db.String(20), default='medium', nullable=False)
+    current_step = db.Column(db.Integer, default=0)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    github_repo_url = db.Column(db.String(500))
+    estimated_hours = db.Column(db.Integer)
+    actual_hours = db.Column(db.Integer, default=0)
+    completion_percentage = db.Column(db.Integer, default=0)
+    total_steps = db.Column(db.Integer, default=0, nullable=False)  # Contadores mantidos pelas transições das etapas
+    completed_steps = db.Column(db.Integer, default=0, nullable=False)
+    start_date = db.Column(db.DateTime)
+    end_date = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    
+    # Índices para performance
+    __table_args__ = (
+        Index('idx_project_owner_status', 'owner_id', 'status'),
+        Index('idx_project_created_at', 'created_at'),
+        Index('idx_project_updated_at', 'updated_at', 'id'),
+        Index('idx_project_priority', 'priority'),
+        Index('idx_project_completion', 'completion_percentage'),
+    )
+    
+    # Relacionamentos
+    permissions = db.relationship('ProjectPermission', backref='project', lazy='dynamic', cascade='all, delete-orphan')
+    steps = db.relationship('ProjectStep', backref='project', lazy='dynamic', cascade='all, delete-orphan', order_by='ProjectStep.step_number')
+    files = db.relationship('ProjectFile', backref='project', lazy='dynamic', cascade='all, delete-orphan')
+    
+    # Status válidos
+    VALID_STATUSES = ['active', 'paused', 'completed', 'cancelled', 'on_hold']
+    VALID_PRIORITIES = ['low', 'medium', 'high', 'urgent']
+    
+    @hybrid_property
+    def is_completed(self):
+        """Verificar se projeto está completo"""
+        return self.status == 'completed'
+    
+    @hybrid_property
+    def is_overdue(self):
+        """Verificar se projeto está atrasado"""
+        if self.end_date and not self.is_completed:
+            return datetime.utcnow() > self.end_date
+        return False
+    
+    @is_overdue.expression
+    def is_overdue(cls):
+        """Versão SQL de is_overdue (avaliada a cada uso)"""
+        return and_(
+            cls.end_date.isnot(None),
+            cls.end_date < datetime.utcnow(),
+            cls.status != 'completed'
+        )
+    
+    def calculate_completion_percentage(self):
+        """Calcular porcentagem de conclusão a partir dos contadores de etapas"""
+        if not self.total_steps:
+            return 0
+        
+        return int(((self.completed_steps or 0) / self.total_steps) * 100)
+    
+    def update_completion_percentage(self):
+        """Atualizar porcentagem de conclusão"""
+        self.completion_percentage = self.calculate_completion_percentage()
+        
+        # Se 100% completo, marcar como concluído
+        if self.completion_percentage == 100 and self.status != 'completed':
+            self.status = 'completed'
+            self.completed_at = datetime.utcnow()
+    
+    def apply_step_delta(self, total_delta=0, completed_delta=0):
+        """
+        Aplicar variação nos contadores de etapas e recalcular a conclusão
+        
+        Projeto já gravado: os contadores recebem expressões SQL
+        (``total_steps = total_steps + n``), somadas pelo próprio UPDATE, para
+        que transações concorrentes sobre o mesmo projeto não percam
+        incrementos; a conclusão é calculada a partir desses mesmos valores.
+        Projeto ainda não inserido: ninguém mais o enxerga, soma em memória.
+        
+        Returns:
+            True se o UPDATE foi feito em SQL (status ajustado depois do flush
+            por ``complete_if_all_steps_done``)
+        """
+        cls = type(self)
+        if db.inspect(self).has_identity:
+            total = cls.total_steps + total_delta
+            completed = cls.completed_steps + completed_delta
+            self.total_steps = total
+            self.completed_steps = completed
+            self.completion_percentage = db.case((total > 0, (completed * 100) // total), else_=0)
+            return True
+        
+        self.total_steps = (self.total_steps or 0) + total_delta
+        self.completed_steps = (self.completed_steps or 0) + completed_delta
+        self.update_completion_percentage()
+        return False
+    
+    @classmethod
+    def complete_if_all_steps_done(cls, connection, project_ids):
+        """
+        Marcar como concluídos os projetos com todas as etapas concluídas
+        
+        Lê os contadores já gravados na transação (não os da memória).
+        
+        Returns:
+            Número de projetos marcados
+        """
+        result = connection.execute(
+            db.update(cls)
+            .where(
+                cls.id.in_(project_ids),
+                cls.total_steps > 0,
+                cls.completed_steps >= cls.total_steps,
+                cls.status != 'completed'
+            )
+            .values(status='completed', completed_at=datetime.utcnow())
+        )
+        return result.rowcount
+    
+    def get_next_step(self):
+        """Próxima etapa pendente (sem consulta se todas estiverem concluídas)"""
+        if self.total_steps and self.completed_steps >= self.total_steps:
+            return None
+        return self.steps.filter_by(status='pending').order_by(ProjectStep.step_number).first()
+    
+    @classmethod
+    def rebuild_step_counters(cls, project_ids=None):
+        """
+        Recalcular total_steps/completed_steps/completion_percentage em lote
+        
+        Executa um único UPDATE com subconsultas correlacionadas, sem carregar
+        os projetos. Usado para reparar dados existentes.
+        
+        Args:
+            project_ids: Restringir a estes projetos (padrão: todos)
+            
+        Returns:
+            Número de projetos atualizados
+        """
+        total = db.select(db.func.count(ProjectStep.id)).where(
+            ProjectStep.project_id == cls.id
+        ).scalar_subquery()
+        completed = db.select(db.func.count(ProjectStep.id)).where(
+            ProjectStep.project_id == cls.id,
+            ProjectStep.status == 'completed'
+        ).scalar_subquery()
+        
+        stmt = db.update(cls).values(
+            total_steps=total,
+            completed_steps=completed,
+            completion_percentage=db.case((total > 0, (completed * 100) // total), else_=0)
+        )
+        if project_ids is not None:
+            stmt = stmt.where(cls.id.in_(project_ids))
+        
+        result = db.session.execute(stmt.execution_options(synchronize_session=False))
+        return result.rowcount
+    
+    def validate(self):
+        """Validações customizadas"""
+        errors = []
+        
+        # Validar nome
+        if not self.name or len(self.name.strip()) < 3:
+            errors.append("Nome do projeto deve ter pelo menos 3 caracteres")
+        
+        # Validar objetivo
+        if not self.objective or len(self.objective.strip()) < 10:
+            errors.append("Objetivo deve ter pelo menos 10 caracteres")
+        
+        # Validar status (LINHA CORRIGIDA)
+        # Verifica se o status existe, converte para minúsculas e remove espaços, depois verifica se está na lista
+        if not self.status or self.status.lower().strip() not in self.VALID_STATUSES:
+            errors.append(f"Status deve ser um dos: {', '.join(self.VALID_STATUSES)}")
+        
+        # Validar prioridade (LINHA CORRIGIDA)
+        # Verifica se a prioridade existe, converte para minúsculas e remove espaços, depois verifica se está na lista
+        if not self.priority or self.priority.lower().strip() not in self.VALID_PRIORITIES:
+            errors.append(f"Prioridade deve ser uma das: {', '.join(self.VALID_PRIORITIES)}")
+        
+        # Validar datas
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            errors.append("Data de início não pode ser posterior à data de fim")
+
+        if self.description and len(self.description.strip()) < 10:
+            errors.append("Descrição deve ter pelo menos 10 caracteres")
+        
+        if errors:
+            raise ValueError('; '.join(errors))
+    
+    def to_dict(self, include_steps=False, include_permissions=False):
+        """Converter para dicionário"""
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'client': self.client,
+            'responsible': self.responsible,
+            'objective': self.objective,
+            'description': self.description,
+            'status': self.status,
+            'priority': self.priority,
+            'current_step': self.current_step,
+            'owner_id': self.owner_id,
+            'github_repo_url': self.github_repo_url,
+            'estimated_hours': self.estimated_hours,
+            'actual_hours': self.actual_hours,
+            'completion_percentage': self.completion_percentage,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'is_overdue': self.is_overdue
+        }
+        
+        if include_steps:
+            steps = self.steps.order_by(ProjectStep.step_number).all()
+            data['steps'] = ProjectStep.serialize_many(steps)
+        
+        if include_permissions:
+            data['permissions'] = [perm.to_dict() for perm in self.permissions]
+        
+        return data
+
+
+class ProjectPermission(TimestampMixin, db.Model):
+    """Modelo de permissões de projeto"""
+    
+    __tablename__ = 'project_permissions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    permission_level = db.Column(db.String(20), nullable=False)  # 'owner', 'editor', 'viewer'
+    granted_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    
+    __table_args__ = (
+        db.UniqueConstraint('project_id', 'user_id'),
+        Index('idx_permission_project_user', 'project_id', 'user_id'),
+        Index('idx_permission_updated_at', 'updated_at', 'id'),
+    )
+    
+    # Níveis de permissão válidos
+    VALID_LEVELS = ['owner', 'editor', 'viewer']
+    
+    def validate(self):
+        """Validações customizadas"""
+        if self.permission_level not in self.VALID_LEVELS:
+            raise ValueError(f"Nível de permissão deve ser um dos: {', '.join(self.VALID_LEVELS)}")
+    
+    def to_dict(self):
+        """Converter para dicionário"""
+        return {
+            'id': self.id,
+            'project_id': self.project_id,
+            'user_id': self.user_id,
+            'permission_level': self.permission_level,
+            'granted_by': self.granted_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class ProjectStep(TimestampMixin, db.Model):
+    """Modelo de etapas do projeto com funcionalidades aprimoradas"""
+    
+    __tablename__ = 'project_steps'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    step_number = db.Column(db.Integer, nullable=False)
+    step_name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    status = db.Column(db.String(20), default='pending', nullable=False)
+    estimated_hours = db.Column(db.Integer)
+    actual_hours = db.Column(db.Integer, default=0)
+    assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'))
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    notes = db.Column(db.Text)
+    dependencies = db.Column(db.JSON)  # Lista de step_numbers que devem ser concluídos primeiro
+    
+    __table_args__ = (
+        db.UniqueConstraint('project_id', 'step_number'),
+        Index('idx_step_project_status', 'project_id', 'status'),
+        Index('idx_step_assigned', 'assigned_to'),
+        Index('idx_step_updated_at', 'updated_at', 'id'),
+    )
+    
+    # Status válidos
+    VALID_STATUSES = ['pending', 'in_progress', 'completed', 'skipped', 'blocked']
+    
+    # Etapas padrão criadas para todo projeto novo
+    DEFAULT_STEPS = [
+        {'step_number': 0, 'step_name': 'Cadastro do Projeto', 'description': 'Informações básicas do projeto'},
+        {'step_number': 1, 'step_name': 'Upload de Documentos', 'description': 'Anexar documentação do projeto'},
+        {'step_number': 2, 'step_name': 'Geração de Perguntas', 'description': 'IA gera perguntas críticas'},
+        {'step_number': 3, 'step_name': 'Coleta de Informações', 'description': 'Documentação e esclarecimentos'},
+        {'step_number': 4, 'step_name': 'Análise Técnica', 'description': 'Levantamento do ambiente'},
+        {'step_number': 5, 'step_name': 'Execução do Projeto', 'description': 'Desenvolvimento automatizado'},
+        {'step_number': 6, 'step_name': 'Testes', 'description': 'Testes integrados e correções'},
+        {'step_number': 7, 'step_name': 'Go Live', 'description': 'Documentação final e deploy'}
+    ]
+    
+    @hybrid_property
+    def is_completed(self):
+        """Verificar se etapa está completa"""
+        return self.status == 'completed'
+    
+    @hybrid_property
+    def is_overdue(self):
+        """Verificar se etapa está atrasada"""
+        # Implementar lógica baseada em estimativas e dependências
+        return False
+    
+    @classmethod
+    def completed_step_numbers(cls, project_id):
+        """Carregar em uma única consulta os números das etapas concluídas do projeto"""
+        rows = db.session.query(cls.step_number).filter_by(
+            project_id=project_id,
+            status='completed'
+        ).all()
+        return {row.step_number for row in rows}
+    
+    @staticmethod
+    def resolve_can_start(steps):
+        """
+        Resolver can_start de todas as etapas de um projeto em memória
+        
+        Args:
+            steps: Todas as etapas do projeto, já carregadas
+            
+        Returns:
+            Dict step_number -> bool
+        """
+        completed = {step.step_number for step in steps if step.is_completed}
+        return {step.step_number: step.can_start(completed) for step in steps}
+    
+    @staticmethod
+    def serialize_many(steps):
+        """Serializar todas as etapas de um projeto sem consultas por dependência"""
+        can_start_map = ProjectStep.resolve_can_start(steps)
+        return [step.to_dict(can_start=can_start_map[step.step_number]) for step in steps]
+    
+    def can_start(self, completed_steps=None):
+        """
+        Verificar se etapa pode ser iniciada (dependências resolvidas)
+        
+        Args:
+            completed_steps: Conjunto de step_numbers concluídos; se omitido,
+                é carregado com uma única consulta
+        """
+        if not self.dependencies:
+            return True
+        
+        if completed_steps is None:
+            completed_steps = ProjectStep.completed_step_numbers(self.project_id)
+        
+        return all(dep_step_number in completed_steps for dep_step_number in self.dependencies)
+    
+    def start(self, user_id=None, completed_steps=None):
+        """Iniciar etapa"""
+        if self.status != 'pending':
+            raise ValueError("Etapa deve estar pendente para ser iniciada")
+        
+        if not self.can_start(completed_steps):
+            raise ValueError("Dependências não resolvidas")
+        
+        self.status = 'in_progress'
+        self.started_at = datetime.utcnow()
+        if user_id:
+            self.assigned_to = user_id
+    
+    def complete(self, notes=None):
+        """Completar etapa"""
+        if self.status not in ['in_progress', 'pending']:
+            raise ValueError("Etapa deve estar em progresso ou pendente para ser completada")
+        
+        self.status = 'completed'
+        self.completed_at = datetime.utcnow()
+        if notes:
+            self.notes = notes
+    
+    def validate(self):
+        """Validações customizadas"""
+        errors = []
+        
+        # Validar nome
+        if not self.step_name or len(self.step_name.strip()) < 3:
+            errors.append("Nome da etapa deve ter pelo menos 3 caracteres")
+        
+        # Validar status
+        if not self.status or self.status.lower().strip() not in self.VALID_STATUSES:
+            errors.append(f"Status deve ser um dos: {', '.join(self.VALID_STATUSES)}")
+        
+        # Validar número da etapa
+        if self.step_number < 0:
+            errors.append("Número da etapa deve ser positivo")
+        
+        if errors:
+            raise ValueError('; '.join(errors))
+    
+    def to_dict(self, can_start=None):
+        """
+        Converter para dicionário
+        
+        Args:
+            can_start: Valor pré-calculado (ver resolve_can_start); se omitido,
+                é calculado com uma consulta
+        """
+        if can_start is None:
+            can_start = self.can_start()
+        
+        return {
+            'id': self.id,
+            'project_id': self.project_id,
+            'step_number': self.step_number,
+            'step_name': self.step_name,
+            'description': self.description,
+            'status': self.status,
+            'estimated_hours': self.estimated_hours,
+            'actual_hours': self.actual_hours,
+            'assigned_to': self.assigned_to,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'notes': self.notes,
+            'dependencies': self.dependencies,
+            'can_start': can_start,
+            'is_overdue': self.is_overdue
+        }
+
+
+class ProjectFile(TimestampMixin, db.Model):
+    """Modelo para arquivos do projeto"""
+    
+    __tablename__ = 'project_files'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    original_filename = db.Column(db.String(255), nullable=False)
+    file_size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(100), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+    uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    description = db.Column(db.Text)
+    is_active = db.Column(db.Boolean, default=True)
+    
+    __table_args__ = (
+        Index('idx_file_project', 'project_id'),
+        Index('idx_file_uploaded_by', 'uploaded_by'),
+    )
+    
+    @hybrid_property
+    def file_extension(self):
+        """Obter extensão do arquivo"""
+        return self.filename.split('.')[-1].lower() if '.' in self.filename else ''
+    
+    def to_dict(self):
+        """Converter para dicionário"""
+        return {
+            'id': self.id,
+            'project_id': self.project_id,
+            'filename': self.filename,
+            'original_filename': self.original_filename,
+            'file_size': self.file_size,
+            'content_type': self.content_type,
+            'file_extension': self.file_extension,
+            'uploaded_by': self.uploaded_by,
+            'description': self.description,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class AuditLog(TimestampMixin, db.Model):
+    """Modelo de log de auditoria melhorado"""
+    
+    __tablename__ = 'audit_logs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    action = db.Column(db.String(100), nullable=False)
+    resource_type = db.Column(db.String(50), nullable=False)
+    resource_id = db.Column(db.Integer)
+    details = db.Column(db.JSON)
+    ip_address = db.Column(db.String(45))
+    user_agent = db.Column(db.Text)
+    session_id = db.Column(db.String(100))
+    success = db.Column(db.Boolean, default=True)
+    error_message = db.Column(db.Text)
+    
+    __table_args__ = (
+        Index('idx_audit_user_action', 'user_id', 'action'),
+        Index('idx_audit_resource', 'resource_type', 'resource_id'),
+        Index('idx_audit_created_at', 'created_at'),
+    )
+    
+    def to_dict(self):
+        """Converter para dicionário"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'action': self.action,
+            'resource_type': self.resource_type,
+            'resource_id': self.resource_id,
+            'details': self.details,
+            'ip_address': self.ip_address,
+            'user_agent': self.user_agent,
+            'session_id': self.session_id,
+            'success': self.success,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class SyncTombstone(db.Model):
+    """Registro de remoções para a sincronização incremental (services/sync.py)"""
+    
+    __tablename__ = 'sync_tombstones'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(20), nullable=False)  # 'project', 'step', 'permission'
+    entity_id = db.Column(db.Integer, nullable=False)
+    project_id = db.Column(db.Integer, nullable=False)
+    # Tombstones de projeto são por usuário (exclusão ou acesso revogado)
+    user_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_tombstone_created_at', 'created_at', 'id'),
+        Index('idx_tombstone_user', 'user_id'),
+    )
+    
+    def to_dict(self):
+        """Converter para dicionário"""
+        return {
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id,
+            'project_id': self.project_id,
+            'deleted_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class UserSession(db.Model):
+    """Sessão de login (família de refresh token) - services/sessions.py"""
+    
+    __tablename__ = 'user_sessions'
+    
+    id = db.Column(db.String(32), primary_key=True)  # claim 'sid' dos tokens
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    ip_address = db.Column(db.String(45))
+    user_agent = db.Column(db.String(255))
+    revoked_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        Index('idx_session_user_revoked', 'user_id', 'revoked_at'),
+    )
+    
+    @property
+    def is_active(self):
+        return self.revoked_at is None
+    
+    def to_dict(self):
+        """Converter para dicionário"""
+        return {
+            'id': self.id,
+            'login_time': self.created_at.isoformat() if self.created_at else None,
+            'last_seen': self.last_seen_at.isoformat() if self.last_seen_at else None,
+            'ip_address': self.ip_address,
+            'user_agent': self.user_agent
+        }
+
+class RevokedToken(db.Model):
+    """Token revogado até a sua expiração (services/token_revocation.py)"""
+    
+    __tablename__ = 'revoked_tokens'
+    
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_revoked_token_revoked_at', 'revoked_at'),
+        Index('idx_revoked_token_expires_at', 'expires_at'),
+    )
+
+class AuthStatsHourly(db.Model):
+    """Contagem horária de eventos de autenticação (services/auth_stats.py)"""
+    
+    __tablename__ = 'auth_stats_hourly'
+    
+    event = db.Column(db.String(30), primary_key=True)  # ação do AuditLog
+    hour = db.Column(db.DateTime, primary_key=True)  # início da hora (UTC)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+
+class UserStats(db.Model):
+    """Contadores de usuários mantidos a cada escrita (linha única, id = 1)"""
+    
+    __tablename__ = 'user_stats'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    total_users = db.Column(db.Integer, default=0, nullable=False)
+    active_users = db.Column(db.Integer, default=0, nullable=False)
+    verified_users = db.Column(db.Integer, default=0, nullable=False)
+
+
+class AnalysisJob(db.Model):
+    """Análise de IA executada em segundo plano (services/ai_jobs.py)"""
+
+    __tablename__ = 'analysis_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    kind = db.Column(db.String(20), nullable=False)  # 'project', 'documents'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='SET NULL'))
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, completed, failed
+    progress = db.Column(db.Integer, default=0, nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    result = db.Column(db.JSON)
+    error_message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        Index('idx_analysis_job_status', 'status', 'created_at'),
+        Index('idx_analysis_job_user', 'user_id', 'created_at'),
+    )
+
+    def to_dict(self, include_result=True):
+        """Converter para dicionário"""
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'project_id': self.project_id,
+            'status': self.status,
+            'progress': self.progress,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class AIAnalysisCache(db.Model):
+    """Resultado de análise de IA endereçado pelo conteúdo (services/ai_cache.py)"""
+
+    __tablename__ = 'ai_analysis_cache'
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 das entradas normalizadas
+    kind = db.Column(db.String(20), nullable=False)
+    model = db.Column(db.String(100), nullable=False)
+    prompt_version = db.Column(db.String(20), nullable=False)
+    result = db.Column(db.JSON, nullable=False)
+    touch_count = db.Column(db.Integer, default=0, nullable=False)  # acertos registrados (no máximo um por AI_CACHE_TOUCH_INTERVAL)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_accessed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('idx_ai_cache_expires_at', 'expires_at'),
+        Index('idx_ai_cache_last_accessed', 'last_accessed_at'),
+    )
+
+
+class AIAnalysisLease(db.Model):
+    """Análise de IA em andamento em algum worker (single-flight, services/ai_cache.py)"""
+
+    __tablename__ = 'ai_analysis_leases'
+
+    key = db.Column(db.String(64), primary_key=True)  # mesma chave de ai_analysis_cache
+    owner = db.Column(db.String(100), nullable=False)  # host:pid:thread
+    status = db.Column(db.String(10), default='running', nullable=False)  # running, done, failed
+    result = db.Column(db.JSON)  # resultado publicado pelo detentor (status 'done')
+    expires_at = db.Column(db.DateTime, nullable=False)  # fim do lease ou, após o término, do resultado publicado
+
+# =============================================================================
+# EVENT LISTENERS
+# =============================================================================
+
+@event.listens_for(User, 'before_insert')
+@event.listens_for(User, 'before_update')
+def validate_user(mapper, connection, target):
+    """Validar usuário antes de inserir/atualizar"""
+    target.validate()
+
+@event.listens_for(Project, 'before_insert')
+@event.listens_for(Project, 'before_update')
+def validate_project(mapper, connection, target):
+    """Validar projeto antes de inserir/atualizar"""
+    target.validate()
+
+@event.listens_for(ProjectStep, 'before_insert')
+@event.listens_for(ProjectStep, 'before_update')
+def validate_project_step(mapper, connection, target):
+    """Validar etapa antes de inserir/atualizar"""
+    target.validate()
+
+def _step_project(session, step):
+    """Projeto da etapa sem disparar lazy load nem autoflush"""
+    project = step.__dict__.get('project')
+    if project is None and step.project_id is not None:
+        project = session.get(Project, step.project_id)
+    return project
+
+@event.listens_for(db.session, 'before_flush')
+def update_project_step_counters(session, flush_context, instances):
+    """
+    Manter os contadores de etapas do projeto na mesma transação
+
+    Só transições de status (e inserções/remoções de etapas) tocam o projeto;
+    edições de notas não geram nenhuma escrita extra.
+    """
+    deltas = {}
+    
+    def add_delta(step, total_delta, completed_delta):
+        project = _step_project(session, step)
+        if project is None or project in session.deleted:
+            return
+        total, completed = deltas.get(project, (0, 0))
+        deltas[project] = (total + total_delta, completed + completed_delta)
+    
+    with session.no_autoflush:
+        for step in session.new:
+            if isinstance(step, ProjectStep):
+                add_delta(step, 1, 1 if step.status == 'completed' else 0)
+        
+        for step in session.deleted:
+            if isinstance(step, ProjectStep):
+                add_delta(step, -1, -1 if step.status == 'completed' else 0)
+        
+        for step in session.dirty:
+            if not isinstance(step, ProjectStep):
+                continue
+            history = db.inspect(step).attrs.status.history
+            if not history.has_changes():
+                continue
+            was_completed = 'completed' in (history.deleted or ())
+            is_completed = step.status == 'completed'
+            if was_completed != is_completed:
+                add_delta(step, 0, 1 if is_completed else -1)
+        
+        incremented = [
+            project
+            for project, (total, completed) in deltas.items()
+            if (total or completed) and project.apply_step_delta(total, completed)
+        ]
+    if incremented:
+        flush_context.attributes['step_counter_projects'] = incremented
+
+@event.listens_for(db.session, 'after_flush')
+def complete_projects_with_all_steps_done(session, flush_context):
+    """Concluir, no banco, projetos cujos contadores chegaram ao total"""
+    projects = flush_context.attributes.get('step_counter_projects')
+    if projects:
+        Project.complete_if_all_steps_done(session.connection(), [project.id for project in projects])
+
+@event.listens_for(db.session, 'after_flush_postexec')
+def expire_completed_project_status(session, flush_context):
+    """Recarregar status/completed_at alterados fora do ORM"""
+    for project in flush_context.attributes.get('step_counter_projects', ()):
+        session.expire(project, ['status', 'completed_at', 'updated_at'])
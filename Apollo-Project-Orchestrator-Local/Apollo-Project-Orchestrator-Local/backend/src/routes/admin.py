@@ -0,0 +1,110 @@
+"""
+Blueprint de administração do Apollo Project Orchestrator
+"""
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, current_user
+from src.models.database import User
+from src.services.audit_query import (
+    EXPORT_FORMATS, parse_audit_filters, list_audit_logs, iter_audit_export
+)
+from src.utils.pagination import encode_cursor, decode_cursor
+
+admin_bp = Blueprint('admin', __name__)
+
+# Paginação do log de auditoria
+AUDIT_DEFAULT_PAGE_SIZE = 100
+AUDIT_MAX_PAGE_SIZE = 500
+
+EXPORT_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+def is_admin_request():
+    """Verificar se o usuário autenticado é administrador"""
+    return current_user.is_admin()
+
+@admin_bp.route('/health', methods=['GET'])
+@jwt_required()
+def admin_health():
+    """Health check do admin"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Acesso negado'}), 403
+    
+    return jsonify({
+        'status': 'ok',
+        'message': 'Admin panel funcionando',
+        'user': current_user.name
+    }), 200
+
+@admin_bp.route('/users', methods=['GET'])
+@jwt_required()
+def list_all_users():
+    """Listar todos os usuários (apenas admin)"""
+    if not is_admin_request():
+        return jsonify({'error': 'Acesso negado'}), 403
+    
+    users = User.query.all()
+    return jsonify({
+        'users': [u.to_dict() for u in users]
+    }), 200
+
+@admin_bp.route('/audit-logs', methods=['GET'])
+@jwt_required()
+def list_audit_log():
+    """Consultar o log de auditoria com filtros e paginação por cursor (apenas admin)"""
+    try:
+        if not is_admin_request():
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        try:
+            filters = parse_audit_filters(request.args)
+            limit = min(max(int(request.args.get('limit', AUDIT_DEFAULT_PAGE_SIZE)), 1), AUDIT_MAX_PAGE_SIZE)
+            cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        logs, has_more = list_audit_logs(filters, cursor=cursor, limit=limit)
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(logs[-1]['created_at'], logs[-1]['id'])
+        
+        return jsonify({
+            'logs': [
+                dict(log, created_at=log['created_at'].isoformat(), updated_at=log['updated_at'].isoformat())
+                for log in logs
+            ],
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@admin_bp.route('/audit-logs/export', methods=['GET'])
+@jwt_required()
+def export_audit_log():
+    """Exportar o log de auditoria filtrado em NDJSON ou CSV, em streaming (apenas admin)"""
+    try:
+        if not is_admin_request():
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f"Formato deve ser um dos: {', '.join(EXPORT_FORMATS)}"}), 400
+        
+        try:
+            filters = parse_audit_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return Response(
+            stream_with_context(iter_audit_export(filters, export_format)),
+            mimetype=EXPORT_MIMETYPES[export_format],
+            headers={'Content-Disposition': f'attachment; filename=audit_logs.{export_format}'}
+        )
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
@@ -0,0 +1,202 @@
+import math
+
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from src.extensions import db
+from src.models.database import AnalysisJob
+from src.services.ai import ai_service
+from src.services.ai_jobs import ai_jobs, TERMINAL_STATUSES
+from src.services.ai_stream import sse_event, stream_slots
+from src.services.permissions import get_authorized_project
+
+ai_bp = Blueprint('ai', __name__)
+
+
+def job_accepted_response(job):
+    """202 com o id do job e a URL de acompanhamento"""
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('ai.get_analysis_job', job_id=job.id)
+    }), 202
+
+@ai_bp.route('/analyze-documents', methods=['POST'])
+@jwt_required(optional=True)
+def analyze_documents():
+    """
+    Enfileira a análise de documentos (perguntas críticas para o projeto)
+
+    A análise roda em segundo plano; acompanhe por GET /api/ai/jobs/<job_id>.
+    """
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({"error": "Dados não fornecidos"}), 400
+
+        project_name = data.get('project_name', '')
+        project_objective = data.get('project_objective', '')
+
+        if not project_name or not project_objective:
+            return jsonify({"error": "Nome do projeto e objetivo são obrigatórios"}), 400
+
+        job = ai_jobs.submit('documents', {
+            'project_name': project_name,
+            'project_objective': project_objective,
+            'project_description': data.get('project_description', ''),
+            'files_content': data.get('files_content', [])
+        }, user_id=get_jwt_identity())
+
+        return job_accepted_response(job)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erro na análise de IA: {str(e)}")
+        return jsonify({"error": "Erro interno do servidor"}), 500
+
+@ai_bp.route('/analyze-documents/stream', methods=['POST'])
+@jwt_required(optional=True)
+def stream_analyze_documents():
+    """
+    Análise de documentos em Server-Sent Events
+    
+    Eventos: ``summary``, ``question``, ``insight`` e ``next_step`` a cada
+    elemento recebido da OpenAI e, por último, ``result`` com a análise
+    completa (que substitui os parciais) e ``source``.
+
+    Limitado a AI_STREAM_MAX_CONCURRENCY streams por processo (503 acima
+    disso; POST /api/ai/analyze-documents não tem esse limite).
+    """
+    if not stream_slots.try_acquire():
+        return jsonify({
+            "error": "Muitas análises em streaming. Tente novamente ou use /api/ai/analyze-documents"
+        }), 503
+
+    handed_off = False
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({"error": "Dados não fornecidos"}), 400
+
+        project_name = data.get('project_name', '')
+        project_objective = data.get('project_objective', '')
+
+        if not project_name or not project_objective:
+            return jsonify({"error": "Nome do projeto e objetivo são obrigatórios"}), 400
+
+        events = ai_service.stream_documents_analysis(
+            project_name,
+            project_objective,
+            data.get('project_description', ''),
+            data.get('files_content', []),
+            user_id=get_jwt_identity()
+        )
+        # Não manter conexão com o banco durante o streaming
+        db.session.close()
+
+        def generate():
+            try:
+                for event, payload in events:
+                    yield sse_event(event, payload)
+            except Exception as e:
+                current_app.logger.error(f"Erro no streaming da análise: {str(e)}")
+                yield sse_event('error', {'error': 'Erro interno do servidor'})
+
+        response = Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        # A vaga fica ocupada até o servidor fechar a resposta
+        response.call_on_close(stream_slots.release)
+        handed_off = True
+        return response
+
+    except Exception as e:
+        current_app.logger.error(f"Erro na análise de IA: {str(e)}")
+        return jsonify({"error": "Erro interno do servidor"}), 500
+    finally:
+        if not handed_off:
+            stream_slots.release()
+
+@ai_bp.route('/projects/<int:project_id>/analyze', methods=['POST'])
+@jwt_required()
+def analyze_project(project_id):
+    """Enfileira a análise completa de um projeto (riscos, arquitetura, estimativas)"""
+    try:
+        current_user_id = get_jwt_identity()
+
+        project = get_authorized_project(current_user_id, project_id, 'viewer')
+        if not project:
+            return jsonify({'error': 'Acesso negado'}), 403
+
+        data = request.get_json(silent=True) or {}
+        job = ai_jobs.submit('project', {
+            'name': project.name,
+            'client': project.client,
+            'responsible': project.responsible,
+            'objective': project.objective,
+            'description': project.description or '',
+            'files_content': data.get('files_content', [])
+        }, user_id=current_user_id, project_id=project_id)
+
+        return job_accepted_response(job)
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erro ao enfileirar análise do projeto: {str(e)}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@ai_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required(optional=True)
+def get_analysis_job(job_id):
+    """
+    Status e, quando concluída, resultado de uma análise
+
+    Query params:
+        wait: segundos de long-polling (até AI_JOB_MAX_WAIT) esperando mudança de status
+        since: ``status.timestamp`` da última resposta recebida
+    """
+    try:
+        job = db.session.get(AnalysisJob, job_id)
+        # Jobs de usuários autenticados só são visíveis ao dono
+        if not job or (job.user_id is not None and job.user_id != get_jwt_identity()):
+            return jsonify({'error': 'Análise não encontrada'}), 404
+
+        try:
+            wait = float(request.args.get('wait', 0))
+        except ValueError:
+            wait = None
+        # nan passaria pelo min/max e a espera nunca venceria
+        if wait is None or not math.isfinite(wait):
+            return jsonify({'error': 'Parâmetro wait inválido'}), 400
+        wait = min(max(wait, 0), current_app.config.get('AI_JOB_MAX_WAIT', 25))
+
+        if wait and job.status not in TERMINAL_STATUSES:
+            # Não manter conexão com o banco durante a espera
+            db.session.close()
+            status = ai_jobs.wait_for_change(job_id, since=request.args.get('since'), timeout=wait)
+            job = db.session.get(AnalysisJob, job_id)
+        else:
+            status = ai_jobs.get_status(job_id, job)
+
+        return jsonify({
+            'job': job.to_dict(include_result=job.status == 'completed'),
+            'status': status
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Erro ao consultar análise: {str(e)}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@ai_bp.route('/health', methods=['GET'])
+def health_check():
+    """
+    Verifica a configuração da OpenAI e o estado do circuit breaker
+    """
+    health = ai_service.health_check()
+    return jsonify(health), 500 if health['status'] == 'error' else 200
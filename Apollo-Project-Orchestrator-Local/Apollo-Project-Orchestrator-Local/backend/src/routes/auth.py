@@ -0,0 +1,747 @@
+"""
+Rotas de autenticação melhoradas com validações e segurança aprimorada
+"""
+
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import (
+    create_access_token, create_refresh_token, 
+    jwt_required, get_jwt_identity, get_jwt, current_user
+)
+import re
+
+from src.extensions import db, limiter
+from src.models.database import User
+from src.services.audit import log_action
+from src.services.auth_stats import get_auth_stats_summary, parse_window
+from src.services.login_tracking import login_attempts, last_login_buffer
+from src.services.password_hashing import PasswordHasherBusy
+from src.services.sessions import (
+    start_session, get_active_session, list_sessions, revoke_session, revoke_user_sessions,
+    token_claims, bump_token_generation
+)
+from src.services.token_revocation import token_revocation
+from src.utils.http_cache import compute_etag, is_not_modified, not_modified_response, set_validators
+
+auth_bp = Blueprint('auth', __name__)
+
+# =============================================================================
+# VALIDATORS
+# =============================================================================
+
+class AuthValidator:
+    """Validador para dados de autenticação"""
+    
+    @staticmethod
+    def validate_email(email: str) -> bool:
+        """Validar formato do email"""
+        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+        return bool(re.match(pattern, email))
+    
+    @staticmethod
+    def validate_password(password: str) -> tuple[bool, str]:
+        """Validar força da senha"""
+        if len(password) < 8:
+            return False, "Senha deve ter pelo menos 8 caracteres"
+        
+        if not re.search(r'[A-Z]', password):
+            return False, "Senha deve conter pelo menos uma letra maiúscula"
+        
+        if not re.search(r'[a-z]', password):
+            return False, "Senha deve conter pelo menos uma letra minúscula"
+        
+        if not re.search(r'\d', password):
+            return False, "Senha deve conter pelo menos um número"
+        
+        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+            return False, "Senha deve conter pelo menos um caractere especial"
+        
+        return True, "Senha válida"
+    
+    @staticmethod
+    def validate_registration_data(data: dict) -> tuple[bool, list]:
+        """Validar dados de registro"""
+        errors = []
+        
+        # Campos obrigatórios
+        required_fields = ['name', 'email', 'password']
+        for field in required_fields:
+            if not data.get(field):
+                errors.append(f"Campo '{field}' é obrigatório")
+        
+        # Validar email
+        if data.get('email') and not AuthValidator.validate_email(data['email']):
+            errors.append("Formato de email inválido")
+        
+        # Validar senha
+        if data.get('password'):
+            is_valid, message = AuthValidator.validate_password(data['password'])
+            if not is_valid:
+                errors.append(message)
+        
+        # Validar nome
+        if data.get('name') and len(data['name'].strip()) < 2:
+            errors.append("Nome deve ter pelo menos 2 caracteres")
+        
+        return len(errors) == 0, errors
+
+# =============================================================================
+# HELPER FUNCTIONS
+# =============================================================================
+
+def check_account_lockout(user):
+    """Verificar se conta está bloqueada (por tentativas de login ou manualmente)"""
+    seconds_left = login_attempts.locked_for(user.id)
+    if user.is_locked():
+        seconds_left = max(seconds_left, (user.locked_until - datetime.utcnow()).total_seconds())
+    if seconds_left > 0:
+        return True, f"Conta bloqueada. Tente novamente em {int(seconds_left / 60)} minutos"
+    return False, None
+
+# =============================================================================
+# ROUTES
+# =============================================================================
+
+@auth_bp.route('/register', methods=['POST'])
+@limiter.limit("5 per minute")
+def register():
+    """Registrar novo usuário"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'Dados não fornecidos'}), 400
+        
+        # Validar dados
+        is_valid, errors = AuthValidator.validate_registration_data(data)
+        if not is_valid:
+            return jsonify({'errors': errors}), 400
+        
+        # Verificar se email já existe
+        existing_user = User.query.filter_by(email=data['email'].lower()).first()
+        if existing_user:
+            log_action(
+                user_id=None,
+                action='registration_failed',
+                resource_type='user',
+                details={'email': data['email'], 'reason': 'email_exists'},
+                success=False,
+                error_message='Email já cadastrado'
+            )
+            return jsonify({'error': 'Email já cadastrado'}), 409
+        
+        # Criar novo usuário
+        user = User(
+            name=data['name'].strip(),
+            email=data['email'].lower(),
+            company=data.get('company', '').strip(),
+            role=data.get('role', '').strip(),
+            user_level='user'  # Novos usuários sempre como 'user'
+        )
+
+        # Defina a senha usando o setter
+        user.password = data['password']
+        
+        # Validar modelo
+        user.validate()
+        
+        db.session.add(user)
+        db.session.flush()
+        
+        # Abrir sessão (família de refresh token) no mesmo commit
+        session_claims = start_session(user)
+        db.session.commit()
+        
+        # Log da ação
+        log_action(
+            user_id=user.id,
+            action='user_registered',
+            resource_type='user',
+            resource_id=user.id,
+            details={'email': user.email, 'name': user.name}
+        )
+        
+        # Criar tokens
+        access_token = create_access_token(identity=user.id, additional_claims=session_claims)
+        refresh_token = create_refresh_token(identity=user.id, additional_claims=session_claims)
+        
+        return jsonify({
+            'message': 'Usuário cadastrado com sucesso',
+            'user': user.to_dict(),
+            'token': access_token,  # Compatibilidade com frontend
+            'access_token': access_token,
+            'refresh_token': refresh_token
+        }), 201
+        
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erro no registro: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/login', methods=['POST'])
+@limiter.limit("10 per minute")
+def login():
+    """Fazer login"""
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('email') or not data.get('password'):
+            return jsonify({'error': 'Email e senha são obrigatórios'}), 400
+        
+        email = data['email'].lower()
+        password = data['password']
+        
+        # Buscar usuário
+        user = User.query.filter_by(email=email).first()
+        
+        if not user:
+            log_action(
+                user_id=None,
+                action='login_failed',
+                resource_type='user',
+                details={'email': email, 'reason': 'user_not_found'},
+                success=False,
+                error_message='Usuário não encontrado'
+            )
+            return jsonify({'error': 'Email ou senha inválidos'}), 401
+        
+        # Verificar se conta está ativa
+        if not user.is_active:
+            log_action(
+                user_id=user.id,
+                action='login_failed',
+                resource_type='user',
+                resource_id=user.id,
+                details={'reason': 'account_inactive'},
+                success=False,
+                error_message='Conta inativa'
+            )
+            return jsonify({'error': 'Conta desativada. Entre em contato com o administrador'}), 401
+        
+        # Verificar bloqueio de conta
+        is_locked, lock_message = check_account_lockout(user)
+        if is_locked:
+            log_action(
+                user_id=user.id,
+                action='login_failed',
+                resource_type='user',
+                resource_id=user.id,
+                details={'reason': 'account_locked'},
+                success=False,
+                error_message='Conta bloqueada'
+            )
+            return jsonify({'error': lock_message}), 401
+        
+        # Verificar senha
+        if not user.verify_password(password):
+            attempts = login_attempts.record_failure(user.id)
+            
+            log_action(
+                user_id=user.id,
+                action='login_failed',
+                resource_type='user',
+                resource_id=user.id,
+                details={'reason': 'invalid_password', 'attempts': attempts},
+                success=False,
+                error_message='Senha inválida'
+            )
+            
+            return jsonify({'error': 'Email ou senha inválidos'}), 401
+        
+        # Login bem-sucedido; hashes de método/custo antigo são refeitos
+        if user.password_needs_rehash():
+            user.password = password
+        login_attempts.reset(user.id)
+        session_claims = start_session(user)
+        db.session.commit()
+        
+        # last_login é gravado em lote, fora da transação do login
+        logged_at = datetime.utcnow()
+        last_login_buffer.touch(user.id, logged_at)
+        
+        # Criar tokens
+        access_token = create_access_token(identity=user.id, additional_claims=session_claims)
+        refresh_token = create_refresh_token(identity=user.id, additional_claims=session_claims)
+        
+        # Log da ação
+        log_action(
+            user_id=user.id,
+            action='user_login',
+            resource_type='user',
+            resource_id=user.id,
+            details={'login_method': 'email_password'}
+        )
+        
+        return jsonify({
+            'message': 'Login realizado com sucesso',
+            'token': access_token,  # Compatibilidade com frontend
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'user': dict(user.to_dict(), last_login=logged_at.isoformat())
+        }), 200
+        
+    except PasswordHasherBusy:
+        db.session.rollback()
+        current_app.logger.warning("Login recusado: pool de hash de senhas saturado")
+        return jsonify({'error': 'Servidor ocupado. Tente novamente em instantes'}), 503
+    except Exception as e:
+        current_app.logger.error(f"Erro no login: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+# NOVA ROTA - VERIFY TOKEN
+@auth_bp.route('/verify', methods=['POST', 'OPTIONS'])
+@jwt_required()
+def verify_token():
+    """Verificar se o token JWT é válido (inclui tokens revogados e sessões encerradas)"""
+    if request.method == 'OPTIONS':
+        # Responder ao preflight request
+        return '', 204
+    
+    try:
+        if not current_user.is_active:
+            return jsonify({
+                'success': False,
+                'error': 'Conta desativada',
+                'message': 'Conta desativada'
+            }), 401
+        
+        return jsonify({
+            'success': True,
+            'valid': True,
+            'user': {
+                'id': current_user.id,
+                'email': current_user.email,
+                'name': current_user.name
+            }
+        }), 200
+            
+    except Exception as e:
+        current_app.logger.error(f"Erro ao verificar token: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Erro ao verificar token',
+            'message': str(e)
+        }), 500
+
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """Renovar token de acesso"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = current_user
+        
+        if not user.is_active:
+            return jsonify({'error': 'Usuário não encontrado ou inativo'}), 401
+        
+        # Verificar se não está bloqueado
+        is_locked, lock_message = check_account_lockout(user)
+        if is_locked:
+            return jsonify({'error': lock_message}), 401
+        
+        # A família do refresh token precisa continuar ativa
+        session_id = get_jwt().get('sid')
+        if session_id and not get_active_session(current_user_id, session_id):
+            return jsonify({'error': 'Sessão encerrada'}), 401
+        
+        # Criar novo token (mesma sessão)
+        new_token = create_access_token(
+            identity=current_user_id,
+            additional_claims=token_claims(user, session_id)
+        )
+        
+        # Log da ação
+        log_action(
+            user_id=current_user_id,
+            action='token_refreshed',
+            resource_type='user',
+            resource_id=current_user_id
+        )
+        
+        return jsonify({
+            'access_token': new_token,
+            'message': 'Token renovado com sucesso'
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erro na renovação do token: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/me', methods=['GET'])
+@jwt_required()
+def get_current_user():
+    """Obter informações do usuário atual"""
+    try:
+        # Qualquer alteração no usuário atualiza updated_at (TimestampMixin);
+        # a revalidação sai do cache, sem consultar o banco
+        etag = compute_etag(current_user.id, current_user.updated_at)
+        if is_not_modified(etag, current_user.updated_at):
+            return not_modified_response(etag, current_user.updated_at)
+        
+        user = current_user.load()
+        if not user:
+            return jsonify({'error': 'Usuário não encontrado'}), 404
+        
+        return set_validators(jsonify({'user': user.to_dict()}), etag, current_user.updated_at), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erro ao obter usuário atual: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """Fazer logout"""
+    try:
+        current_user_id = get_jwt_identity()
+        
+        # Revogar o token até a sua expiração
+        token_revocation.revoke(get_jwt())
+        
+        # Encerrar a sessão (invalida também o refresh token)
+        session_id = get_jwt().get('sid')
+        if session_id:
+            revoke_session(current_user_id, session_id)
+        
+        # Log da ação
+        log_action(
+            user_id=current_user_id,
+            action='user_logout',
+            resource_type='user',
+            resource_id=current_user_id
+        )
+        
+        return jsonify({'message': 'Logout realizado com sucesso'}), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erro no logout: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/change-password', methods=['POST'])
+@jwt_required()
+@limiter.limit("3 per minute")
+def change_password():
+    """Alterar senha do usuário"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = current_user.load()
+        
+        if not user:
+            return jsonify({'error': 'Usuário não encontrado'}), 404
+        
+        data = request.get_json()
+        
+        if not data or not data.get('current_password') or not data.get('new_password'):
+            return jsonify({'error': 'Senha atual e nova senha são obrigatórias'}), 400
+        
+        # Verificar senha atual
+        if not user.verify_password(data['current_password']):
+            log_action(
+                user_id=current_user_id,
+                action='password_change_failed',
+                resource_type='user',
+                resource_id=current_user_id,
+                details={'reason': 'invalid_current_password'},
+                success=False
+            )
+            return jsonify({'error': 'Senha atual incorreta'}), 401
+        
+        # Validar nova senha
+        is_valid, message = AuthValidator.validate_password(data['new_password'])
+        if not is_valid:
+            return jsonify({'error': message}), 400
+        
+        # Verificar se nova senha é diferente da atual (a atual acabou de ser
+        # conferida, então basta comparar, sem um segundo hash)
+        if data['new_password'] == data['current_password']:
+            return jsonify({'error': 'Nova senha deve ser diferente da atual'}), 400
+        
+        # Atualizar senha e invalidar os tokens emitidos com a senha anterior
+        user.password = data['new_password']
+        bump_token_generation(user)
+        db.session.commit()
+        
+        # Log da ação
+        log_action(
+            user_id=current_user_id,
+            action='password_changed',
+            resource_type='user',
+            resource_id=current_user_id
+        )
+        
+        # Novos tokens para manter a sessão atual
+        session_claims = token_claims(user, get_jwt().get('sid'))
+        
+        return jsonify({
+            'message': 'Senha alterada com sucesso',
+            'access_token': create_access_token(identity=user.id, additional_claims=session_claims),
+            'refresh_token': create_refresh_token(identity=user.id, additional_claims=session_claims)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erro ao alterar senha: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/forgot-password', methods=['POST'])
+@limiter.limit("3 per hour")
+def forgot_password():
+    """Solicitar redefinição de senha"""
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('email'):
+            return jsonify({'error': 'Email é obrigatório'}), 400
+        
+        email = data['email'].lower()
+        
+        # Verificar se email existe
+        user = User.query.filter_by(email=email).first()
+        
+        # Por segurança, sempre retornar sucesso mesmo se email não existir
+        if user and user.is_active:
+            # TODO: Implementar envio de email com token de redefinição
+            # Por enquanto, apenas log
+            log_action(
+                user_id=user.id,
+                action='password_reset_requested',
+                resource_type='user',
+                resource_id=user.id,
+                details={'email': email}
+            )
+        else:
+            # Log tentativa com email inexistente
+            log_action(
+                user_id=None,
+                action='password_reset_requested',
+                resource_type='user',
+                details={'email': email, 'user_exists': False}
+            )
+        
+        return jsonify({
+            'message': 'Se o email estiver cadastrado, você receberá instruções para redefinição da senha'
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erro na solicitação de redefinição de senha: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/verify-email', methods=['POST'])
+@jwt_required()
+def verify_email():
+    """Verificar email do usuário"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user:
+            return jsonify({'error': 'Usuário não encontrado'}), 404
+        
+        data = request.get_json()
+        verification_code = data.get('verification_code') if data else None
+        
+        # TODO: Implementar verificação real do código
+        # Por enquanto, marcar como verificado
+        if verification_code == '123456':  # Código de teste
+            user.email_verified = True
+            db.session.commit()
+            
+            log_action(
+                user_id=current_user_id,
+                action='email_verified',
+                resource_type='user',
+                resource_id=current_user_id
+            )
+            
+            return jsonify({'message': 'Email verificado com sucesso'}), 200
+        else:
+            return jsonify({'error': 'Código de verificação inválido'}), 400
+        
+    except Exception as e:
+        current_app.logger.error(f"Erro na verificação de email: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/resend-verification', methods=['POST'])
+@jwt_required()
+@limiter.limit("3 per hour")
+def resend_verification():
+    """Reenviar código de verificação de email"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user:
+            return jsonify({'error': 'Usuário não encontrado'}), 404
+        
+        if user.email_verified:
+            return jsonify({'error': 'Email já verificado'}), 400
+        
+        # TODO: Implementar envio real do código
+        log_action(
+            user_id=current_user_id,
+            action='verification_code_resent',
+            resource_type='user',
+            resource_id=current_user_id
+        )
+        
+        return jsonify({'message': 'Código de verificação reenviado'}), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erro ao reenviar verificação: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/check-email', methods=['POST'])
+@limiter.limit("10 per minute")
+def check_email():
+    """Verificar se email já está cadastrado"""
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('email'):
+            return jsonify({'error': 'Email é obrigatório'}), 400
+        
+        email = data['email'].lower()
+        
+        if not AuthValidator.validate_email(email):
+            return jsonify({'error': 'Formato de email inválido'}), 400
+        
+        user_exists = User.query.filter_by(email=email).first() is not None
+        
+        return jsonify({
+            'exists': user_exists,
+            'available': not user_exists
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erro ao verificar email: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/sessions', methods=['GET'])
+@jwt_required()
+def get_user_sessions():
+    """Obter sessões ativas do usuário"""
+    try:
+        current_user_id = get_jwt_identity()
+        current_session_id = get_jwt().get('sid')
+        
+        sessions = []
+        for session in list_sessions(current_user_id):
+            session_data = session.to_dict()
+            session_data['current'] = session.id == current_session_id
+            sessions.append(session_data)
+        
+        return jsonify({'sessions': sessions}), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erro ao obter sessões: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/sessions/<session_id>', methods=['DELETE'])
+@jwt_required()
+def revoke_user_session(session_id):
+    """Revogar uma sessão do usuário"""
+    try:
+        current_user_id = get_jwt_identity()
+        
+        if not revoke_session(current_user_id, session_id):
+            return jsonify({'error': 'Sessão não encontrada'}), 404
+        
+        log_action(
+            user_id=current_user_id,
+            action='session_revoked',
+            resource_type='user',
+            resource_id=current_user_id,
+            details={'session_id': session_id}
+        )
+        
+        return jsonify({'message': 'Sessão revogada'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erro ao revogar sessão: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@auth_bp.route('/revoke-all-sessions', methods=['POST'])
+@jwt_required()
+def revoke_all_sessions():
+    """Revogar todas as sessões do usuário"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = current_user.load()
+        
+        if not user:
+            return jsonify({'error': 'Usuário não encontrado'}), 404
+        
+        # Um incremento invalida todos os tokens emitidos (inclusive os sem sessão)
+        bump_token_generation(user)
+        revoked = revoke_user_sessions(current_user_id)
+        
+        log_action(
+            user_id=current_user_id,
+            action='all_sessions_revoked',
+            resource_type='user',
+            resource_id=current_user_id,
+            details={'sessions': revoked}
+        )
+        
+        return jsonify({'message': 'Todas as sessões foram revogadas', 'revoked': revoked}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erro ao revogar sessões: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+# =============================================================================
+# UTILITY ROUTES
+# =============================================================================
+
+@auth_bp.route('/health', methods=['GET'])
+def health_check():
+    """Verificar saúde do serviço de autenticação"""
+    try:
+        # Verificar conectividade com banco
+        db.session.execute('SELECT 1')
+        
+        return jsonify({
+            'status': 'ok',
+            'message': 'Serviço de autenticação funcionando',
+            'timestamp': datetime.utcnow().isoformat()
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Health check falhou: {e}")
+        return jsonify({
+            'status': 'error',
+            'message': 'Serviço de autenticação com problemas',
+            'timestamp': datetime.utcnow().isoformat()
+        }), 503
+
+@auth_bp.route('/stats', methods=['GET'])
+@jwt_required()
+def get_auth_stats():
+    """Obter estatísticas de autenticação (apenas para admins), a partir dos rollups"""
+    try:
+        if not current_user.is_admin():
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        try:
+            window_hours = parse_window(request.args.get('window', '24h'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        series = request.args.get('series', '').lower() in ('1', 'true', 'hourly')
+        stats = get_auth_stats_summary(window_hours, series=series)
+        
+        # Compatibilidade com o formato anterior (janela fixa de 24h)
+        if window_hours == 24:
+            stats['recent_logins_24h'] = stats['logins']
+            stats['failed_logins_24h'] = stats['failed_logins']
+        
+        return jsonify(stats), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erro ao obter estatísticas: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
\ No newline at end of file
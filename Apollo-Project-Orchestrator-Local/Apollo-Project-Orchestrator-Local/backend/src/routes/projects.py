@@ -0,0 +1,549 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime
+from sqlalchemy import and_, or_, case, func
+
+from src.extensions import db
+from src.models.database import Project, ProjectPermission, ProjectStep, User
+from src.services.audit import log_action
+from src.services.permissions import has_project_permission, get_authorized_project, filter_accessible_projects
+from src.services.project_summary import get_project_summary
+from src.services.project_import import bulk_create_projects
+from src.services.search import search_projects
+from src.services.sync import get_changes, decode_sync_cursor, SyncCursorExpired
+from src.utils.http_cache import compute_etag, is_not_modified, not_modified_response, set_validators
+from src.utils.pagination import encode_cursor, decode_cursor
+
+projects_bp = Blueprint('projects', __name__)
+
+# Definição das etapas padrão do projeto
+DEFAULT_STEPS = ProjectStep.DEFAULT_STEPS
+
+# Paginação da listagem de projetos
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def accessible_projects_query(user_id):
+    """
+    Query de projetos acessíveis ao usuário, já com o nível de permissão.
+
+    Ver filter_accessible_projects: um único LEFT JOIN, sem deduplicação.
+    """
+    permission_level = case(
+        (Project.owner_id == user_id, 'owner'),
+        else_=func.coalesce(ProjectPermission.permission_level, 'viewer')
+    ).label('permission_level')
+
+    return filter_accessible_projects(db.session.query(Project, permission_level), user_id)
+
+def project_list_validators(query):
+    """ETag/Last-Modified da listagem a partir de uma agregação sobre a query filtrada"""
+    count, max_updated, id_sum, max_permission_updated, overdue = query.with_entities(
+        func.count(Project.id),
+        func.max(Project.updated_at),
+        func.coalesce(func.sum(Project.id), 0),
+        func.max(ProjectPermission.updated_at),
+        func.coalesce(func.sum(case((Project.is_overdue, 1), else_=0)), 0)
+    ).one()
+    
+    etag = compute_etag(
+        request.query_string.decode(), count, max_updated, id_sum, max_permission_updated, overdue
+    )
+    last_modified = max(filter(None, [max_updated, max_permission_updated]), default=None)
+    return etag, last_modified
+
+def project_detail_validators(project_id):
+    """ETag/Last-Modified do projeto e de suas etapas sem carregá-los"""
+    updated_at, overdue, steps_count, steps_updated = db.session.query(
+        Project.updated_at,
+        Project.is_overdue,
+        func.count(ProjectStep.id),
+        func.max(ProjectStep.updated_at)
+    ).outerjoin(ProjectStep, ProjectStep.project_id == Project.id).filter(
+        Project.id == project_id
+    ).group_by(Project.id).one()
+    
+    etag = compute_etag(project_id, updated_at, bool(overdue), steps_count, steps_updated)
+    last_modified = max(filter(None, [updated_at, steps_updated]), default=None)
+    return etag, last_modified
+
+@projects_bp.route('', methods=['GET'])
+@projects_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_projects():
+    try:
+        current_user_id = get_jwt_identity()
+        
+        try:
+            limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({'error': 'Parâmetro limit inválido'}), 400
+        
+        query = accessible_projects_query(current_user_id)
+        
+        # Filtros no servidor
+        if request.args.get('status'):
+            query = query.filter(Project.status == request.args['status'])
+        if request.args.get('priority'):
+            query = query.filter(Project.priority == request.args['priority'])
+        if request.args.get('owner_id'):
+            try:
+                query = query.filter(Project.owner_id == int(request.args['owner_id']))
+            except ValueError:
+                return jsonify({'error': 'Parâmetro owner_id inválido'}), 400
+        
+        # GET condicional: validadores do conjunto filtrado em uma única agregação
+        etag, last_modified = project_list_validators(query)
+        if is_not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        # Paginação por cursor (keyset) com ordenação estável
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_updated_at, cursor_id = decode_cursor(cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            query = query.filter(or_(
+                Project.updated_at < cursor_updated_at,
+                and_(Project.updated_at == cursor_updated_at, Project.id < cursor_id)
+            ))
+        
+        rows = query.order_by(Project.updated_at.desc(), Project.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        projects_data = []
+        for project, permission_level in rows:
+            project_dict = project.to_dict()
+            project_dict['permission_level'] = permission_level
+            projects_data.append(project_dict)
+        
+        next_cursor = None
+        if has_more:
+            last_project = rows[-1][0]
+            next_cursor = encode_cursor(last_project.updated_at, last_project.id)
+        
+        return set_validators(jsonify({
+            'projects': projects_data,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        }), etag, last_modified), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@projects_bp.route('', methods=['POST'])
+@projects_bp.route('/', methods=['POST'])
+@jwt_required()
+def create_project():
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json()
+        print("Recebendo dados para criar projeto:", data)
+        
+        # Validação dos campos obrigatórios
+        required_fields = ['name', 'client', 'responsible', 'objective']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({'error': f'Campo {field} é obrigatório'}), 400
+        
+        # Criar novo projeto
+        project = Project(
+            name=data['name'],
+            client=data['client'],
+            responsible=data['responsible'],
+            objective=data['objective'],
+            description=data.get('description', ''),
+            priority=data.get('priority', 'medium'),
+            status=data.get('status', 'active'),  # ADICIONE ESTA LINHA
+            owner_id=current_user_id
+        )
+        
+        db.session.add(project)
+        db.session.flush()
+        
+        # Criar etapas padrão
+        for step_data in DEFAULT_STEPS:
+            step = ProjectStep(
+                project_id=project.id,
+                step_number=step_data['step_number'],
+                step_name=step_data['step_name'],
+                description=step_data['description'],
+                status=step_data.get('status', 'pending') # ADICIONE ESTA LINHA
+            )
+            db.session.add(step)
+        
+        # Criar permissão de owner para o criador
+        permission = ProjectPermission(
+            project_id=project.id,
+            user_id=current_user_id,
+            permission_level='owner',
+            granted_by=current_user_id
+        )
+        db.session.add(permission)
+        
+        db.session.commit()
+        
+        # Log da ação
+        log_action(current_user_id, 'project_created', 'project', project.id, {'name': project.name})
+        
+        return jsonify({
+            'message': 'Projeto criado com sucesso',
+            'project': project.to_dict()
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        print("Erro ao criar projeto:", e)
+
+        if isinstance(e, ValueError):
+            # Retorna um erro 400 com a mensagem de validação
+            return jsonify({'error': str(e)}), 400
+        raise  # Isso faz o traceback aparecer no terminal
+
+@projects_bp.route('/summary', methods=['GET'])
+@jwt_required()
+def get_projects_summary():
+    """Resumo do portfólio do usuário (contagens por status/prioridade, atrasos, média de conclusão)"""
+    try:
+        current_user_id = get_jwt_identity()
+        return jsonify({'summary': get_project_summary(current_user_id)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@projects_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search():
+    """Busca textual (nome, cliente, objetivo, descrição) nos projetos do usuário"""
+    try:
+        current_user_id = get_jwt_identity()
+        
+        terms = request.args.get('q', '').strip()
+        if not terms:
+            return jsonify({'error': 'Parâmetro q é obrigatório'}), 400
+        
+        try:
+            limit = min(max(int(request.args.get('limit', 20)), 1), MAX_PAGE_SIZE)
+            offset = max(int(request.args.get('offset', 0)), 0)
+        except ValueError:
+            return jsonify({'error': 'Parâmetros de paginação inválidos'}), 400
+        
+        rows = search_projects(current_user_id, terms, limit=limit, offset=offset)
+        has_more = len(rows) > limit
+        
+        projects_data = []
+        for project, permission_level, rank in rows[:limit]:
+            project_dict = project.to_dict()
+            project_dict['permission_level'] = permission_level
+            project_dict['rank'] = rank
+            projects_data.append(project_dict)
+        
+        return jsonify({
+            'projects': projects_data,
+            'has_more': has_more,
+            'next_offset': offset + limit if has_more else None
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@projects_bp.route('/changes', methods=['GET'])
+@jwt_required()
+def get_project_changes():
+    """Mudanças em projetos, etapas e permissões desde o cursor (delta-sync)"""
+    try:
+        current_user_id = get_jwt_identity()
+        
+        positions = None
+        if request.args.get('since'):
+            try:
+                positions = decode_sync_cursor(request.args['since'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        try:
+            changes = get_changes(
+                current_user_id,
+                positions,
+                limit=current_app.config.get('SYNC_PAGE_SIZE', 500)
+            )
+        except SyncCursorExpired as e:
+            return jsonify({'error': str(e), 'reset_required': True}), 410
+        
+        return jsonify(changes), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@projects_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create():
+    """Criar vários projetos (com etapas padrão) em lote"""
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        items = data.get('projects') if data else None
+        if not items or not isinstance(items, list):
+            return jsonify({'error': 'Lista de projetos é obrigatória'}), 400
+        
+        max_items = current_app.config.get('BULK_IMPORT_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            return jsonify({'error': f'Máximo de {max_items} projetos por requisição'}), 400
+        
+        result = bulk_create_projects(
+            items,
+            owner_id=current_user_id,
+            chunk_size=current_app.config.get('BULK_IMPORT_CHUNK_SIZE', 200)
+        )
+        
+        # Log da ação
+        log_action(current_user_id, 'projects_bulk_created', 'project', None, {
+            'created': len(result['created']),
+            'failed': len(result['errors'])
+        })
+        
+        status_code = 201 if result['created'] else 400
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@projects_bp.route('/<int:project_id>', methods=['GET'])
+@jwt_required()
+def get_project(project_id):
+    try:
+        current_user_id = get_jwt_identity()
+        
+        if not has_project_permission(current_user_id, project_id, 'viewer'):
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        # GET condicional antes de carregar o projeto e as etapas
+        etag, last_modified = project_detail_validators(project_id)
+        if is_not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        project = get_authorized_project(current_user_id, project_id, 'viewer')
+        
+        # Buscar etapas do projeto
+        steps = ProjectStep.query.filter_by(project_id=project_id).order_by(ProjectStep.step_number).all()
+        
+        project_data = project.to_dict()
+        project_data['steps'] = ProjectStep.serialize_many(steps)
+        
+        return set_validators(jsonify({'project': project_data}), etag, last_modified), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@projects_bp.route('/<int:project_id>', methods=['PUT'])
+@jwt_required()
+def update_project(project_id):
+    try:
+        current_user_id = get_jwt_identity()
+        
+        project = get_authorized_project(current_user_id, project_id, 'editor')
+        if not project:
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        data = request.get_json()
+        
+        # Atualizar campos permitidos
+        updatable_fields = ['name', 'client', 'responsible', 'objective', 'description', 'status', 'priority', 'current_step']
+        for field in updatable_fields:
+            if field in data:
+                setattr(project, field, data[field])
+        
+        project.updated_at = datetime.utcnow()
+        
+        # Se o status mudou para 'completed', definir data de conclusão
+        if data.get('status') == 'completed' and project.completed_at is None:
+            project.completed_at = datetime.utcnow()
+        
+        db.session.commit()
+        
+        # Log da ação
+        log_action(current_user_id, 'project_updated', 'project', project.id, {'fields': list(data.keys())})
+        
+        return jsonify({
+            'message': 'Projeto atualizado com sucesso',
+            'project': project.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@projects_bp.route('/<int:project_id>', methods=['DELETE'])
+@jwt_required()
+def delete_project(project_id):
+    try:
+        current_user_id = get_jwt_identity()
+        
+        project = Project.query.get(project_id)
+        if not project:
+            return jsonify({'error': 'Projeto não encontrado'}), 404
+        
+        # Apenas o owner pode deletar o projeto
+        if project.owner_id != current_user_id:
+            return jsonify({'error': 'Apenas o proprietário pode excluir o projeto'}), 403
+        
+        project_name = project.name
+        
+        # Deletar projeto (cascade vai deletar permissões e etapas)
+        db.session.delete(project)
+        db.session.commit()
+        
+        # Log da ação
+        log_action(current_user_id, 'project_deleted', 'project', project_id, {'name': project_name})
+        
+        return jsonify({'message': 'Projeto excluído com sucesso'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+def apply_step_update(step, data):
+    """Aplicar status/notas de uma atualização de etapa"""
+    # Atualizar status da etapa
+    if 'status' in data:
+        old_status = step.status
+        step.status = data['status']
+        
+        if data['status'] == 'in_progress' and old_status != 'in_progress':
+            step.started_at = datetime.utcnow()
+        elif data['status'] == 'completed' and old_status != 'completed':
+            step.completed_at = datetime.utcnow()
+    
+    # Atualizar notas
+    if 'notes' in data:
+        step.notes = data['notes']
+
+@projects_bp.route('/<int:project_id>/steps/<int:step_number>', methods=['PUT'])
+@jwt_required()
+def update_project_step(project_id, step_number):
+    try:
+        current_user_id = get_jwt_identity()
+        
+        if not has_project_permission(current_user_id, project_id, 'editor'):
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        step = ProjectStep.query.filter_by(project_id=project_id, step_number=step_number).first()
+        if not step:
+            return jsonify({'error': 'Etapa não encontrada'}), 404
+        
+        data = request.get_json()
+        
+        apply_step_update(step, data)
+        
+        db.session.commit()
+        
+        # Log da ação
+        log_action(current_user_id, 'project_step_updated', 'project', project_id, {
+            'step_number': step_number,
+            'status': data.get('status'),
+            'notes_updated': 'notes' in data
+        })
+        
+        return jsonify({
+            'message': 'Etapa atualizada com sucesso',
+            'step': step.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@projects_bp.route('/<int:project_id>/steps', methods=['PUT'])
+@jwt_required()
+def bulk_update_project_steps(project_id):
+    """
+    Aplicar várias transições de etapas em uma única transação
+    
+    Corpo: {"steps": [{"step_number": 2, "status": "completed"}, {"step_number": 3, "status": "in_progress"}]}
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        
+        if not has_project_permission(current_user_id, project_id, 'editor'):
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        data = request.get_json()
+        changes = data.get('steps') if data else None
+        if not changes or not isinstance(changes, list):
+            return jsonify({'error': 'Lista de etapas é obrigatória'}), 400
+        
+        steps = ProjectStep.query.filter_by(project_id=project_id).order_by(ProjectStep.step_number).all()
+        steps_by_number = {step.step_number: step for step in steps}
+        
+        # Validar o lote inteiro antes de alterar qualquer etapa
+        errors = []
+        seen = set()
+        final_status = {step.step_number: step.status for step in steps}
+        for index, change in enumerate(changes):
+            step_number = change.get('step_number') if isinstance(change, dict) else None
+            # bool é int, e listas/objetos não podem ser chave do dict
+            if not isinstance(step_number, int) or isinstance(step_number, bool):
+                errors.append(f"Item {index}: step_number deve ser um número inteiro")
+                continue
+            if step_number not in steps_by_number:
+                errors.append(f"Item {index}: etapa {step_number} não encontrada")
+                continue
+            if step_number in seen:
+                errors.append(f"Item {index}: etapa {step_number} repetida no lote")
+                continue
+            seen.add(step_number)
+            if 'status' in change:
+                if change['status'] not in ProjectStep.VALID_STATUSES:
+                    errors.append(f"Item {index}: status inválido '{change['status']}'")
+                    continue
+                final_status[step_number] = change['status']
+        
+        # Dependências avaliadas contra o estado final do lote
+        completed_after = {number for number, status in final_status.items() if status == 'completed'}
+        for change in changes:
+            step_number = change.get('step_number') if isinstance(change, dict) else None
+            step = steps_by_number.get(step_number) if isinstance(step_number, int) else None
+            if not step or change.get('status') not in ('in_progress', 'completed'):
+                continue
+            if change['status'] == step.status:
+                continue
+            missing = [dep for dep in (step.dependencies or []) if dep not in completed_after]
+            if missing:
+                errors.append(f"Etapa {step.step_number}: dependências não resolvidas {missing}")
+        
+        if errors:
+            return jsonify({'errors': errors}), 400
+        
+        for change in changes:
+            apply_step_update(steps_by_number[change['step_number']], change)
+        
+        # Um único commit: contadores e conclusão do projeto recalculados uma vez
+        db.session.commit()
+        
+        # Log da ação
+        log_action(current_user_id, 'project_steps_bulk_updated', 'project', project_id, {
+            'changes': [
+                {
+                    'step_number': change['step_number'],
+                    'status': change.get('status'),
+                    'notes_updated': 'notes' in change
+                }
+                for change in changes
+            ]
+        })
+        
+        # Recarregar as etapas expiradas pelo commit em uma única consulta
+        steps = ProjectStep.query.filter_by(project_id=project_id).order_by(ProjectStep.step_number).all()
+        
+        return jsonify({
+            'message': 'Etapas atualizadas com sucesso',
+            'steps': ProjectStep.serialize_many(steps)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Erro interno do servidor'}), 500
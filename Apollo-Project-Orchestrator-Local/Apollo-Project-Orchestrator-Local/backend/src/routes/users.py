@@ -0,0 +1,116 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from datetime import datetime
+
+from src.extensions import db
+from src.models.database import User
+from src.services.audit import log_action
+from src.services.sessions import bump_token_generation
+from src.utils.http_cache import compute_etag, is_not_modified, not_modified_response, set_validators
+
+users_bp = Blueprint('users', __name__)
+
+@users_bp.route('/profile', methods=['GET'])
+@jwt_required()
+def get_profile():
+    try:
+        # Qualquer alteração no usuário atualiza updated_at (TimestampMixin);
+        # a revalidação sai do cache, sem consultar o banco
+        etag = compute_etag(current_user.id, current_user.updated_at)
+        if is_not_modified(etag, current_user.updated_at):
+            return not_modified_response(etag, current_user.updated_at)
+        
+        user = current_user.load()
+        if not user:
+            return jsonify({'error': 'Usuário não encontrado'}), 404
+        
+        return set_validators(jsonify({'user': user.to_dict()}), etag, current_user.updated_at), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@users_bp.route('/profile', methods=['PUT'])
+@jwt_required()
+def update_profile():
+    try:
+        current_user_id = get_jwt_identity()
+        user = current_user.load()
+        
+        if not user:
+            return jsonify({'error': 'Usuário não encontrado'}), 404
+        
+        data = request.get_json()
+        
+        # Campos que podem ser atualizados
+        updatable_fields = ['name', 'company', 'role']
+        updated_fields = []
+        
+        for field in updatable_fields:
+            if field in data and data[field] != getattr(user, field):
+                setattr(user, field, data[field])
+                updated_fields.append(field)
+        
+        if updated_fields:
+            user.updated_at = datetime.utcnow()
+            db.session.commit()
+            
+            # Log da ação
+            log_action(current_user_id, 'profile_updated', 'user', current_user_id, {'fields': updated_fields})
+        
+        return jsonify({
+            'message': 'Perfil atualizado com sucesso',
+            'user': user.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@users_bp.route('/', methods=['GET'])
+@jwt_required()
+def list_users():
+    try:
+        # Apenas admins podem listar usuários
+        if not current_user.is_admin():
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        users = User.query.filter_by(is_active=True).all()
+        users_data = [user.to_dict() for user in users]
+        
+        return jsonify({'users': users_data}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@users_bp.route('/<int:user_id>/deactivate', methods=['PUT'])
+@jwt_required()
+def deactivate_user(user_id):
+    try:
+        current_user_id = get_jwt_identity()
+        
+        # Apenas admins podem desativar usuários
+        if not current_user.is_admin():
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        # Não pode desativar a si mesmo
+        if user_id == current_user_id:
+            return jsonify({'error': 'Não é possível desativar sua própria conta'}), 400
+        
+        user = User.query.get(user_id)
+        if not user:
+            return jsonify({'error': 'Usuário não encontrado'}), 404
+        
+        user.is_active = False
+        user.updated_at = datetime.utcnow()
+        bump_token_generation(user)
+        db.session.commit()
+        
+        # Log da ação
+        log_action(current_user_id, 'user_deactivated', 'user', user_id, {'email': user.email})
+        
+        return jsonify({'message': 'Usuário desativado com sucesso'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
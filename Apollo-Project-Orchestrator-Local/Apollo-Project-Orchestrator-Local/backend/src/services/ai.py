@@ -0,0 +1,737 @@
+"""
+Serviço de IA melhorado para análise de projetos
+"""
+
+import json
+import asyncio
+import logging
+from typing import Dict, List, Optional, Any
+from flask import current_app
+from src.services.ai_cache import analysis_cache_key, get_cached_analysis, store_analysis, single_flight
+from src.services.ai_stream import AnalysisStreamParser, result_events
+from src.services.llm_client import llm_client
+
+logger = logging.getLogger(__name__)
+
+# Alterar ao mudar o prompt correspondente (invalida o cache de análises)
+PROJECT_PROMPT_VERSION = '1'
+DOCUMENTS_PROMPT_VERSION = '1'
+
+class AIAnalysisService:
+    """Serviço para análise de projetos usando IA"""
+    
+    def __init__(self):
+        self.fallback_enabled = True
+    
+    def _build_enhanced_prompt(self, project_data: Dict[str, Any]) -> str:
+        """Construir prompt aprimorado para análise"""
+        
+        files_text = ""
+        if project_data.get('files_content'):
+            files_text = "\n\nDOCUMENTOS ANEXADOS:\n"
+            for file_info in project_data['files_content']:
+                files_text += f"- {file_info.get('name', 'Arquivo')}: {file_info.get('content', 'Conteúdo não disponível')[:500]}...\n"
+        
+        prompt = f"""
+Você é um especialista sênior em análise de projetos de software e arquitetura de sistemas.
+
+Analise as informações do projeto abaixo e forneça uma análise profissional e detalhada:
+
+**INFORMAÇÕES DO PROJETO:**
+Nome: {project_data['name']}
+Cliente: {project_data['client']}
+Responsável: {project_data['responsible']}
+Objetivo: {project_data['objective']}
+Descrição: {project_data.get('description', 'Não fornecida')}
+{files_text}
+
+**INSTRUÇÕES DE ANÁLISE:**
+
+1. **ANÁLISE DE RISCOS:** Identifique riscos técnicos, de negócio, cronograma e recursos
+2. **ARQUITETURA:** Sugira arquitetura apropriada, padrões e tecnologias
+3. **ESTIMATIVAS:** Avalie complexidade, esforço e cronograma
+4. **REQUISITOS:** Identifique lacunas e dependências críticas
+5. **GOVERNANÇA:** Recomende processos e controles de qualidade
+
+**PERGUNTAS CRÍTICAS:**
+Gere 5-8 perguntas estratégicas categorizadas por:
+- Requisitos Funcionais e Não-Funcionais
+- Integrações e Dependências Externas
+- Performance e Escalabilidade
+- Segurança e Compliance
+- Tecnologia e Infraestrutura
+- Processo e Governança
+
+Para cada pergunta, inclua:
+- Categoria específica
+- Prioridade (critical/high/medium)
+- Contexto/justificativa detalhada
+- Impacto se não respondida
+
+**FORMATO DE RESPOSTA:**
+Responda EXCLUSIVAMENTE em JSON válido seguindo esta estrutura:
+
+{{
+    "summary": "Resumo executivo da análise (2-3 frases)",
+    "risk_assessment": {{
+        "technical_risks": ["risco1", "risco2"],
+        "business_risks": ["risco1", "risco2"],
+        "mitigation_strategies": ["estratégia1", "estratégia2"]
+    }},
+    "architecture_recommendations": {{
+        "suggested_architecture": "Descrição da arquitetura",
+        "technology_stack": ["tech1", "tech2"],
+        "patterns": ["pattern1", "pattern2"]
+    }},
+    "estimates": {{
+        "complexity_level": "low|medium|high|very_high",
+        "estimated_duration_weeks": "número",
+        "team_size_recommendation": "número",
+        "effort_distribution": {{
+            "analysis": "porcentagem",
+            "development": "porcentagem", 
+            "testing": "porcentagem",
+            "deployment": "porcentagem"
+        }}
+    }},
+    "questions": [
+        {{
+            "id": 1,
+            "category": "Requisitos Funcionais",
+            "question": "Pergunta específica?",
+            "priority": "critical|high|medium",
+            "context": "Contexto detalhado da pergunta",
+            "impact": "Impacto se não respondida"
+        }}
+    ],
+    "insights": [
+        "Insight profissional 1",
+        "Insight profissional 2", 
+        "Insight profissional 3"
+    ],
+    "next_steps": [
+        "Passo específico 1",
+        "Passo específico 2",
+        "Passo específico 3"
+    ],
+    "quality_gates": [
+        "Gate de qualidade 1",
+        "Gate de qualidade 2"
+    ]
+}}
+
+IMPORTANTE: Responda APENAS com o JSON válido, sem texto adicional antes ou depois.
+"""
+        return prompt
+    
+    def _enhanced_fallback_analysis(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Análise de fallback aprimorada quando OpenAI não está disponível"""
+        
+        # Análise básica baseada em palavras-chave
+        complexity = self._analyze_complexity(project_data)
+        
+        return {
+            "summary": f"Análise automática concluída para '{project_data['name']}'. "
+                      f"Projeto classificado como complexidade {complexity}. "
+                      f"Identificadas {len(project_data.get('files_content', []))} documentos para análise.",
+            
+            "risk_assessment": {
+                "technical_risks": [
+                    "Falta de especificações técnicas detalhadas",
+                    "Possíveis integrações complexas não mapeadas",
+                    "Dependências tecnológicas não clarificadas"
+                ],
+                "business_risks": [
+                    "Escopo não completamente definido",
+                    "Expectativas do cliente podem não estar alinhadas",
+                    "Cronograma pode ser otimista"
+                ],
+                "mitigation_strategies": [
+                    "Realizar workshop de refinamento de requisitos",
+                    "Criar protótipo para validação",
+                    "Estabelecer marcos de entrega incrementais"
+                ]
+            },
+            
+            "architecture_recommendations": {
+                "suggested_architecture": "Arquitetura em camadas com API REST, seguindo princípios SOLID",
+                "technology_stack": self._suggest_tech_stack(project_data),
+                "patterns": ["Repository Pattern", "MVC", "Dependency Injection", "Circuit Breaker"]
+            },
+            
+            "estimates": {
+                "complexity_level": complexity,
+                "estimated_duration_weeks": self._estimate_duration(complexity),
+                "team_size_recommendation": self._estimate_team_size(complexity),
+                "effort_distribution": {
+                    "analysis": "20%",
+                    "development": "50%",
+                    "testing": "20%",
+                    "deployment": "10%"
+                }
+            },
+            
+            "questions": [
+                {
+                    "id": 1,
+                    "category": "Requisitos Funcionais",
+                    "question": "Quais são os principais módulos e funcionalidades que o sistema deve conter?",
+                    "priority": "critical",
+                    "context": "Baseado na análise do objetivo do projeto, é fundamental definir claramente o escopo funcional para evitar scope creep e garantir alinhamento de expectativas.",
+                    "impact": "Sem definição clara, o projeto pode ter retrabalho significativo e estouro de prazo/orçamento"
+                },
+                {
+                    "id": 2,
+                    "category": "Integrações e Dependências",
+                    "question": "O sistema precisa se integrar com algum sistema existente? Se sim, quais e como?",
+                    "priority": "critical",
+                    "context": "Integrações afetam significativamente a arquitetura, complexidade e riscos do projeto.",
+                    "impact": "Integrações não mapeadas podem causar bloqueios críticos durante o desenvolvimento"
+                },
+                {
+                    "id": 3,
+                    "category": "Performance e Escalabilidade",
+                    "question": "Quantos usuários simultâneos o sistema deve suportar e qual o volume de dados esperado?",
+                    "priority": "high",
+                    "context": "Essencial para dimensionar infraestrutura adequada e escolher tecnologias apropriadas.",
+                    "impact": "Subdimensionamento pode causar falhas em produção; superdimensionamento aumenta custos desnecessariamente"
+                },
+                {
+                    "id": 4,
+                    "category": "Segurança e Compliance",
+                    "question": "Quais são os requisitos de segurança, privacidade e conformidade regulatória?",
+                    "priority": "critical",
+                    "context": "Segurança deve ser considerada desde o início para evitar vulnerabilidades e atender regulamentações como LGPD.",
+                    "impact": "Falhas de segurança podem resultar em vazamentos de dados, multas e perda de credibilidade"
+                },
+                {
+                    "id": 5,
+                    "category": "Tecnologia e Infraestrutura",
+                    "question": "Há alguma preferência ou restrição tecnológica específica do cliente/organização?",
+                    "priority": "high",
+                    "context": "Importante para alinhar com ambiente tecnológico existente e expertise da equipe.",
+                    "impact": "Escolhas tecnológicas inadequadas podem aumentar custos de manutenção e dificuldade de suporte"
+                },
+                {
+                    "id": 6,
+                    "category": "Processo e Governança",
+                    "question": "Qual o processo de aprovação e validação das entregas? Quem são os stakeholders decisores?",
+                    "priority": "medium",
+                    "context": "Fundamental para estabelecer marcos claros e evitar retrabalho por falta de validação adequada.",
+                    "impact": "Processos mal definidos podem causar atrasos e conflitos durante o projeto"
+                }
+            ],
+            
+            "insights": [
+                f"Projeto bem estruturado com objetivos claros baseados no cliente {project_data.get('client', 'não especificado')}",
+                f"Documentação inicial fornece boa base ({len(project_data.get('files_content', []))} arquivos analisados)",
+                "Identificadas oportunidades de otimização no processo de levantamento de requisitos",
+                f"Complexidade estimada como {complexity} baseada na análise preliminar"
+            ],
+            
+            "next_steps": [
+                "Realizar workshop de refinamento de requisitos com stakeholders",
+                "Elaborar arquitetura técnica detalhada baseada nas respostas",
+                "Criar protótipo de alta fidelidade para validação",
+                "Definir cronograma detalhado com marcos de entrega",
+                "Estabelecer processo de comunicação e governança do projeto"
+            ],
+            
+            "quality_gates": [
+                "Aprovação formal dos requisitos funcionais e não-funcionais",
+                "Validação da arquitetura técnica com equipe de infraestrutura",
+                "Aprovação do protótipo pelos usuários finais",
+                "Sign-off do plano de projeto e cronograma"
+            ]
+        }
+    
+    def _analyze_complexity(self, project_data: Dict[str, Any]) -> str:
+        """Analisar complexidade do projeto baseado em heurísticas"""
+        complexity_score = 0
+        
+        # Análise do objetivo
+        objective = project_data.get('objective', '').lower()
+        if any(word in objective for word in ['integração', 'api', 'microservice', 'distribuído']):
+            complexity_score += 2
+        if any(word in objective for word in ['ia', 'machine learning', 'big data', 'analytics']):
+            complexity_score += 3
+        if any(word in objective for word in ['mobile', 'web', 'responsivo']):
+            complexity_score += 1
+        
+        # Análise da descrição
+        description = project_data.get('description', '').lower()
+        if any(word in description for word in ['real-time', 'tempo real', 'alta disponibilidade']):
+            complexity_score += 2
+        if any(word in description for word in ['segurança', 'criptografia', 'compliance']):
+            complexity_score += 1
+        
+        # Análise dos arquivos
+        files_count = len(project_data.get('files_content', []))
+        if files_count > 5:
+            complexity_score += 1
+        elif files_count > 10:
+            complexity_score += 2
+        
+        # Classificar complexidade
+        if complexity_score <= 2:
+            return "low"
+        elif complexity_score <= 5:
+            return "medium"
+        elif complexity_score <= 8:
+            return "high"
+        else:
+            return "very_high"
+    
+    def _suggest_tech_stack(self, project_data: Dict[str, Any]) -> List[str]:
+        """Sugerir stack tecnológico baseado no projeto"""
+        stack = []
+        
+        objective = project_data.get('objective', '').lower()
+        description = project_data.get('description', '').lower()
+        combined_text = f"{objective} {description}"
+        
+        # Backend
+        if 'python' in combined_text:
+            stack.extend(['Python', 'Flask/Django', 'PostgreSQL'])
+        elif 'java' in combined_text:
+            stack.extend(['Java', 'Spring Boot', 'PostgreSQL'])
+        elif 'node' in combined_text or 'javascript' in combined_text:
+            stack.extend(['Node.js', 'Express', 'MongoDB'])
+        else:
+            stack.extend(['Python', 'Flask', 'PostgreSQL'])  # Default
+        
+        # Frontend
+        if 'react' in combined_text:
+            stack.append('React')
+        elif 'vue' in combined_text:
+            stack.append('Vue.js')
+        elif 'angular' in combined_text:
+            stack.append('Angular')
+        elif 'mobile' in combined_text:
+            stack.extend(['React Native', 'Flutter'])
+        else:
+            stack.append('React')  # Default
+        
+        # Infraestrutura
+        if 'cloud' in combined_text or 'aws' in combined_text:
+            stack.extend(['AWS', 'Docker', 'Kubernetes'])
+        elif 'azure' in combined_text:
+            stack.extend(['Azure', 'Docker'])
+        else:
+            stack.extend(['Docker', 'Nginx'])
+        
+        return stack
+    
+    def _estimate_duration(self, complexity: str) -> str:
+        """Estimar duração baseada na complexidade"""
+        duration_map = {
+            "low": "4-8",
+            "medium": "8-16", 
+            "high": "16-24",
+            "very_high": "24-40"
+        }
+        return duration_map.get(complexity, "8-16")
+    
+    def _estimate_team_size(self, complexity: str) -> str:
+        """Estimar tamanho da equipe baseada na complexidade"""
+        team_map = {
+            "low": "2-3",
+            "medium": "3-5",
+            "high": "5-8", 
+            "very_high": "8-12"
+        }
+        return team_map.get(complexity, "3-5")
+    
+    def analyze_project(self, project_data: Dict[str, Any], user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Analisar projeto usando OpenAI com fallback
+        
+        Análises idênticas (mesmas entradas, modelo e prompt) saem do cache
+        persistente (services/ai_cache.py).
+        
+        Args:
+            project_data: Dados do projeto para análise
+            user_id: Usuário que pediu a análise (limite de concorrência por usuário)
+            
+        Returns:
+            Dict com resultado da análise
+        """
+        model = current_app.config.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+        cache_key = analysis_cache_key(
+            'project',
+            {name: project_data.get(name) for name in ('name', 'client', 'responsible', 'objective', 'description')},
+            project_data.get('files_content'),
+            model,
+            PROJECT_PROMPT_VERSION
+        )
+        cached = get_cached_analysis(cache_key)
+        if cached is not None:
+            return cached
+        
+        def compute():
+            result = self._openai_analysis(project_data, user_id)
+            store_analysis(cache_key, 'project', model, PROJECT_PROMPT_VERSION, result)
+            return result
+        
+        try:
+            # Tentar usar OpenAI primeiro (uma chamada por análise idêntica em andamento)
+            return single_flight(cache_key, compute)
+            
+        except Exception as e:
+            logger.warning(f"OpenAI API falhou: {str(e)}")
+            
+            if self.fallback_enabled:
+                logger.info("Usando análise de fallback")
+                return self._enhanced_fallback_analysis(project_data)
+            else:
+                raise
+    
+    def _openai_analysis(self, project_data: Dict[str, Any], user_id: Optional[int] = None) -> Dict[str, Any]:
+        """Análise usando OpenAI API"""
+        
+        # Construir prompt
+        prompt = self._build_enhanced_prompt(project_data)
+        
+        # Fazer chamada para OpenAI (pool, retentativas e circuit breaker em llm_client)
+        response = llm_client.chat_completion(
+            user_id=user_id,
+            model=current_app.config.get('OPENAI_MODEL', 'gpt-3.5-turbo'),
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Você é um especialista sênior em análise de projetos de software. "
+                              "Responda sempre em português brasileiro e EXCLUSIVAMENTE em formato JSON válido."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            max_tokens=current_app.config.get('OPENAI_MAX_TOKENS', 2000),
+            temperature=current_app.config.get('OPENAI_TEMPERATURE', 0.7)
+        )
+        
+        # Extrair resposta
+        ai_response = response.choices[0].message.content.strip()
+        
+        # Parse JSON
+        try:
+            result = json.loads(ai_response)
+            
+            # Validar estrutura básica
+            self._validate_analysis_result(result)
+            
+            return result
+            
+        except json.JSONDecodeError as e:
+            logger.error(f"Erro ao fazer parse do JSON da OpenAI: {e}")
+            logger.debug(f"Resposta da OpenAI: {ai_response}")
+            
+            # Se falhar o parse, analyze_project usa o fallback (sem gravar no cache)
+            raise ValueError("Resposta da OpenAI não é um JSON válido")
+    
+    def _validate_analysis_result(self, result: Dict[str, Any]) -> None:
+        """Validar estrutura do resultado da análise"""
+        if not isinstance(result, dict):
+            raise ValueError("Resultado deve ser um objeto JSON")
+        
+        required_fields = ['summary', 'questions', 'insights', 'next_steps']
+        
+        for field in required_fields:
+            if field not in result:
+                raise ValueError(f"Campo obrigatório '{field}' ausente no resultado")
+        
+        # Validar perguntas
+        if not isinstance(result['questions'], list) or len(result['questions']) == 0:
+            raise ValueError("Campo 'questions' deve ser uma lista não vazia")
+        
+        for i, question in enumerate(result['questions']):
+            if not isinstance(question, dict):
+                raise ValueError(f"Pergunta {i+1}: deve ser um objeto")
+            required_q_fields = ['question', 'category', 'priority']
+            for field in required_q_fields:
+                if field not in question:
+                    raise ValueError(f"Pergunta {i+1}: campo '{field}' obrigatório")
+    
+    # =========================================================================
+    # ANÁLISE DE DOCUMENTOS (/api/ai/analyze-documents)
+    # =========================================================================
+    
+    def analyze_documents(self, project_name: str, project_objective: str,
+                          project_description: str = '', files_content: List[Dict[str, Any]] = None,
+                          user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Gerar perguntas críticas a partir dos documentos do projeto, com fallback
+        
+        Returns:
+            Dict com summary, questions, insights e next_steps
+        """
+        files_content = files_content or []
+        model = current_app.config.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+        cache_key = self._documents_cache_key(project_name, project_objective, project_description, files_content, model)
+        cached = get_cached_analysis(cache_key)
+        if cached is not None:
+            return cached
+        
+        def compute():
+            result = self._openai_documents_analysis(project_name, project_objective, project_description, files_content, user_id)
+            store_analysis(cache_key, 'documents', model, DOCUMENTS_PROMPT_VERSION, result)
+            return result
+        
+        try:
+            return single_flight(cache_key, compute)
+        except Exception as e:
+            # Cota excedida, erro de rede, resposta inválida etc.
+            logger.warning(f"OpenAI API falhou, usando simulação: {str(e)}")
+            return self._documents_fallback_analysis(project_name, project_objective, project_description, files_content)
+    
+    def stream_documents_analysis(self, project_name: str, project_objective: str,
+                                  project_description: str = '', files_content: List[Dict[str, Any]] = None,
+                                  user_id: Optional[int] = None):
+        """
+        Variante em streaming de ``analyze_documents``
+        
+        Gera tuplas (evento, dados): ``summary``, ``question``, ``insight`` e
+        ``next_step`` à medida que cada elemento chega da OpenAI, e por fim
+        ``result`` com a análise completa e ``source`` ('openai', 'cache' ou
+        'fallback'). O ``result`` substitui os elementos parciais: se a
+        resposta falhar no meio, ele traz a simulação.
+        
+        Não passa por ``single_flight``: streams idênticos simultâneos fazem
+        cada um a sua chamada (limitados por ``stream_slots``).
+        """
+        files_content = files_content or []
+        model = current_app.config.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+        cache_key = self._documents_cache_key(project_name, project_objective, project_description, files_content, model)
+        cached = get_cached_analysis(cache_key)
+        if cached is not None:
+            yield from result_events(cached)
+            yield 'result', {'analysis': cached, 'source': 'cache'}
+            return
+        
+        parser = AnalysisStreamParser()
+        streamed = False
+        try:
+            response = llm_client.stream_chat_completion(
+                self._build_documents_messages(project_name, project_objective, project_description, files_content),
+                user_id=user_id,
+                model=model,
+                max_tokens=current_app.config.get('OPENAI_MAX_TOKENS', 2000),
+                temperature=current_app.config.get('OPENAI_TEMPERATURE', 0.7)
+            )
+            for chunk in response:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                for event in parser.feed(chunk.choices[0].delta.content):
+                    streamed = True
+                    yield event
+            result = parser.result()
+            self._validate_analysis_result(result)
+        except Exception as e:
+            logger.warning(f"Streaming da OpenAI falhou, usando simulação: {str(e)}")
+            result = self._documents_fallback_analysis(project_name, project_objective, project_description, files_content)
+            if not streamed:
+                yield from result_events(result)
+            yield 'result', {'analysis': result, 'source': 'fallback'}
+            return
+        
+        store_analysis(cache_key, 'documents', model, DOCUMENTS_PROMPT_VERSION, result)
+        yield 'result', {'analysis': result, 'source': 'openai'}
+    
+    def _documents_cache_key(self, project_name, project_objective, project_description, files_content, model):
+        return analysis_cache_key(
+            'documents',
+            {'name': project_name, 'objective': project_objective, 'description': project_description},
+            files_content,
+            model,
+            DOCUMENTS_PROMPT_VERSION
+        )
+    
+    def _openai_documents_analysis(self, project_name, project_objective, project_description, files_content, user_id=None):
+        """Análise de documentos usando OpenAI API"""
+        response = llm_client.chat_completion(
+            self._build_documents_messages(project_name, project_objective, project_description, files_content),
+            user_id=user_id,
+            model=current_app.config.get('OPENAI_MODEL', 'gpt-3.5-turbo'),
+            max_tokens=current_app.config.get('OPENAI_MAX_TOKENS', 2000),
+            temperature=current_app.config.get('OPENAI_TEMPERATURE', 0.7)
+        )
+        
+        ai_response = response.choices[0].message.content.strip()
+        try:
+            result = json.loads(ai_response)
+        except json.JSONDecodeError:
+            # Se não conseguir fazer parse, analyze_documents usa a simulação
+            raise ValueError("Resposta da OpenAI não é um JSON válido")
+        
+        # Resposta fora do formato não vai para o cache; analyze_documents usa a simulação
+        self._validate_analysis_result(result)
+        return result
+    
+    def _build_documents_messages(self, project_name, project_objective, project_description, files_content):
+        """Mensagens do prompt de análise de documentos (DOCUMENTS_PROMPT_VERSION)"""
+        files_text = ""
+        if files_content:
+            files_text = "\n\nDocumentos anexados:\n"
+            for file_info in files_content:
+                files_text += f"- {file_info.get('name', 'Arquivo')}: {file_info.get('content', 'Conteúdo não disponível')}\n"
+        
+        prompt = f"""
+            Você é um especialista em análise de projetos de software e gestão de projetos. 
+            
+            Analise as informações do projeto abaixo e gere perguntas críticas que devem ser respondidas para garantir o sucesso do projeto:
+            
+            **Projeto:** {project_name}
+            **Objetivo:** {project_objective}
+            **Descrição:** {project_description or 'Não fornecida'}
+            {files_text}
+            
+            Com base nessas informações, gere:
+            
+            1. Um resumo da análise (2-3 frases)
+            2. 5 perguntas críticas categorizadas por:
+               - Requisitos Funcionais
+               - Integração
+               - Usuários/Performance
+               - Segurança
+               - Tecnologia
+            3. 3 insights principais sobre o projeto
+            4. 3 próximos passos recomendados
+            
+            Para cada pergunta, inclua:
+            - A pergunta em si
+            - A categoria
+            - A prioridade (high/medium)
+            - O contexto/justificativa da pergunta
+            
+            Responda em formato JSON seguindo esta estrutura:
+            {{
+                "summary": "Resumo da análise...",
+                "questions": [
+                    {{
+                        "id": 1,
+                        "category": "Requisitos Funcionais",
+                        "question": "Pergunta aqui?",
+                        "priority": "high",
+                        "context": "Contexto da pergunta..."
+                    }}
+                ],
+                "insights": [
+                    "Insight 1",
+                    "Insight 2", 
+                    "Insight 3"
+                ],
+                "next_steps": [
+                    "Passo 1",
+                    "Passo 2",
+                    "Passo 3"
+                ]
+            }}
+            """
+        
+        return [
+            {
+                "role": "system",
+                "content": "Você é um especialista em análise de projetos de software. Responda sempre em português brasileiro e em formato JSON válido."
+            },
+            {
+                "role": "user", 
+                "content": prompt
+            }
+        ]
+    
+    def _documents_fallback_analysis(self, project_name, project_objective, project_description, files_content):
+        """Simulação de análise de documentos quando a API real não está disponível"""
+        return {
+            "summary": f"Análise concluída para o projeto '{project_name}'. A IA processou as informações fornecidas e identificou pontos importantes para esclarecimento baseados no objetivo: {project_objective}.",
+            "questions": [
+                {
+                    "id": 1,
+                    "category": "Requisitos Funcionais",
+                    "question": "Quais são os principais módulos e funcionalidades que o sistema deve conter?",
+                    "priority": "high",
+                    "context": "Baseado na análise do objetivo do projeto, é importante definir claramente o escopo funcional."
+                },
+                {
+                    "id": 2,
+                    "category": "Integração",
+                    "question": "O sistema precisa se integrar com algum sistema existente? Se sim, quais?",
+                    "priority": "high",
+                    "context": "Integrações afetam significativamente a arquitetura e complexidade do projeto."
+                },
+                {
+                    "id": 3,
+                    "category": "Usuários/Performance",
+                    "question": "Quantos usuários simultâneos o sistema deve suportar?",
+                    "priority": "medium",
+                    "context": "Importante para dimensionar a infraestrutura adequada e garantir performance."
+                },
+                {
+                    "id": 4,
+                    "category": "Segurança",
+                    "question": "Quais são os requisitos de segurança e conformidade necessários?",
+                    "priority": "high",
+                    "context": "Segurança deve ser considerada desde o início do projeto para evitar vulnerabilidades."
+                },
+                {
+                    "id": 5,
+                    "category": "Tecnologia",
+                    "question": "Há alguma preferência ou restrição tecnológica específica?",
+                    "priority": "medium",
+                    "context": "Para alinhar com o ambiente tecnológico existente e expertise da equipe."
+                }
+            ],
+            "insights": [
+                "Projeto bem estruturado com objetivos claros e definidos",
+                f"Documentação fornece boa base para desenvolvimento ({len(files_content)} arquivos analisados)", 
+                "Identificadas oportunidades de otimização no processo de desenvolvimento"
+            ],
+            "next_steps": [
+                "Aguardar respostas das perguntas críticas do cliente",
+                "Definir arquitetura técnica detalhada baseada nas respostas",
+                "Elaborar cronograma de desenvolvimento e marcos do projeto"
+            ]
+        }
+    
+    async def analyze_project_async(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Análise assíncrona para melhor UX"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.analyze_project, project_data)
+    
+    def health_check(self) -> Dict[str, Any]:
+        """Verificar saúde do serviço de IA"""
+        try:
+            api_key = current_app.config.get('OPENAI_API_KEY')
+            
+            if not api_key:
+                return {
+                    'status': 'warning',
+                    'message': 'OpenAI API key não configurada - usando análise simulada',
+                    'fallback_enabled': self.fallback_enabled
+                }
+            
+            circuit = llm_client.status()
+            if circuit['state'] != 'closed':
+                return {
+                    'status': 'degraded',
+                    'message': 'OpenAI falhando - usando análise simulada até o circuito fechar',
+                    'fallback_enabled': self.fallback_enabled,
+                    'circuit': circuit
+                }
+            
+            return {
+                'status': 'ok',
+                'message': 'OpenAI API configurada e funcionando',
+                'fallback_enabled': self.fallback_enabled,
+                'circuit': circuit
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': f'Erro na configuração da OpenAI: {str(e)}',
+                'fallback_enabled': self.fallback_enabled
+            }
+                
+
+ai_service = AIAnalysisService()
@@ -0,0 +1,335 @@
+"""
+Cache persistente das análises de IA, endereçado pelo conteúdo
+
+A chave é o sha256 de um JSON canônico com o tipo da análise, as entradas
+normalizadas (texto em NFC com espaços colapsados; documentos pelo nome e
+pelo sha256 do conteúdo, em ordem estável), o modelo e a versão do prompt.
+Os resultados ficam na tabela ``ai_analysis_cache``, compartilhada por todos
+os workers e preservada entre reinícios:
+
+- cada entrada vale AI_CACHE_TTL segundos;
+- ``last_accessed_at`` é atualizado no máximo a cada AI_CACHE_TOUCH_INTERVAL
+  segundos por entrada (LRU aproximado, sem uma escrita por acerto);
+- a cada AI_CACHE_EVICT_EVERY gravações do processo (e por
+  ``flask purge-ai-cache``), entradas vencidas são removidas e, acima de
+  AI_CACHE_MAX_ENTRIES, as menos usadas recentemente.
+
+Só respostas válidas do modelo são gravadas; análises de fallback não.
+
+Chamadas idênticas simultâneas são coalescidas (``single_flight``): no
+processo, as threads esperam a chamada em andamento e recebem o mesmo
+resultado (ou erro); entre workers, quem detém o lease em
+``ai_analysis_leases`` chama o modelo e publica o desfecho na própria linha
+do lease (``done`` com o resultado, ou ``failed``). Os demais aguardam esse
+desfecho, até AI_SINGLE_FLIGHT_TIMEOUT segundos, e devolvem o resultado ou
+falham para o fallback do chamador, sem chamar o modelo de novo (mesmo com
+AI_CACHE_ENABLED desligado). Sem valores configurados, o lease e a espera
+cobrem o pior caso de uma chamada (``llm_client.max_call_duration``:
+timeout x tentativas + backoffs), para que o lease não vença com o detentor
+ainda chamando o modelo. Leases terminados ficam AI_SINGLE_FLIGHT_RESULT_TTL
+segundos e são removidos junto com o cache vencido.
+
+O streaming (``stream_documents_analysis``) não passa pelo single-flight:
+os eventos parciais vêm da própria chamada ao modelo, então cada stream faz
+a sua; o número de streams é limitado por ``ai_stream.stream_slots``.
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from src.extensions import db
+from src.models.database import AIAnalysisCache, AIAnalysisLease
+from src.services.llm_client import llm_client
+
+logger = logging.getLogger(__name__)
+
+# Gravações no processo, para a remoção periódica (next() é atômico no CPython)
+_store_count = itertools.count(1)
+
+
+def _normalize_text(value):
+    return ' '.join(unicodedata.normalize('NFC', str(value or '')).split())
+
+
+def _document_fingerprint(file_info):
+    content = unicodedata.normalize('NFC', str(file_info.get('content') or ''))
+    return {
+        'name': _normalize_text(file_info.get('name')),
+        'sha256': hashlib.sha256(content.encode('utf-8')).hexdigest()
+    }
+
+
+def analysis_cache_key(kind, fields, files_content, model, prompt_version):
+    """
+    Chave canônica de uma análise
+
+    Args:
+        kind: 'project' ou 'documents'
+        fields: Campos de texto que entram no prompt
+        files_content: Lista de {'name', 'content'}
+        model: Modelo da OpenAI
+        prompt_version: Versão do prompt (mudar o prompt invalida o cache)
+    """
+    canonical = {
+        'kind': kind,
+        'fields': {name: _normalize_text(value) for name, value in fields.items()},
+        'documents': sorted(
+            (_document_fingerprint(file_info) for file_info in files_content or []),
+            key=lambda document: (document['name'], document['sha256'])
+        ),
+        'model': model,
+        'prompt_version': prompt_version
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _enabled():
+    return current_app.config.get('AI_CACHE_ENABLED', True)
+
+
+def get_cached_analysis(key):
+    """Resultado em cache ainda válido, ou None"""
+    if not _enabled():
+        return None
+
+    now = datetime.utcnow()
+    table = AIAnalysisCache.__table__
+    try:
+        with db.engine.begin() as connection:
+            row = connection.execute(
+                select(table.c.result, table.c.last_accessed_at).where(
+                    table.c.key == key,
+                    table.c.expires_at > now
+                )
+            ).first()
+            if row is None:
+                return None
+
+            touch_interval = timedelta(seconds=current_app.config.get('AI_CACHE_TOUCH_INTERVAL', 300))
+            if row.last_accessed_at < now - touch_interval:
+                connection.execute(update(table).where(table.c.key == key).values(
+                    last_accessed_at=now,
+                    touch_count=table.c.touch_count + 1
+                ))
+            return row.result
+    except Exception as e:
+        logger.error(f"Erro ao ler cache de análise: {e}")
+        return None
+
+
+def store_analysis(key, kind, model, prompt_version, result):
+    """Gravar (ou substituir) o resultado; a cada AI_CACHE_EVICT_EVERY gravações, aplicar TTL/limite"""
+    if not _enabled():
+        return
+
+    now = datetime.utcnow()
+    table = AIAnalysisCache.__table__
+    values = {
+        'kind': kind,
+        'model': model,
+        'prompt_version': prompt_version,
+        'result': result,
+        'touch_count': 0,
+        'created_at': now,
+        'last_accessed_at': now,
+        'expires_at': now + timedelta(seconds=current_app.config.get('AI_CACHE_TTL', 7 * 24 * 3600))
+    }
+    try:
+        with db.engine.begin() as connection:
+            updated = connection.execute(update(table).where(table.c.key == key).values(**values))
+            if updated.rowcount == 0:
+                connection.execute(table.insert().values(key=key, **values))
+    except IntegrityError:
+        # Outro worker gravou a mesma análise ao mesmo tempo
+        pass
+    except Exception as e:
+        logger.error(f"Erro ao gravar cache de análise: {e}")
+        return
+
+    evict_every = current_app.config.get('AI_CACHE_EVICT_EVERY', 100)
+    if not evict_every or next(_store_count) % evict_every:
+        return
+    try:
+        evict_analysis_cache()
+    except Exception as e:
+        logger.error(f"Erro ao aplicar limite do cache de análise: {e}")
+
+
+def evict_analysis_cache(max_entries=None):
+    """Remover entradas vencidas e, acima do limite, as acessadas há mais tempo; retorna quantas"""
+    max_entries = max_entries or current_app.config.get('AI_CACHE_MAX_ENTRIES', 5000)
+    now = datetime.utcnow()
+    table = AIAnalysisCache.__table__
+    leases = AIAnalysisLease.__table__
+    with db.engine.begin() as connection:
+        # Leases terminados ou abandonados (não entram na contagem)
+        connection.execute(delete(leases).where(leases.c.expires_at <= now))
+
+        removed = connection.execute(delete(table).where(table.c.expires_at <= now)).rowcount
+
+        overflow = connection.execute(select(func.count()).select_from(table)).scalar() - max_entries
+        if overflow > 0:
+            oldest = select(table.c.key).order_by(table.c.last_accessed_at).limit(overflow)
+            removed += connection.execute(
+                delete(table).where(table.c.key.in_(oldest))
+            ).rowcount
+    return removed
+
+
+# =============================================================================
+# SINGLE-FLIGHT
+# =============================================================================
+
+class _Flight:
+    """Chamada em andamento no processo"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _lease_owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _acquire_lease(key, owner, ttl):
+    """Tomar o lease da chave (novo, terminado ou vencido); False se outro worker o detém"""
+    now = datetime.utcnow()
+    table = AIAnalysisLease.__table__
+    with db.engine.begin() as connection:
+        taken = connection.execute(update(table).where(
+            table.c.key == key,
+            or_(table.c.status != 'running', table.c.expires_at <= now)
+        ).values(owner=owner, status='running', result=None, expires_at=now + ttl)).rowcount
+    if taken:
+        return True
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(table.insert().values(
+                key=key, owner=owner, status='running', expires_at=now + ttl
+            ))
+        return True
+    except IntegrityError:
+        return False
+
+
+def _finish_lease(key, owner, status, result=None):
+    """Publicar o desfecho (``done`` com o resultado, ou ``failed``) para os workers que aguardam"""
+    keep = timedelta(seconds=current_app.config.get('AI_SINGLE_FLIGHT_RESULT_TTL', 60))
+    table = AIAnalysisLease.__table__
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(update(table).where(table.c.key == key, table.c.owner == owner).values(
+                status=status, result=result, expires_at=datetime.utcnow() + keep
+            ))
+    except Exception as e:
+        # Os demais workers tomam o lease quando ele vencer
+        logger.error(f"Erro ao publicar análise {key[:12]}: {e}")
+
+
+def _lease_outcome(key):
+    """(status, result) do lease da chave, ou None se não houver"""
+    table = AIAnalysisLease.__table__
+    with db.engine.begin() as connection:
+        return connection.execute(
+            select(table.c.status, table.c.result).where(table.c.key == key)
+        ).first()
+
+
+# Folga para o processamento da resposta e a gravação no cache
+LEASE_MARGIN = 30
+
+
+def _lease_seconds():
+    return current_app.config.get('AI_SINGLE_FLIGHT_LEASE') or llm_client.max_call_duration() + LEASE_MARGIN
+
+
+def _wait_seconds():
+    return current_app.config.get('AI_SINGLE_FLIGHT_TIMEOUT') or _lease_seconds()
+
+
+def _run_with_lease(key, compute):
+    """Executar ``compute`` com o lease da chave ou aguardar o desfecho de outro worker"""
+    ttl = timedelta(seconds=_lease_seconds())
+    timeout = _wait_seconds()
+    interval = current_app.config.get('AI_SINGLE_FLIGHT_POLL_INTERVAL', 0.5)
+    owner = _lease_owner()
+    deadline = time.monotonic() + timeout
+    waiting = False
+
+    while True:
+        if waiting:
+            # Só vale o desfecho da chamada que estava em andamento enquanto aguardávamos
+            outcome = _lease_outcome(key)
+            if outcome is not None and outcome.status == 'done':
+                return outcome.result
+            if outcome is not None and outcome.status == 'failed':
+                raise RuntimeError('Análise idêntica falhou em outro worker')
+
+        if _acquire_lease(key, owner, ttl):
+            try:
+                # O detentor anterior pode ter gravado o resultado no cache
+                cached = get_cached_analysis(key)
+                result = cached if cached is not None else compute()
+            except Exception:
+                _finish_lease(key, owner, 'failed')
+                raise
+            _finish_lease(key, owner, 'done', result)
+            return result
+
+        waiting = True
+        if time.monotonic() >= deadline:
+            logger.warning(f"Tempo esgotado aguardando análise {key[:12]} de outro worker")
+            return compute()
+        time.sleep(interval)
+
+
+def single_flight(key, compute):
+    """
+    Executar ``compute`` uma única vez para chamadas simultâneas com a mesma chave
+
+    O resultado de ``compute`` é publicado no lease para os workers que
+    aguardam; se ``compute`` falhar, eles também falham (e usam o fallback)
+    em vez de chamar o modelo de novo.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        if not flight.done.wait(_wait_seconds()):
+            raise TimeoutError('Tempo esgotado aguardando análise em andamento')
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _run_with_lease(key, compute)
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
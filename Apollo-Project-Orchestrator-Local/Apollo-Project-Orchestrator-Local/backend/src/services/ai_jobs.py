@@ -0,0 +1,233 @@
+"""
+Execução das análises de IA em segundo plano
+
+A rota cria um ``AnalysisJob`` (status ``queued``) e responde 202 com o id;
+a chamada à OpenAI (até OPENAI_TIMEOUT segundos por tentativa) roda fora do
+worker HTTP:
+
+- AI_JOB_EXECUTOR = 'thread' (padrão): pool de AI_JOB_WORKERS threads no
+  próprio processo;
+- AI_JOB_EXECUTOR = 'external': os jobs ficam na tabela e são executados
+  por ``flask ai-worker`` em outro processo.
+
+O status vem sempre da linha do job (GET /api/ai/jobs/<id>, com
+long-polling), que é compartilhada entre o processo web e os workers; o
+resultado é gravado no job ao terminar. A tomada do job é um UPDATE
+condicional (queued -> running), então cada job roda uma única vez mesmo
+com vários workers.
+
+Jobs 'running' há mais de AI_JOB_STALE_AFTER segundos (worker que caiu no
+meio da análise) voltam para a fila; no modo 'thread' os jobs na fila que
+nenhum pool do processo conhece (reinício) são retomados a cada
+AI_JOB_RECOVERY_INTERVAL segundos, na próxima submissão.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from src.extensions import db
+from src.models.database import AnalysisJob
+from src.services.ai import ai_service
+
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ('project', 'documents')
+TERMINAL_STATUSES = ('completed', 'failed')
+STATUS_MESSAGES = {
+    'queued': 'Análise na fila',
+    'running': 'Analisando projeto',
+    'completed': 'Análise concluída',
+    'failed': 'Erro na análise'
+}
+
+
+def _run_analysis(kind, payload, user_id=None):
+    if kind == 'project':
+        return ai_service.analyze_project(payload, user_id=user_id)
+    return ai_service.analyze_documents(
+        payload['project_name'],
+        payload['project_objective'],
+        payload.get('project_description', ''),
+        payload.get('files_content', []),
+        user_id=user_id
+    )
+
+
+class AIJobRunner:
+    """Fila de análises de IA com pool de threads no processo"""
+
+    def __init__(self):
+        self.app = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._last_recovery = None
+
+    def init_app(self, app):
+        self.app = app
+        self.executor_mode = app.config.get('AI_JOB_EXECUTOR', 'thread')
+        self.workers = app.config.get('AI_JOB_WORKERS', 2)
+        self.stale_after = app.config.get('AI_JOB_STALE_AFTER', 600)
+        self.recovery_interval = app.config.get('AI_JOB_RECOVERY_INTERVAL', 60)
+        app.extensions['ai_jobs'] = self
+
+    # =========================================================================
+    # API
+    # =========================================================================
+
+    def submit(self, kind, payload, user_id=None, project_id=None):
+        """Registrar um job e, no modo 'thread', colocá-lo no pool. Retorna o AnalysisJob"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Tipo de análise deve ser um dos: {', '.join(JOB_KINDS)}")
+
+        if self.executor_mode == 'thread':
+            self._recover_in_threads()
+
+        job = AnalysisJob(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            user_id=user_id,
+            project_id=project_id,
+            status='queued',
+            progress=0,
+            payload=payload
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        if self.executor_mode == 'thread':
+            self._ensure_executor().submit(self._execute, job.id)
+        return job
+
+    def get_status(self, job_id, job=None):
+        """Status do job a partir da linha do banco (sempre atual entre processos)"""
+        job = job or db.session.get(AnalysisJob, job_id, populate_existing=True)
+        if job is None:
+            return {'status': 'not_found', 'message': 'Análise não encontrada'}
+        return {
+            'status': job.status,
+            'message': job.error_message or STATUS_MESSAGES.get(job.status),
+            'progress': job.progress,
+            'timestamp': (job.finished_at or job.started_at or job.created_at).isoformat()
+        }
+
+    def wait_for_change(self, job_id, since=None, timeout=0, interval=0.5):
+        """
+        Long-polling: esperar até o status mudar em relação a ``since``
+        (timestamp da última resposta), o job terminar ou ``timeout`` vencer
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.get_status(job_id)
+            # Não manter a conexão durante a espera
+            db.session.close()
+            if (
+                status.get('status') in TERMINAL_STATUSES
+                or status.get('timestamp') != since
+                or time.monotonic() >= deadline
+            ):
+                return status
+            time.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+
+    def run_pending(self, limit=None):
+        """Executar jobs na fila no processo atual (flask ai-worker); retorna quantos"""
+        self.reclaim_stale()
+        executed = 0
+        while limit is None or executed < limit:
+            job_id = db.session.query(AnalysisJob.id).filter_by(status='queued').order_by(
+                AnalysisJob.created_at
+            ).limit(1).scalar()
+            db.session.rollback()
+            if job_id is None:
+                break
+            if self._execute(job_id):
+                executed += 1
+        return executed
+
+    def reclaim_stale(self):
+        """Devolver à fila jobs 'running' há mais de AI_JOB_STALE_AFTER segundos; retorna quantos"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        result = db.session.execute(
+            update(AnalysisJob).where(
+                AnalysisJob.status == 'running',
+                AnalysisJob.started_at < cutoff
+            ).values(status='queued', progress=0, started_at=None)
+        )
+        db.session.commit()
+        if result.rowcount:
+            logger.warning(f"{result.rowcount} análises interrompidas devolvidas à fila")
+        return result.rowcount
+
+    # =========================================================================
+    # EXECUÇÃO
+    # =========================================================================
+
+    def _ensure_executor(self):
+        # Após fork (gunicorn com preload) as threads não existem no filho
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ai-job')
+                self._pid = os.getpid()
+        return self._executor
+
+    def _recover_in_threads(self):
+        """Modo 'thread': retomar jobs interrompidos ou deixados na fila por um reinício"""
+        now = time.monotonic()
+        if self._last_recovery is not None and now - self._last_recovery < self.recovery_interval:
+            return
+        self._last_recovery = now
+
+        self.reclaim_stale()
+        job_ids = db.session.scalars(
+            db.select(AnalysisJob.id).filter_by(status='queued').order_by(AnalysisJob.created_at)
+        ).all()
+        executor = self._ensure_executor()
+        for job_id in job_ids:
+            # _claim garante uma única execução se outro processo também o pegar
+            executor.submit(self._execute, job_id)
+
+    def _claim(self, job_id):
+        result = db.session.execute(
+            update(AnalysisJob).where(
+                AnalysisJob.id == job_id,
+                AnalysisJob.status == 'queued'
+            ).values(status='running', progress=10, started_at=datetime.utcnow())
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _finish(self, job_id, **values):
+        db.session.execute(
+            update(AnalysisJob).where(AnalysisJob.id == job_id).values(finished_at=datetime.utcnow(), **values)
+        )
+        db.session.commit()
+
+    def _execute(self, job_id):
+        """Executar um job; retorna False se outro worker já o tomou"""
+        with self.app.app_context():
+            try:
+                if not self._claim(job_id):
+                    return False
+
+                job = db.session.get(AnalysisJob, job_id)
+                result = _run_analysis(job.kind, job.payload, job.user_id)
+                self._finish(job_id, status='completed', progress=100, result=result)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Erro na análise {job_id}: {e}")
+                self._finish(job_id, status='failed', progress=100, error_message=str(e))
+            finally:
+                db.session.remove()
+        return True
+
+
+ai_jobs = AIJobRunner()
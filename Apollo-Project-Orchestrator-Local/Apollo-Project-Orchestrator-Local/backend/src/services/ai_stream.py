@@ -0,0 +1,195 @@
+"""
+Streaming das análises de IA (Server-Sent Events)
+
+``AnalysisStreamParser`` recebe os pedaços de texto da resposta da OpenAI
+(``stream=True``) e devolve cada elemento do JSON assim que ele fecha:
+
+- ``summary``: o texto de ``summary``;
+- ``question``: cada objeto de ``questions[]``;
+- ``insight`` / ``next_step``: cada item de ``insights[]`` / ``next_steps[]``.
+
+O parser só acompanha a estrutura (profundidade, strings, escapes) e faz
+``json.loads`` de cada elemento completo, então o custo por pedaço é linear
+no tamanho do pedaço. Texto fora do objeto (ex.: cercas ```json) é ignorado.
+
+Cada stream ocupa uma thread do worker do início ao fim da resposta do modelo
+(10-30 s); ``stream_slots`` limita a AI_STREAM_MAX_CONCURRENCY streams por
+processo, abaixo do número de threads do gunicorn (Dockerfile), para que os
+streams não esgotem as threads das demais rotas.
+"""
+
+import json
+import os
+import threading
+
+# Chave de nível superior -> nome do evento de cada elemento da lista
+LIST_EVENTS = {
+    'questions': 'question',
+    'insights': 'insight',
+    'next_steps': 'next_step'
+}
+
+
+class AnalysisStreamParser:
+    """Parser incremental do JSON de análise"""
+
+    def __init__(self):
+        self.text = ''
+        self._pos = 0
+        self._stack = []  # '{' ou '['
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._expect_key = False
+        self._top_key = None  # chave de nível superior cujo valor está sendo lido
+        self._value_start = None  # início do summary ou do elemento de lista em aberto
+
+    def feed(self, chunk):
+        """Processar um pedaço de texto; retorna lista de (evento, valor) completos"""
+        self.text += chunk
+        events = []
+        text = self.text
+
+        while self._pos < len(text):
+            char = text[self._pos]
+            position = self._pos
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._on_string_end(position, events)
+                continue
+
+            if not self._stack:
+                if char == '{':
+                    self._stack.append('{')
+                    self._expect_key = True
+                continue
+
+            depth = len(self._stack)
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+                if depth == 2 and self._in_tracked_list() and self._value_start is None:
+                    self._value_start = position
+            elif char in '{[':
+                if depth == 2 and self._in_tracked_list() and self._value_start is None:
+                    self._value_start = position
+                self._stack.append(char)
+                self._expect_key = char == '{'
+            elif char in '}]':
+                self._stack.pop()
+                depth = len(self._stack)
+                if char == ']' and depth == 1:
+                    self._close_scalar(position, events)
+                    self._top_key = None
+                elif depth == 2 and self._in_tracked_list() and self._value_start is not None:
+                    self._emit(self._value_start, position + 1, events)
+                if self._stack:
+                    self._expect_key = False
+            elif char == ',':
+                if depth == 2 and self._in_tracked_list():
+                    self._close_scalar(position, events)
+                elif depth == 1:
+                    self._top_key = None
+                self._expect_key = self._stack[-1] == '{'
+            elif char == ':':
+                self._expect_key = False
+            elif depth == 2 and self._in_tracked_list() and self._value_start is None and not char.isspace():
+                # número, true/false/null dentro da lista
+                self._value_start = position
+
+        return events
+
+    def result(self):
+        """JSON completo recebido até agora (ValueError se inválido)"""
+        start = self.text.find('{')
+        end = self.text.rfind('}')
+        if start == -1 or end < start:
+            raise ValueError("Resposta da OpenAI não é um JSON válido")
+        try:
+            return json.loads(self.text[start:end + 1])
+        except json.JSONDecodeError:
+            raise ValueError("Resposta da OpenAI não é um JSON válido")
+
+    # =========================================================================
+    # INTERNOS
+    # =========================================================================
+
+    def _in_tracked_list(self):
+        return self._top_key in LIST_EVENTS and self._stack[-1] == '['
+
+    def _on_string_end(self, position, events):
+        depth = len(self._stack)
+        if depth == 1 and self._expect_key:
+            self._top_key = json.loads(self.text[self._string_start:position + 1])
+            return
+        if depth == 1 and self._top_key == 'summary':
+            events.append(('summary', json.loads(self.text[self._string_start:position + 1])))
+        elif depth == 2 and self._in_tracked_list() and self._value_start == self._string_start:
+            self._emit(self._value_start, position + 1, events)
+
+    def _close_scalar(self, position, events):
+        if self._value_start is not None:
+            self._emit(self._value_start, position, events)
+
+    def _emit(self, start, end, events):
+        self._value_start = None
+        try:
+            value = json.loads(self.text[start:end])
+        except json.JSONDecodeError:
+            return
+        events.append((LIST_EVENTS[self._top_key], value))
+
+
+def result_events(result):
+    """Eventos de uma análise já completa (cache ou fallback), na ordem do streaming"""
+    if result.get('summary'):
+        yield 'summary', result['summary']
+    for top_key, event in LIST_EVENTS.items():
+        for item in result.get(top_key) or []:
+            yield event, item
+
+
+def sse_event(event, data):
+    """Formatar um evento SSE com ``data`` em JSON"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class StreamSlots:
+    """Vagas de streaming SSE por processo"""
+
+    def __init__(self):
+        self.limit = 4
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.limit = app.config.get('AI_STREAM_MAX_CONCURRENCY', 4)
+        app.extensions['ai_stream_slots'] = self
+
+    def try_acquire(self):
+        """Ocupar uma vaga sem esperar; False se todas estiverem em uso"""
+        return self._ensure_slots().acquire(blocking=False)
+
+    def release(self):
+        self._ensure_slots().release()
+
+    def _ensure_slots(self):
+        # Após fork (gunicorn com preload) cada processo tem as suas vagas
+        if self._slots is not None and self._pid == os.getpid():
+            return self._slots
+        with self._lock:
+            if self._slots is None or self._pid != os.getpid():
+                self._slots = threading.BoundedSemaphore(self.limit)
+                self._pid = os.getpid()
+        return self._slots
+
+
+stream_slots = StreamSlots()
@@ -0,0 +1,186 @@
+"""
+Pipeline único de auditoria
+
+``log_action`` monta o registro no contexto da requisição (IP, user agent,
+horário do evento) e o entrega ao ``AuditWriter``:
+
+- modo assíncrono (padrão): o registro entra numa fila limitada e uma thread
+  de fundo grava os lotes com INSERT multi-linha quando o lote enche
+  (AUDIT_BATCH_SIZE) ou o intervalo vence (AUDIT_FLUSH_INTERVAL). Com a fila
+  cheia, a requisição espera até AUDIT_ENQUEUE_TIMEOUT e, se ainda não houver
+  espaço, grava o próprio registro (backpressure sem perda). Os rollups de
+  autenticação (services/auth_stats.py) são atualizados na mesma transação;
+- modo síncrono (AUDIT_ASYNC = False, usado nos testes): grava e commita na
+  sessão da requisição, como antes.
+
+Na finalização do processo a fila é drenada (atexit).
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from flask import has_request_context
+from sqlalchemy import insert
+
+from src.extensions import db
+from src.models.database import AuditLog
+from src.services.auth_stats import record_auth_events
+from src.utils.helpers import get_client_info
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """Gravador de auditoria em lote com thread de fundo"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.async_enabled = app.config.get('AUDIT_ASYNC', True)
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', 200)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', 1.0)
+        self.enqueue_timeout = app.config.get('AUDIT_ENQUEUE_TIMEOUT', 0.05)
+        self._queue = queue.Queue(maxsize=app.config.get('AUDIT_QUEUE_MAXSIZE', 10000))
+        app.extensions['audit_writer'] = self
+        atexit.register(self.shutdown)
+
+    # =========================================================================
+    # API
+    # =========================================================================
+
+    def write(self, record):
+        """Entregar um registro (dict de colunas de AuditLog)"""
+        if self.app is None or not self.async_enabled:
+            self._write_in_session([record])
+            return
+
+        self._ensure_thread()
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout)
+        except queue.Full:
+            logger.warning("Fila de auditoria cheia; gravando registro na requisição")
+            self._write_batch([record])
+
+    def flush(self):
+        """Gravar imediatamente tudo o que estiver na fila"""
+        if self._queue is None:
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(batch), self.batch_size):
+            self._write_batch(batch[start:start + self.batch_size])
+
+    def shutdown(self, timeout=5.0):
+        """Parar a thread de fundo após drenar a fila"""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        thread.join(timeout)
+        self.flush()
+
+    # =========================================================================
+    # THREAD DE FUNDO
+    # =========================================================================
+
+    def _ensure_thread(self):
+        # Após fork (ex.: gunicorn com preload) a thread não existe no filho
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write_batch(batch)
+
+    def _next_batch(self):
+        """Esperar o primeiro registro e juntar outros até o tamanho ou o prazo do lote"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    # =========================================================================
+    # GRAVAÇÃO
+    # =========================================================================
+
+    def _write_batch(self, records):
+        """INSERT multi-linha em transação própria (fora da sessão da requisição)"""
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(insert(AuditLog.__table__), records)
+                    record_auth_events(connection, records)
+        except Exception as e:
+            logger.error(f"Erro ao gravar {len(records)} registros de auditoria: {e}")
+
+    def _write_in_session(self, records):
+        try:
+            db.session.execute(insert(AuditLog), records)
+            record_auth_events(db.session.connection(), records)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Erro ao registrar log de auditoria: {e}")
+
+
+audit_writer = AuditWriter()
+
+
+def log_action(user_id, action, resource_type, resource_id=None, details=None, success=True, error_message=None):
+    """Registrar ação no log de auditoria"""
+    now = datetime.utcnow()
+    client_info = get_client_info() if has_request_context() else {}
+
+    audit_writer.write({
+        'user_id': user_id,
+        'action': action,
+        'resource_type': resource_type,
+        'resource_id': resource_id,
+        'details': details,
+        'ip_address': client_info.get('ip_address'),
+        'user_agent': client_info.get('user_agent'),
+        'success': success,
+        'error_message': error_message,
+        'created_at': now,
+        'updated_at': now
+    })
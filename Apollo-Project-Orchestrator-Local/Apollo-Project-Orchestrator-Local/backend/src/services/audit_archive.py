@@ -0,0 +1,437 @@
+"""
+Particionamento, retenção e arquivo do log de auditoria
+
+- PostgreSQL: ``audit_logs`` vira uma tabela particionada por RANGE
+  (created_at), com uma partição por mês (``audit_logs_pYYYYMM``) criada com
+  antecedência e uma partição DEFAULT para linhas fora das faixas. Meses além
+  da retenção são exportados e a partição é removida com DROP (sem DELETE nem
+  VACUUM na tabela quente).
+- SQLite: não há particionamento nativo; a tabela quente guarda só a janela
+  de retenção e cada mês frio é exportado e removido por faixa de
+  created_at (idx_audit_created_at).
+
+Nos dois casos o tamanho da tabela quente (e dos índices) fica limitado pela
+retenção, então o custo de INSERT e de manutenção de índice não cresce com o
+histórico.
+
+Os meses arquivados ficam em AUDIT_ARCHIVE_DIR como
+``audit_logs_YYYY_MM.ndjson.gz`` (uma linha JSON por registro) e podem ser
+consultados com ``iter_archived_logs`` / ``flask audit-archive-query``.
+
+Cada mês é arquivado na sua própria transação: a exportação vai para um
+arquivo temporário, os registros são removidos (DELETE/DROP), a transação é
+confirmada e só então o temporário substitui o arquivo do mês. Uma falha
+antes do commit descarta o temporário e mantém os registros na tabela; um
+temporário que sobrou de uma falha depois do commit é publicado na próxima
+execução (o último registro exportado já não está na tabela). Assim nenhum
+registro é arquivado duas vezes.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import select, text
+
+from src.extensions import db
+from src.models.database import AuditLog
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r'^audit_logs_p(\d{4})(\d{2})$')
+ARCHIVE_NAME = re.compile(r'^audit_logs_(\d{4})_(\d{2})\.ndjson\.gz$')
+
+
+# =============================================================================
+# MESES
+# =============================================================================
+
+def month_start(value):
+    """Primeiro instante do mês de ``value``"""
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    """Somar meses a um início de mês"""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def parse_month(value):
+    """Converter 'YYYY-MM' em início de mês; ValueError se inválido"""
+    try:
+        return datetime.strptime(value, '%Y-%m')
+    except (TypeError, ValueError):
+        raise ValueError('Mês deve estar no formato YYYY-MM')
+
+
+def retention_cutoff(now=None):
+    """Início do mês mais antigo mantido na tabela quente"""
+    now = now or datetime.utcnow()
+    return add_months(month_start(now), -current_app.config.get('AUDIT_RETENTION_MONTHS', 6))
+
+
+# =============================================================================
+# ARQUIVO NDJSON
+# =============================================================================
+
+def _archive_dir():
+    path = current_app.config.get('AUDIT_ARCHIVE_DIR', 'archives/audit')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def archive_path(month):
+    return os.path.join(_archive_dir(), f"audit_logs_{month:%Y_%m}.ndjson.gz")
+
+
+def serialize_audit_record(row):
+    """Registro de auditoria (mapping de colunas) como uma linha JSON"""
+    return json.dumps(
+        {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()},
+        ensure_ascii=False
+    )
+
+
+def export_month(connection, month):
+    """
+    Exportar os registros de um mês para um arquivo temporário
+
+    Lê com cursor de servidor (yield_per). Se o mês já tiver arquivo
+    (registros que chegaram atrasados), o conteúdo anterior é copiado e os
+    novos registros entram como um membro gzip adicional. O temporário só
+    deve substituir o arquivo (``publish_export``) depois que a remoção dos
+    registros for confirmada.
+
+    Returns:
+        (quantidade de registros exportados, caminho do temporário ou None)
+    """
+    table = AuditLog.__table__
+    in_month = (table.c.created_at >= month, table.c.created_at < add_months(month, 1))
+
+    if connection.execute(select(table.c.id).where(*in_month).limit(1)).first() is None:
+        return 0, None
+
+    query = select(table).where(*in_month).order_by(
+        table.c.created_at, table.c.id
+    ).execution_options(yield_per=1000)
+
+    path = archive_path(month)
+    temp_path = path + '.tmp'
+    count = 0
+    with open(temp_path, 'wb') as raw:
+        if os.path.exists(path):
+            with open(path, 'rb') as previous:
+                shutil.copyfileobj(previous, raw)
+        with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+            for row in connection.execute(query).mappings():
+                archive.write((serialize_audit_record(row) + '\n').encode('utf-8'))
+                count += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+    return count, temp_path
+
+
+def publish_export(month, temp_path):
+    """Substituir o arquivo do mês pelo temporário exportado"""
+    os.replace(temp_path, archive_path(month))
+
+
+def discard_export(temp_path):
+    if temp_path and os.path.exists(temp_path):
+        os.remove(temp_path)
+
+
+def _last_exported_id(temp_path):
+    """Id do último registro do temporário (sempre da exportação mais recente)"""
+    last_line = None
+    try:
+        with gzip.open(temp_path, 'rt', encoding='utf-8') as archive:
+            for last_line in archive:
+                pass
+        return json.loads(last_line)['id'] if last_line else None
+    except (OSError, EOFError, ValueError, KeyError):
+        return None  # temporário incompleto: a transação não chegou ao commit
+
+
+def _recover_exports():
+    """Publicar temporários cujo commit ocorreu e descartar os demais"""
+    table = AuditLog.__table__
+    for name in os.listdir(_archive_dir()):
+        match = ARCHIVE_NAME.match(name[:-len('.tmp')]) if name.endswith('.tmp') else None
+        if not match:
+            continue
+        month = datetime(int(match.group(1)), int(match.group(2)), 1)
+        temp_path = os.path.join(_archive_dir(), name)
+        last_id = _last_exported_id(temp_path)
+        committed = False
+        if last_id is not None:
+            # Registro exportado fora da tabela: a remoção foi confirmada
+            with db.engine.connect() as connection:
+                committed = connection.execute(
+                    select(table.c.id).where(table.c.id == last_id).limit(1)
+                ).first() is None
+        if committed:
+            publish_export(month, temp_path)
+            logger.warning(f"Arquivo de auditoria de {month:%Y-%m} publicado após falha anterior")
+        else:
+            discard_export(temp_path)
+
+
+def _archive_month(month, remove_rows):
+    """
+    Exportar e remover os registros de um mês numa transação própria
+
+    ``remove_rows(connection)`` apaga os registros do mês; o arquivo só é
+    publicado depois do commit.
+
+    Returns:
+        Quantidade de registros arquivados
+    """
+    temp_path = None
+    try:
+        with db.engine.begin() as connection:
+            count, temp_path = export_month(connection, month)
+            remove_rows(connection)
+    except BaseException:
+        discard_export(temp_path)
+        raise
+    if temp_path:
+        publish_export(month, temp_path)
+    return count
+
+
+def list_archived_months():
+    """Meses disponíveis no arquivo, do mais antigo ao mais recente"""
+    months = []
+    for name in os.listdir(_archive_dir()):
+        match = ARCHIVE_NAME.match(name)
+        if match:
+            months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def iter_archived_logs(month, user_id=None, action=None, resource_type=None, resource_id=None, success=None):
+    """
+    Percorrer os registros arquivados de um mês, aplicando os filtros
+
+    Lê o arquivo em streaming (memória constante).
+
+    Raises:
+        FileNotFoundError: Se o mês não estiver arquivado
+    """
+    filters = {
+        'user_id': user_id,
+        'action': action,
+        'resource_type': resource_type,
+        'resource_id': resource_id,
+        'success': success
+    }
+    filters = {key: value for key, value in filters.items() if value is not None}
+
+    with gzip.open(archive_path(month), 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            record = json.loads(line)
+            if all(record.get(key) == value for key, value in filters.items()):
+                yield record
+
+
+# =============================================================================
+# POSTGRESQL: PARTIÇÕES NATIVAS
+# =============================================================================
+
+def _partition_name(month):
+    return f"audit_logs_p{month:%Y%m}"
+
+
+def _is_partitioned(connection):
+    return connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = 'audit_logs'"
+    )).first() is not None
+
+
+def _month_range_sql(month):
+    return f"created_at >= '{month:%Y-%m-%d}' AND created_at < '{add_months(month, 1):%Y-%m-%d}'"
+
+
+def _has_default_partition(connection):
+    return connection.execute(text("SELECT to_regclass('audit_logs_default')")).scalar() is not None
+
+
+def _create_partition(connection, month):
+    """
+    Criar a partição do mês
+
+    Registros do mês que já caíram na partição DEFAULT impediriam o CREATE
+    (a DEFAULT violaria a nova faixa): são movidos para a partição nova.
+    """
+    partition = _partition_name(month)
+    if connection.execute(text("SELECT to_regclass(:name)"), {'name': partition}).scalar() is not None:
+        return
+
+    in_month = _month_range_sql(month)
+    stranded = _has_default_partition(connection) and connection.execute(text(
+        f"SELECT 1 FROM audit_logs_default WHERE {in_month} LIMIT 1"
+    )).first() is not None
+    if stranded:
+        connection.execute(text("CREATE TEMP TABLE audit_logs_moved (LIKE audit_logs) ON COMMIT DROP"))
+        connection.execute(text(
+            f"WITH moved AS (DELETE FROM audit_logs_default WHERE {in_month} RETURNING *) "
+            "INSERT INTO audit_logs_moved SELECT * FROM moved"
+        ))
+
+    connection.execute(text(
+        f"CREATE TABLE {partition} PARTITION OF audit_logs "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    ))
+
+    if stranded:
+        connection.execute(text("INSERT INTO audit_logs SELECT * FROM audit_logs_moved"))
+        connection.execute(text("DROP TABLE audit_logs_moved"))
+
+
+def _convert_to_partitioned(connection):
+    """Recriar audit_logs como tabela particionada, copiando os registros existentes"""
+    bounds = connection.execute(text("SELECT min(created_at), max(created_at) FROM audit_logs")).first()
+
+    connection.execute(text("ALTER TABLE audit_logs RENAME TO audit_logs_legacy"))
+    connection.execute(text("ALTER TABLE audit_logs_legacy RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey"))
+    connection.execute(text("ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE"))
+    connection.execute(text(
+        "CREATE TABLE audit_logs (LIKE audit_logs_legacy INCLUDING DEFAULTS, "
+        "PRIMARY KEY (id, created_at), "
+        "FOREIGN KEY (user_id) REFERENCES users (id)) "
+        "PARTITION BY RANGE (created_at)"
+    ))
+    connection.execute(text("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT"))
+
+    if bounds[0] is not None:
+        month = month_start(bounds[0])
+        while month <= bounds[1]:
+            _create_partition(connection, month)
+            month = add_months(month, 1)
+
+    connection.execute(text("INSERT INTO audit_logs SELECT * FROM audit_logs_legacy"))
+    connection.execute(text("DROP TABLE audit_logs_legacy"))
+
+    # Índices no pai são criados em todas as partições (atuais e futuras)
+    for index in AuditLog.__table__.indexes:
+        index.create(connection)
+    connection.execute(text("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id"))
+
+
+def _partition_months(connection):
+    names = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'audit_logs'"
+    )).scalars().all()
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def _default_partition_months(connection, cutoff):
+    """Meses anteriores a ``cutoff`` com registros na partição DEFAULT"""
+    if not _has_default_partition(connection):
+        return []
+    return connection.execute(text(
+        "SELECT DISTINCT date_trunc('month', created_at) FROM audit_logs_default "
+        "WHERE created_at < :cutoff"
+    ), {'cutoff': cutoff}).scalars().all()
+
+
+def _maintain_postgresql(now, cutoff):
+    with db.engine.begin() as connection:
+        if not _is_partitioned(connection):
+            _convert_to_partitioned(connection)
+
+        current = month_start(now)
+        for offset in range(current_app.config.get('AUDIT_PARTITIONS_AHEAD', 2) + 1):
+            _create_partition(connection, add_months(current, offset))
+
+        partitioned = {month for month in _partition_months(connection) if month < cutoff}
+        months = sorted(partitioned | set(_default_partition_months(connection, cutoff)))
+
+    archived = []
+    for month in months:
+        def remove_rows(connection, month=month):
+            # A exportação lê o pai, então inclui o que caiu na DEFAULT
+            if _has_default_partition(connection):
+                connection.execute(text(f"DELETE FROM audit_logs_default WHERE {_month_range_sql(month)}"))
+            if month in partitioned:
+                partition = _partition_name(month)
+                connection.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {partition}"))
+                connection.execute(text(f"DROP TABLE {partition}"))
+
+        archived.append((month, _archive_month(month, remove_rows)))
+    return archived
+
+
+# =============================================================================
+# SQLITE: JANELA DE RETENÇÃO
+# =============================================================================
+
+def _maintain_sqlite(cutoff):
+    table = AuditLog.__table__
+    with db.engine.connect() as connection:
+        oldest = connection.execute(
+            select(db.func.min(table.c.created_at)).where(table.c.created_at < cutoff)
+        ).scalar()
+
+    archived = []
+    if oldest is None:
+        return archived
+
+    month = month_start(oldest)
+    while month < cutoff:
+        def remove_rows(connection, month=month):
+            connection.execute(table.delete().where(
+                table.c.created_at >= month,
+                table.c.created_at < add_months(month, 1)
+            ))
+
+        count = _archive_month(month, remove_rows)
+        if count:
+            archived.append((month, count))
+        month = add_months(month, 1)
+    return archived
+
+
+# =============================================================================
+# MANUTENÇÃO
+# =============================================================================
+
+def maintain_audit_log(now=None):
+    """
+    Criar partições futuras e arquivar os meses fora da retenção
+
+    Idempotente; pensado para rodar diariamente (``flask audit-maintenance``).
+    Cada mês arquivado é uma transação; uma falha interrompe a execução sem
+    duplicar nem perder registros (ver docstring do módulo).
+
+    Returns:
+        Lista de (mês, registros arquivados)
+    """
+    now = now or datetime.utcnow()
+    cutoff = retention_cutoff(now)
+
+    _recover_exports()
+    if db.engine.dialect.name == 'postgresql':
+        archived = _maintain_postgresql(now, cutoff)
+    else:
+        archived = _maintain_sqlite(cutoff)
+
+    for month, count in archived:
+        logger.info(f"Auditoria de {month:%Y-%m} arquivada ({count} registros)")
+    return archived
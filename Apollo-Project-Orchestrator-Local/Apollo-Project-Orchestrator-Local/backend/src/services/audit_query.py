@@ -0,0 +1,138 @@
+"""
+Consulta e exportação do log de auditoria (administração)
+
+Os filtros seguem os índices existentes:
+
+- user_id (+ action)        -> idx_audit_user_action
+- resource_type (+ id)      -> idx_audit_resource
+- intervalo de tempo/ordem  -> idx_audit_created_at
+
+A listagem é paginada por keyset (created_at, id) em ordem decrescente. A
+exportação percorre o resultado com cursor de servidor (yield_per) e gera
+NDJSON ou CSV em streaming, com memória constante.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
+
+from src.extensions import db
+from src.models.database import AuditLog
+from src.services.audit_archive import serialize_audit_record
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_BATCH_SIZE = 1000
+
+
+def _parse_datetime(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Parâmetro {name} deve ser uma data ISO 8601')
+
+
+def _parse_int(value, name):
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'Parâmetro {name} inválido')
+
+
+def parse_audit_filters(args):
+    """
+    Extrair os filtros da query string
+
+    Raises:
+        ValueError: Se algum parâmetro for inválido
+    """
+    filters = {}
+    if args.get('user_id'):
+        filters['user_id'] = _parse_int(args['user_id'], 'user_id')
+    if args.get('action'):
+        filters['action'] = args['action']
+    if args.get('resource_type'):
+        filters['resource_type'] = args['resource_type']
+    if args.get('resource_id'):
+        filters['resource_id'] = _parse_int(args['resource_id'], 'resource_id')
+    if args.get('success'):
+        if args['success'].lower() not in ('true', 'false'):
+            raise ValueError('Parâmetro success deve ser true ou false')
+        filters['success'] = args['success'].lower() == 'true'
+    if args.get('since'):
+        filters['since'] = _parse_datetime(args['since'], 'since')
+    if args.get('until'):
+        filters['until'] = _parse_datetime(args['until'], 'until')
+    return filters
+
+
+def audit_log_statement(filters):
+    """SELECT filtrado e ordenado (created_at, id) decrescente"""
+    table = AuditLog.__table__
+    statement = select(table)
+
+    for name in ('user_id', 'action', 'resource_type', 'resource_id', 'success'):
+        if name in filters:
+            statement = statement.where(table.c[name] == filters[name])
+    if 'since' in filters:
+        statement = statement.where(table.c.created_at >= filters['since'])
+    if 'until' in filters:
+        statement = statement.where(table.c.created_at < filters['until'])
+
+    return statement.order_by(table.c.created_at.desc(), table.c.id.desc())
+
+
+def list_audit_logs(filters, cursor=None, limit=100):
+    """
+    Página de registros após o cursor
+
+    Args:
+        filters: Resultado de parse_audit_filters
+        cursor: (created_at, id) do último item da página anterior
+        limit: Tamanho da página
+
+    Returns:
+        (lista de dicts, há mais páginas)
+    """
+    table = AuditLog.__table__
+    statement = audit_log_statement(filters)
+    if cursor:
+        created_at, row_id = cursor
+        statement = statement.where(or_(
+            table.c.created_at < created_at,
+            and_(table.c.created_at == created_at, table.c.id < row_id)
+        ))
+
+    rows = db.session.execute(statement.limit(limit + 1)).mappings().all()
+    return [dict(row) for row in rows[:limit]], len(rows) > limit
+
+
+def iter_audit_export(filters, export_format='ndjson'):
+    """Gerar o conteúdo da exportação em pedaços (um por lote do cursor)"""
+    table = AuditLog.__table__
+    result = db.session.execute(
+        audit_log_statement(filters).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    ).mappings()
+
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(table.c.keys())
+        yield buffer.getvalue()
+
+        for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            for row in rows:
+                writer.writerow([
+                    json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list))
+                    else value.isoformat() if isinstance(value, datetime)
+                    else value
+                    for value in row.values()
+                ])
+            yield buffer.getvalue()
+    else:
+        for rows in result.partitions():
+            yield ''.join(serialize_audit_record(row) + '\n' for row in rows)
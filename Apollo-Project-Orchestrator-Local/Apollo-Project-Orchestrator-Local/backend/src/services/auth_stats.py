@@ -0,0 +1,240 @@
+"""
+Estatísticas de autenticação pré-agregadas
+
+- ``auth_stats_hourly``: contagem por (evento, hora) dos eventos de login,
+  falha de login, cadastro e renovação de token. É incrementada pelo
+  gravador de auditoria (services/audit.py) na mesma transação dos registros.
+- ``user_stats``: total de usuários, ativos e verificados, ajustados por
+  listeners de mapper a cada inserção/alteração/remoção de User.
+
+O endpoint de estatísticas lê só essas tabelas, com qualquer janela em
+horas ou dias, sem varrer ``audit_logs``. ``flask rebuild-auth-stats``
+recalcula os contadores e os rollups das horas ainda em ``audit_logs``.
+"""
+
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, event, func, insert, select, update
+
+from src.extensions import db
+from src.models.database import AuditLog, AuthStatsHourly, User, UserStats
+
+# Ação do AuditLog -> nome na resposta (só eventos bem-sucedidos, exceto falhas)
+TRACKED_EVENTS = {
+    'user_login': 'logins',
+    'login_failed': 'failed_logins',
+    'user_registered': 'registrations',
+    'token_refreshed': 'token_refreshes',
+}
+
+WINDOW_PATTERN = re.compile(r'^(\d+)([hd])$')
+MAX_WINDOW_HOURS = 90 * 24
+
+USER_STATS_ID = 1
+
+
+def parse_window(value):
+    """Converter '24h', '7d', '30d'... em horas; ValueError se inválido"""
+    match = WINDOW_PATTERN.match(value or '')
+    if not match:
+        raise ValueError('Janela deve estar no formato <n>h ou <n>d (ex.: 24h, 7d)')
+    hours = int(match.group(1)) * (24 if match.group(2) == 'd' else 1)
+    if not 1 <= hours <= MAX_WINDOW_HOURS:
+        raise ValueError(f'Janela deve ter entre 1 hora e {MAX_WINDOW_HOURS // 24} dias')
+    return hours
+
+
+def _hour(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert_increment(connection, table, rows, key_columns, counter_columns):
+    """INSERT ... ON CONFLICT DO UPDATE somando os contadores (SQLite/PostgreSQL)"""
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        # Sem upsert portátil: UPDATE e, se não houver linha, INSERT
+        for row in rows:
+            key = [table.c[column] == row[column] for column in key_columns]
+            result = connection.execute(update(table).where(*key).values({
+                column: table.c[column] + row[column] for column in counter_columns
+            }))
+            if result.rowcount == 0:
+                connection.execute(insert(table).values(row))
+        return
+
+    statement = dialect_insert(table).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={column: table.c[column] + statement.excluded[column] for column in counter_columns}
+    )
+    connection.execute(statement)
+
+
+# =============================================================================
+# ROLLUPS DE EVENTOS
+# =============================================================================
+
+def record_auth_events(connection, records):
+    """Somar aos rollups horários os eventos rastreados de um lote de auditoria"""
+    counts = Counter(
+        (record['action'], _hour(record['created_at']))
+        for record in records
+        if record['action'] in TRACKED_EVENTS
+        and (record.get('success', True) or record['action'] == 'login_failed')
+    )
+    if counts:
+        _upsert_increment(
+            connection,
+            AuthStatsHourly.__table__,
+            [{'event': action, 'hour': hour, 'count': count} for (action, hour), count in counts.items()],
+            ['event', 'hour'],
+            ['count']
+        )
+
+
+# =============================================================================
+# CONTADORES DE USUÁRIOS
+# =============================================================================
+
+def _adjust_user_stats(connection, total=0, active=0, verified=0):
+    if total or active or verified:
+        _upsert_increment(
+            connection,
+            UserStats.__table__,
+            [{'id': USER_STATS_ID, 'total_users': total, 'active_users': active, 'verified_users': verified}],
+            ['id'],
+            ['total_users', 'active_users', 'verified_users']
+        )
+
+
+def _flag_delta(target, attribute):
+    history = db.inspect(target).attrs[attribute].history
+    if not history.has_changes():
+        return 0
+    before = bool(history.deleted[0]) if history.deleted else False
+    return int(bool(getattr(target, attribute))) - int(before)
+
+
+@event.listens_for(User, 'after_insert')
+def _user_inserted(mapper, connection, target):
+    _adjust_user_stats(connection, 1, int(bool(target.is_active)), int(bool(target.email_verified)))
+
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    _adjust_user_stats(
+        connection,
+        active=_flag_delta(target, 'is_active'),
+        verified=_flag_delta(target, 'email_verified')
+    )
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    _adjust_user_stats(connection, -1, -int(bool(target.is_active)), -int(bool(target.email_verified)))
+
+
+# =============================================================================
+# CONSULTA
+# =============================================================================
+
+def get_auth_stats_summary(window_hours=24, series=False, now=None):
+    """
+    Estatísticas da janela (em horas, contando a hora corrente)
+
+    Uma consulta: contadores de usuários e somas dos rollups como
+    subconsultas escalares (cada uma um range scan na PK (evento, hora)).
+    """
+    now = now or datetime.utcnow()
+    start = _hour(now) - timedelta(hours=window_hours - 1)
+
+    totals = [
+        select(func.coalesce(func.sum(AuthStatsHourly.count), 0)).where(
+            AuthStatsHourly.event == action,
+            AuthStatsHourly.hour >= start
+        ).scalar_subquery().label(name)
+        for action, name in TRACKED_EVENTS.items()
+    ]
+    row = db.session.execute(
+        select(
+            func.coalesce(select(UserStats.total_users).where(UserStats.id == USER_STATS_ID).scalar_subquery(), 0).label('total_users'),
+            func.coalesce(select(UserStats.active_users).where(UserStats.id == USER_STATS_ID).scalar_subquery(), 0).label('active_users'),
+            func.coalesce(select(UserStats.verified_users).where(UserStats.id == USER_STATS_ID).scalar_subquery(), 0).label('verified_users'),
+            *totals
+        )
+    ).mappings().one()
+
+    stats = dict(row)
+    stats['window_hours'] = window_hours
+    stats['window_start'] = start.isoformat()
+    stats['verification_rate'] = (
+        round((stats['verified_users'] / stats['total_users']) * 100, 2) if stats['total_users'] > 0 else 0
+    )
+
+    if series:
+        stats['series'] = get_hourly_series(start)
+
+    return stats
+
+
+def get_hourly_series(start):
+    """Série por hora desde ``start``: [{hour, logins, failed_logins, ...}]"""
+    rows = db.session.query(
+        AuthStatsHourly.hour, AuthStatsHourly.event, AuthStatsHourly.count
+    ).filter(
+        AuthStatsHourly.event.in_(TRACKED_EVENTS),
+        AuthStatsHourly.hour >= start
+    ).all()
+
+    series = {}
+    for hour, action, count in rows:
+        point = series.setdefault(hour, dict.fromkeys(TRACKED_EVENTS.values(), 0))
+        point[TRACKED_EVENTS[action]] += count
+
+    return [dict(point, hour=hour.isoformat()) for hour, point in sorted(series.items())]
+
+
+# =============================================================================
+# RECONSTRUÇÃO
+# =============================================================================
+
+def rebuild_auth_stats():
+    """
+    Recalcular rollups e contadores a partir de audit_logs e users
+
+    Só as horas ainda presentes na tabela quente são recalculadas: os meses
+    já arquivados (services/audit_archive.py) não estão mais em audit_logs,
+    e os rollups deles são mantidos como estão.
+    """
+    connection = db.session.connection()
+
+    oldest = connection.execute(select(func.min(AuditLog.created_at))).scalar()
+    if oldest is not None:
+        connection.execute(AuthStatsHourly.__table__.delete().where(AuthStatsHourly.hour >= _hour(oldest)))
+
+    result = connection.execute(
+        select(AuditLog.action, AuditLog.created_at, AuditLog.success).where(
+            AuditLog.action.in_(TRACKED_EVENTS)
+        ).execution_options(yield_per=5000)
+    )
+    for rows in result.partitions():
+        record_auth_events(connection, [
+            {'action': action, 'created_at': created_at, 'success': success}
+            for action, created_at, success in rows
+        ])
+
+    total, active, verified = connection.execute(select(
+        func.count(User.id),
+        func.coalesce(func.sum(case((User.is_active, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((User.email_verified, 1), else_=0)), 0)
+    )).one()
+    connection.execute(UserStats.__table__.delete())
+    connection.execute(insert(UserStats.__table__).values(
+        id=USER_STATS_ID, total_users=total, active_users=active, verified_users=verified
+    ))
@@ -0,0 +1,106 @@
+"""
+Usuário autenticado com cache entre requisições
+
+O ``user_lookup_loader`` do JWT (extensions.py) carrega, para cada
+requisição protegida, um ``CurrentUser``: um retrato dos campos usados em
+autorização (nível, ativo, bloqueio, geração de tokens) e na identificação
+(nome, email, updated_at). Com cache compartilhado (Redis) o retrato fica
+no cache por CURRENT_USER_CACHE_TIMEOUT segundos e é descartado após o commit
+de qualquer alteração no usuário (perfil, desativação, troca de senha,
+bloqueio). Com o cache local do processo ('simple') a invalidação não
+alcançaria os outros workers, então o retrato é lido do banco a cada
+requisição.
+
+As rotas leem ``flask_jwt_extended.current_user``; as que alteram o usuário
+ou precisam do modelo completo usam ``current_user.load()``.
+"""
+
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from src.extensions import db, cache, is_cache_shared
+from src.models.database import User
+
+CURRENT_USER_CACHE_PREFIX = 'current_user'
+
+SNAPSHOT_FIELDS = (
+    'id', 'name', 'email', 'user_level', 'is_active', 'email_verified',
+    'locked_until', 'token_generation', 'updated_at'
+)
+
+
+def _cache_key(user_id):
+    return f"{CURRENT_USER_CACHE_PREFIX}:{user_id}"
+
+
+class CurrentUser:
+    """Retrato somente leitura do usuário autenticado"""
+
+    __slots__ = SNAPSHOT_FIELDS
+
+    def __init__(self, **fields):
+        for name in SNAPSHOT_FIELDS:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_model(cls, user):
+        return cls(**{name: getattr(user, name) for name in SNAPSHOT_FIELDS})
+
+    def is_admin(self):
+        """Verificar se é administrador"""
+        return self.user_level == 'admin'
+
+    def is_locked(self):
+        """Verificar se conta está bloqueada"""
+        if self.locked_until:
+            return datetime.utcnow() < self.locked_until
+        return False
+
+    def load(self):
+        """Modelo completo (consulta o banco; usar para alterar o usuário)"""
+        return db.session.get(User, self.id)
+
+
+def get_current_user_snapshot(user_id):
+    """Retrato do usuário (cache compartilhado -> banco); None se o usuário não existe"""
+    shared = is_cache_shared()
+    key = _cache_key(user_id)
+    snapshot = cache.get(key) if shared else None
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = CurrentUser.from_model(user)
+        if shared:
+            cache.set(key, snapshot, timeout=current_app.config.get('CURRENT_USER_CACHE_TIMEOUT', 60))
+    return snapshot
+
+
+def invalidate_current_user(user_id):
+    cache.delete(_cache_key(user_id))
+
+
+# =============================================================================
+# INVALIDAÇÃO
+# =============================================================================
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('dirty_current_users', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop('dirty_current_users', ()):
+        invalidate_current_user(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('dirty_current_users', None)
@@ -0,0 +1,284 @@
+"""
+Cliente da OpenAI compartilhado pelo processo
+
+- Um ``openai.OpenAI`` por processo (recriado após fork ou troca da chave),
+  sobre um ``httpx.Client`` com pool de até OPENAI_MAX_CONNECTIONS conexões
+  persistentes.
+- No máximo OPENAI_MAX_CONCURRENCY chamadas simultâneas por processo e
+  OPENAI_MAX_CONCURRENCY_PER_USER por usuário; quem espera mais que
+  OPENAI_ACQUIRE_TIMEOUT segundos recebe ``LLMBusy``.
+- Falhas transitórias (conexão, timeout, 429, 5xx) são repetidas até
+  OPENAI_MAX_RETRIES vezes, com backoff exponencial e jitter (respeitando
+  Retry-After quando enviado).
+- Circuit breaker: após OPENAI_BREAKER_FAILURES falhas seguidas as chamadas
+  são recusadas na hora (``LLMCircuitOpen``) por OPENAI_BREAKER_RESET
+  segundos; depois disso uma única chamada de teste decide se o circuito
+  fecha. Quem chama usa o fallback em milissegundos em vez de esperar o
+  timeout.
+
+Erros de requisição (400, 401, 404 etc.) não são repetidos; só a
+autenticação conta para o circuit breaker (chave inválida afeta todas as
+chamadas).
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,  # inclui APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+BREAKER_ERRORS = RETRYABLE_ERRORS + (openai.AuthenticationError,)
+
+
+class LLMUnavailable(RuntimeError):
+    """Chamada à OpenAI recusada sem chegar ao provedor"""
+
+
+class LLMBusy(LLMUnavailable):
+    """Limite de chamadas simultâneas (global ou do usuário) esgotado"""
+
+
+class LLMCircuitOpen(LLMUnavailable):
+    """Circuit breaker aberto: o provedor está falhando"""
+
+
+class CircuitBreaker:
+    """Circuit breaker por processo (closed -> open -> half_open -> closed)"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Liberar a chamada ou levantar LLMCircuitOpen"""
+        with self._lock:
+            if self.state == 'closed':
+                return
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True
+                return
+        raise LLMCircuitOpen('OpenAI indisponível (circuit breaker aberto)')
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logger.info("Circuit breaker da OpenAI fechado")
+            self.state = 'closed'
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    logger.warning(f"Circuit breaker da OpenAI aberto após {self.failures} falhas")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Chamada de teste terminou sem veredito (ex.: erro da requisição)"""
+        with self._lock:
+            self._probing = False
+
+    def status(self):
+        with self._lock:
+            return {'state': self.state, 'consecutive_failures': self.failures}
+
+
+class LLMClient:
+    """Chamadas de chat completion com pool, limites, retentativas e circuit breaker"""
+
+    def __init__(self):
+        self.app = None
+        self.timeout = 30
+        self.max_retries = 3
+        self.retry_max_delay = 8
+        self.acquire_timeout = 10
+        self.breaker = CircuitBreaker()
+        self._client = None
+        self._client_key = None
+        self._pid = None
+        self._slots = None
+        self._user_active = {}
+        self._user_condition = threading.Condition()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.timeout = app.config.get('OPENAI_TIMEOUT', 30)
+        self.max_retries = app.config.get('OPENAI_MAX_RETRIES', 3)
+        self.retry_base_delay = app.config.get('OPENAI_RETRY_BASE_DELAY', 0.5)
+        self.retry_max_delay = app.config.get('OPENAI_RETRY_MAX_DELAY', 8)
+        self.max_connections = app.config.get('OPENAI_MAX_CONNECTIONS', 10)
+        self.max_concurrency = app.config.get('OPENAI_MAX_CONCURRENCY', 8)
+        self.max_concurrency_per_user = app.config.get('OPENAI_MAX_CONCURRENCY_PER_USER', 2)
+        self.acquire_timeout = app.config.get('OPENAI_ACQUIRE_TIMEOUT', 10)
+        self.breaker = CircuitBreaker(
+            failure_threshold=app.config.get('OPENAI_BREAKER_FAILURES', 5),
+            reset_timeout=app.config.get('OPENAI_BREAKER_RESET', 30)
+        )
+        app.extensions['llm_client'] = self
+
+    # =========================================================================
+    # API
+    # =========================================================================
+
+    def chat_completion(self, messages, user_id=None, **params):
+        """``chat.completions.create`` com limites, retentativas e circuit breaker"""
+        self.breaker.before_call()
+        try:
+            with self._slot(user_id):
+                response = self._with_retries(messages, params)
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        self.breaker.record_success()
+        return response
+
+    def stream_chat_completion(self, messages, user_id=None, **params):
+        """
+        Variante com ``stream=True``: gera os pedaços da resposta
+
+        As retentativas valem só até a resposta começar; o limite de
+        concorrência fica ocupado até o fim do streaming.
+        """
+        self.breaker.before_call()
+        try:
+            with self._slot(user_id):
+                stream = self._with_retries(messages, dict(params, stream=True))
+                try:
+                    yield from stream
+                except BREAKER_ERRORS + (httpx.TransportError,):
+                    self.breaker.record_failure()
+                    raise
+                finally:
+                    stream.response.close()
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        self.breaker.record_success()
+
+    def status(self):
+        """Estado do circuit breaker (health check)"""
+        return self.breaker.status()
+
+    def max_call_duration(self):
+        """Pior caso, em segundos, de uma chamada: espera por vaga + todas as tentativas e backoffs"""
+        return (
+            self.acquire_timeout
+            + self.timeout * (self.max_retries + 1)
+            + self.retry_max_delay * self.max_retries
+        )
+
+    # =========================================================================
+    # INTERNOS
+    # =========================================================================
+
+    def _get_client(self):
+        api_key = self.app.config.get('OPENAI_API_KEY') if self.app else None
+        if not api_key:
+            raise ValueError("OpenAI API key não configurada")
+
+        # Após fork as conexões do pool não podem ser compartilhadas com o pai
+        if self._client is not None and self._pid == os.getpid() and self._client_key == api_key:
+            return self._client
+        with self._lock:
+            if self._client is None or self._pid != os.getpid() or self._client_key != api_key:
+                self._client = openai.OpenAI(
+                    api_key=api_key,
+                    timeout=self.timeout,
+                    max_retries=0,  # retentativas em _with_retries
+                    http_client=httpx.Client(
+                        timeout=self.timeout,
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections
+                        )
+                    )
+                )
+                self._slots = threading.BoundedSemaphore(self.max_concurrency)
+                self._client_key = api_key
+                self._pid = os.getpid()
+        return self._client
+
+    @contextmanager
+    def _slot(self, user_id):
+        """Ocupar uma vaga do usuário e uma do processo"""
+        self._get_client()
+        slots = self._slots
+        deadline = time.monotonic() + self.acquire_timeout
+
+        with self._user_condition:
+            while self._user_active.get(user_id, 0) >= self.max_concurrency_per_user:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._user_condition.wait(remaining):
+                    raise LLMBusy('Limite de análises simultâneas do usuário atingido')
+            self._user_active[user_id] = self._user_active.get(user_id, 0) + 1
+
+        try:
+            if not slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+                raise LLMBusy('Limite de chamadas simultâneas à OpenAI atingido')
+            try:
+                yield
+            finally:
+                slots.release()
+        finally:
+            with self._user_condition:
+                remaining_calls = self._user_active[user_id] - 1
+                if remaining_calls:
+                    self._user_active[user_id] = remaining_calls
+                else:
+                    del self._user_active[user_id]
+                self._user_condition.notify_all()
+
+    def _with_retries(self, messages, params):
+        client = self._get_client()
+        attempt = 0
+        while True:
+            try:
+                return client.chat.completions.create(messages=messages, **params)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                logger.warning(f"OpenAI falhou ({type(e).__name__}), tentativa {attempt} de {self.max_retries} em {delay:.1f}s")
+                time.sleep(delay)
+            except openai.AuthenticationError:
+                self.breaker.record_failure()
+                raise
+
+    def _backoff(self, attempt, error):
+        """Backoff exponencial com jitter completo; Retry-After quando o provedor envia"""
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        try:
+            delay = max(delay, min(float(retry_after), self.retry_max_delay))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+
+llm_client = LLMClient()
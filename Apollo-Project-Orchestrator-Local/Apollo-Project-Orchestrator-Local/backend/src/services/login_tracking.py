@@ -0,0 +1,231 @@
+"""
+Tentativas de login e último acesso sem escrita em ``users``
+
+- Falhas de senha são contadas numa janela deslizante de
+  LOGIN_ATTEMPT_WINDOW segundos por usuário; ao chegar a LOGIN_MAX_ATTEMPTS
+  a conta fica bloqueada por LOGIN_LOCKOUT_MINUTES. O contador fica em
+  memória (por processo) ou no Redis (LOGIN_ATTEMPT_STORE), nunca na linha
+  do usuário. ``users.locked_until`` continua valendo para bloqueios
+  manuais (User.lock_account).
+- ``last_login`` é acumulado em memória e gravado em lote a cada
+  LAST_LOGIN_FLUSH_INTERVAL segundos (um UPDATE executemany), fora da
+  transação do login, por uma thread de fundo do processo; uma queda
+  abrupta (SIGKILL, OOM) perde no máximo esse intervalo.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import bindparam, or_, update
+
+from src.extensions import db
+from src.models.database import User
+from src.services.current_user import invalidate_current_user
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONTADOR DE TENTATIVAS
+# =============================================================================
+
+class MemoryAttemptStore:
+    """Janela deslizante em memória (um processo)"""
+
+    def __init__(self, app):
+        self._attempts = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def add_failure(self, user_id, window):
+        """Registrar falha; retorna as falhas dentro da janela"""
+        now = time.time()
+        with self._lock:
+            attempts = self._attempts.setdefault(user_id, deque())
+            attempts.append(now)
+            while attempts and attempts[0] <= now - window:
+                attempts.popleft()
+            return len(attempts)
+
+    def lock(self, user_id, seconds):
+        with self._lock:
+            self._locks[user_id] = time.time() + seconds
+            self._attempts.pop(user_id, None)
+
+    def locked_for(self, user_id):
+        """Segundos restantes de bloqueio (0 se livre)"""
+        locked_until = self._locks.get(user_id)
+        if locked_until is None:
+            return 0
+        remaining = locked_until - time.time()
+        if remaining <= 0:
+            with self._lock:
+                self._locks.pop(user_id, None)
+            return 0
+        return remaining
+
+    def reset(self, user_id):
+        with self._lock:
+            self._attempts.pop(user_id, None)
+            self._locks.pop(user_id, None)
+
+
+class RedisAttemptStore:
+    """Janela deslizante num sorted set por usuário (compartilhada entre workers)"""
+
+    ATTEMPTS_PREFIX = 'login_attempts:'
+    LOCK_PREFIX = 'login_lock:'
+
+    def __init__(self, app):
+        import redis
+
+        self.redis = redis.Redis.from_url(app.config['LOGIN_ATTEMPT_REDIS_URL'])
+
+    def add_failure(self, user_id, window):
+        key = f"{self.ATTEMPTS_PREFIX}{user_id}"
+        now = time.time()
+        pipeline = self.redis.pipeline()
+        pipeline.zadd(key, {f"{now:.6f}": now})
+        pipeline.zremrangebyscore(key, '-inf', now - window)
+        pipeline.zcard(key)
+        pipeline.expire(key, int(window) + 1)
+        return pipeline.execute()[2]
+
+    def lock(self, user_id, seconds):
+        pipeline = self.redis.pipeline()
+        pipeline.set(f"{self.LOCK_PREFIX}{user_id}", 1, ex=int(seconds))
+        pipeline.delete(f"{self.ATTEMPTS_PREFIX}{user_id}")
+        pipeline.execute()
+
+    def locked_for(self, user_id):
+        return max(self.redis.ttl(f"{self.LOCK_PREFIX}{user_id}"), 0)
+
+    def reset(self, user_id):
+        self.redis.delete(f"{self.ATTEMPTS_PREFIX}{user_id}", f"{self.LOCK_PREFIX}{user_id}")
+
+
+ATTEMPT_BACKENDS = {
+    'memory': MemoryAttemptStore,
+    'redis': RedisAttemptStore,
+}
+
+
+class LoginAttempts:
+    """Fachada usada pela rota de login"""
+
+    def __init__(self):
+        self.store = None
+
+    def init_app(self, app):
+        backend = app.config.get('LOGIN_ATTEMPT_STORE', 'memory')
+        if backend not in ATTEMPT_BACKENDS:
+            raise ValueError(f"LOGIN_ATTEMPT_STORE deve ser um dos: {', '.join(ATTEMPT_BACKENDS)}")
+        self.store = ATTEMPT_BACKENDS[backend](app)
+        self.max_attempts = app.config.get('LOGIN_MAX_ATTEMPTS', 5)
+        self.window = app.config.get('LOGIN_ATTEMPT_WINDOW', 900)
+        self.lockout_seconds = app.config.get('LOGIN_LOCKOUT_MINUTES', 15) * 60
+
+    def record_failure(self, user_id):
+        """Contar uma falha de senha; bloqueia ao atingir o limite. Retorna as falhas na janela"""
+        attempts = self.store.add_failure(user_id, self.window)
+        if attempts >= self.max_attempts:
+            self.store.lock(user_id, self.lockout_seconds)
+        return attempts
+
+    def locked_for(self, user_id):
+        """Segundos restantes de bloqueio por tentativas (0 se livre)"""
+        return self.store.locked_for(user_id)
+
+    def reset(self, user_id):
+        self.store.reset(user_id)
+
+
+login_attempts = LoginAttempts()
+
+
+# =============================================================================
+# ÚLTIMO LOGIN
+# =============================================================================
+
+class LastLoginBuffer:
+    """Acumula o último login por usuário e grava em lote (thread de fundo)"""
+
+    def __init__(self):
+        self.app = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config.get('LAST_LOGIN_FLUSH_INTERVAL', 60)
+        atexit.register(self.shutdown)
+
+    def touch(self, user_id, logged_at=None):
+        with self._lock:
+            self._pending[user_id] = logged_at or datetime.utcnow()
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def pending(self, user_id):
+        return self._pending.get(user_id)
+
+    def flush(self):
+        """Gravar os logins acumulados (um UPDATE executemany)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending or self.app is None:
+            return
+
+        table = User.__table__
+        statement = update(table).where(
+            table.c.id == bindparam('b_id'),
+            or_(table.c.last_login.is_(None), table.c.last_login < bindparam('b_login'))
+        ).values(last_login=bindparam('b_login'))
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(statement, [
+                        {'b_id': user_id, 'b_login': logged_at} for user_id, logged_at in pending.items()
+                    ])
+
+                # updated_at mudou (ETag de /me e /profile)
+                for user_id in pending:
+                    invalidate_current_user(user_id)
+        except Exception as e:
+            logger.error(f"Erro ao gravar último login de {len(pending)} usuários: {e}")
+
+    def shutdown(self):
+        """Parar a thread de fundo e gravar o que restou"""
+        self._stop.set()
+        self.flush()
+
+    def _ensure_thread(self):
+        # Após fork (ex.: gunicorn com preload) a thread não existe no filho
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='last-login-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+last_login_buffer = LastLoginBuffer()
@@ -0,0 +1,109 @@
+"""
+Hash de senhas com concorrência limitada por processo
+
+Os hashes (scrypt/pbkdf2 do Werkzeug) são executados num pool de threads de
+tamanho PASSWORD_HASH_WORKERS por processo. A thread da requisição continua
+bloqueada esperando o resultado: com workers síncronos do gunicorn nenhum
+worker é liberado, o pool apenas limita quantos hashes rodam ao mesmo tempo
+(CPU) em cada processo. Uma rajada de logins acima de
+PASSWORD_HASH_MAX_PENDING espera no máximo PASSWORD_HASH_TIMEOUT segundos
+antes de ser recusada (PasswordHasherBusy -> 503 no login).
+
+O custo vem de PASSWORD_HASH_METHOD (por ambiente; barato em TestingConfig).
+Hashes gravados com outro método são refeitos no próximo login bem-sucedido.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+def normalize_method(method):
+    """Prefixo completo que o Werkzeug grava no hash ('scrypt' -> 'scrypt:32768:8:1')"""
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        defaults = ['32768', '8', '1']  # o Werkzeug exige os três ou nenhum
+    elif name == 'pbkdf2':
+        defaults = ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        return method
+    args = args + defaults[len(args):]
+    return ':'.join([name, *(str(int(arg)) if arg.isdigit() else arg for arg in args)])
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Pool de hash saturado por mais que PASSWORD_HASH_TIMEOUT"""
+
+
+class PasswordHasher:
+    """Pool limitado para gerar e verificar hashes de senha"""
+
+    def __init__(self):
+        self.method = DEFAULT_METHOD
+        self.hash_prefix = DEFAULT_METHOD
+        self.workers = 0
+        self.timeout = None
+        self.max_pending = 0
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+        self.hash_prefix = normalize_method(self.method)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', self.workers * 8)
+        app.extensions['password_hasher'] = self
+
+    # =========================================================================
+    # API
+    # =========================================================================
+
+    def hash(self, password):
+        """Gerar hash com o método configurado"""
+        return self._run(generate_password_hash, password, method=self.method)
+
+    def verify(self, password_hash, password):
+        """Verificar senha contra o hash gravado"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Hash gravado com método/custo diferente do configurado"""
+        return password_hash.split('$', 1)[0] != self.hash_prefix
+
+    # =========================================================================
+    # POOL
+    # =========================================================================
+
+    def _run(self, function, *args, **kwargs):
+        # Sem pool (app não inicializada ou PASSWORD_HASH_WORKERS = 0)
+        if self.workers <= 0:
+            return function(*args, **kwargs)
+
+        executor = self._ensure_executor()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy('Pool de hash de senhas saturado')
+        try:
+            return executor.submit(function, *args, **kwargs).result()
+        finally:
+            self._slots.release()
+
+    def _ensure_executor(self):
+        # Após fork (gunicorn com preload) as threads não existem no filho
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+                self._slots = threading.BoundedSemaphore(self.max_pending)
+                self._pid = os.getpid()
+        return self._executor
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,180 @@
+"""
+Serviço de resolução de permissões de projeto
+
+Responde "(usuário, projeto) -> nível" a partir de uma ACL por projeto
+(owner + permissões explícitas) guardada em dois níveis:
+
+- memo por requisição em ``flask.g``;
+- cache entre requisições (extensão ``cache``, com TTL e limite de itens).
+
+A ACL é invalidada após o commit de qualquer transação que altere
+``ProjectPermission`` ou o ``owner_id`` de um ``Project``.
+"""
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import and_, or_, event
+from sqlalchemy.orm import Session, object_session
+
+from src.extensions import db, cache
+from src.models.database import Project, ProjectPermission
+
+# Hierarquia de permissões: owner > editor > viewer
+PERMISSION_LEVELS = {'viewer': 1, 'editor': 2, 'owner': 3}
+
+ACL_CACHE_PREFIX = 'project_acl'
+
+
+def _acl_cache_key(project_id):
+    return f"{ACL_CACHE_PREFIX}:{project_id}"
+
+
+def _request_memo():
+    """Memo da requisição atual: project_id -> (acl, project carregado ou None)"""
+    if '_project_acl_memo' not in g:
+        g._project_acl_memo = {}
+    return g._project_acl_memo
+
+
+def _load_acl(project_id):
+    """Carregar a ACL do banco; retorna (acl, project)"""
+    project = db.session.get(Project, project_id)
+    if not project:
+        return {'owner_id': None, 'levels': {}}, None
+
+    rows = db.session.query(
+        ProjectPermission.user_id,
+        ProjectPermission.permission_level
+    ).filter_by(project_id=project_id).all()
+
+    return {'owner_id': project.owner_id, 'levels': dict(rows)}, project
+
+
+def get_project_acl(project_id):
+    """Obter a ACL do projeto (memo da requisição -> cache -> banco)"""
+    memo = _request_memo()
+    if project_id in memo:
+        return memo[project_id][0]
+
+    acl = cache.get(_acl_cache_key(project_id))
+    project = None
+    if acl is None:
+        acl, project = _load_acl(project_id)
+        cache.set(
+            _acl_cache_key(project_id),
+            acl,
+            timeout=current_app.config.get('PERMISSION_CACHE_TIMEOUT', 300)
+        )
+
+    memo[project_id] = (acl, project)
+    return acl
+
+
+def get_permission_level(user_id, project_id):
+    """Nível efetivo do usuário no projeto, ou None se não tiver acesso"""
+    acl = get_project_acl(project_id)
+    if acl['owner_id'] is None:
+        return None
+
+    # Owner sempre tem permissão total
+    if acl['owner_id'] == user_id:
+        return 'owner'
+
+    return acl['levels'].get(user_id)
+
+
+def has_project_permission(user_id, project_id, required_level='viewer'):
+    """Verifica se o usuário tem permissão no projeto"""
+    level = get_permission_level(user_id, project_id)
+    if not level:
+        return False
+
+    return PERMISSION_LEVELS.get(level, 0) >= PERMISSION_LEVELS.get(required_level, 0)
+
+
+def get_authorized_project(user_id, project_id, required_level='viewer'):
+    """
+    Verificar permissão e devolver o projeto
+
+    Reaproveita o Project carregado na resolução da ACL, quando houver, para
+    que o handler não busque a mesma linha de novo.
+
+    Returns:
+        Project, ou None se o usuário não tiver o nível exigido
+    """
+    if not has_project_permission(user_id, project_id, required_level):
+        return None
+
+    project = _request_memo()[project_id][1]
+    if project is None:
+        project = db.session.get(Project, project_id)
+        _request_memo()[project_id] = (get_project_acl(project_id), project)
+
+    return project
+
+
+def filter_accessible_projects(query, user_id):
+    """
+    Restringir uma query sobre Project aos projetos acessíveis ao usuário
+
+    Faz um único LEFT JOIN com a permissão do próprio usuário; a
+    UniqueConstraint (project_id, user_id) garante no máximo uma linha por
+    projeto, então não é preciso deduplicar. Colunas de ProjectPermission
+    podem ser usadas na query (nulas quando o acesso vem do owner_id).
+    """
+    return query.outerjoin(
+        ProjectPermission,
+        and_(
+            ProjectPermission.project_id == Project.id,
+            ProjectPermission.user_id == user_id
+        )
+    ).filter(
+        or_(Project.owner_id == user_id, ProjectPermission.id.isnot(None))
+    )
+
+
+def invalidate_project_acl(project_id):
+    """Descartar a ACL do projeto do cache e do memo da requisição"""
+    if not has_app_context():
+        return
+    cache.delete(_acl_cache_key(project_id))
+    _request_memo().pop(project_id, None)
+
+
+# =============================================================================
+# INVALIDAÇÃO
+# =============================================================================
+
+def _mark_acl_dirty(target, project_id):
+    session = object_session(target)
+    if session is not None and project_id is not None:
+        session.info.setdefault('dirty_project_acls', set()).add(project_id)
+
+
+@event.listens_for(ProjectPermission, 'after_insert')
+@event.listens_for(ProjectPermission, 'after_update')
+@event.listens_for(ProjectPermission, 'after_delete')
+def _permission_changed(mapper, connection, target):
+    _mark_acl_dirty(target, target.project_id)
+
+
+@event.listens_for(Project, 'after_insert')
+@event.listens_for(Project, 'after_delete')
+def _project_created_or_deleted(mapper, connection, target):
+    _mark_acl_dirty(target, target.id)
+
+
+@event.listens_for(Project, 'after_update')
+def _project_updated(mapper, connection, target):
+    if db.inspect(target).attrs.owner_id.history.has_changes():
+        _mark_acl_dirty(target, target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    for project_id in session.info.pop('dirty_project_acls', ()):
+        invalidate_project_acl(project_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('dirty_project_acls', None)
@@ -0,0 +1,193 @@
+"""
+Criação de projetos em lote
+
+Valida todos os itens antes de tocar no banco e insere projetos, etapas
+padrão e permissões de owner com INSERTs multi-linha, uma transação por
+lote (chunk). Itens inválidos são reportados individualmente sem abortar
+os demais.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from src.extensions import db
+from src.models.database import Project, ProjectStep, ProjectPermission
+from src.services.permissions import invalidate_project_acl
+from src.services.project_summary import invalidate_project_summary
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ['name', 'client', 'responsible', 'objective']
+MAX_INTEGER = 2 ** 31 - 1  # coluna INTEGER
+
+
+def _string_field(data: Dict[str, Any], field: str) -> Optional[str]:
+    """Texto dentro do tamanho da coluna (o banco recusaria o lote inteiro)"""
+    value = data.get(field)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Campo {field} deve ser texto")
+    length = Project.__table__.c[field].type.length
+    if length and len(value) > length:
+        raise ValueError(f"Campo {field} deve ter no máximo {length} caracteres")
+    return value
+
+
+def _choice_field(data: Dict[str, Any], field: str, default: str, choices: List[str]) -> str:
+    value = data.get(field, default)
+    if not isinstance(value, str) or value.lower().strip() not in choices:
+        raise ValueError(f"Campo {field} deve ser um dos: {', '.join(choices)}")
+    return value.lower().strip()
+
+
+def _int_field(data: Dict[str, Any], field: str) -> int:
+    value = data[field]
+    # bool é subclasse de int, mas não é um número de horas
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Campo {field} deve ser um número inteiro")
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"Campo {field} deve ser um número inteiro")
+    if not 0 <= value <= MAX_INTEGER:
+        raise ValueError(f"Campo {field} deve estar entre 0 e {MAX_INTEGER}")
+    return value
+
+
+def validate_project_payload(data: Any) -> Dict[str, Any]:
+    """
+    Validar um item de importação sem acessar o banco
+
+    Returns:
+        Dict com as colunas do projeto
+
+    Raises:
+        ValueError: Se o item for inválido
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Item deve ser um objeto")
+
+    for field in REQUIRED_FIELDS:
+        if not data.get(field):
+            raise ValueError(f"Campo {field} é obrigatório")
+
+    values = {field: _string_field(data, field) for field in REQUIRED_FIELDS}
+    values['description'] = _string_field(data, 'description') or ''
+    values['priority'] = _choice_field(data, 'priority', 'medium', Project.VALID_PRIORITIES)
+    values['status'] = _choice_field(data, 'status', 'active', Project.VALID_STATUSES)
+    if data.get('github_repo_url') is not None:
+        values['github_repo_url'] = _string_field(data, 'github_repo_url')
+    if data.get('estimated_hours') is not None:
+        values['estimated_hours'] = _int_field(data, 'estimated_hours')
+
+    # Mesmas regras do listener before_insert, aplicadas a um objeto transiente
+    Project(**values).validate()
+    return values
+
+
+def bulk_create_projects(items: List[Any], owner_id: int, chunk_size: int = 200) -> Dict[str, Any]:
+    """
+    Criar projetos em lote para um owner
+
+    Args:
+        items: Lista de payloads (mesmos campos de POST /api/projects)
+        owner_id: Usuário dono dos projetos criados
+        chunk_size: Itens por transação
+
+    Returns:
+        Dict com 'created' (index, id) e 'errors' (index, error)
+    """
+    created = []
+    errors = []
+
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, validate_project_payload(item)))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        try:
+            project_ids = _insert_chunk([values for _, values in chunk], owner_id)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Erro ao inserir lote de projetos: {e}")
+            errors.extend({'index': index, 'error': 'Erro ao gravar no banco'} for index, _ in chunk)
+            continue
+
+        for (index, _), project_id in zip(chunk, project_ids):
+            invalidate_project_acl(project_id)
+            created.append({'index': index, 'id': project_id})
+
+    if created:
+        invalidate_project_summary(owner_id)
+
+    errors.sort(key=lambda error: error['index'])
+    return {'created': created, 'errors': errors}
+
+
+def _insert_chunk(rows: List[Dict[str, Any]], owner_id: int) -> List[int]:
+    """Inserir projetos, etapas padrão e permissões de um lote; retorna os ids em ordem"""
+    now = datetime.utcnow()
+    default_steps = ProjectStep.DEFAULT_STEPS
+
+    project_rows = [
+        dict(
+            values,
+            owner_id=owner_id,
+            created_by=owner_id,
+            current_step=0,
+            completion_percentage=0,
+            total_steps=len(default_steps),
+            completed_steps=0,
+            created_at=now,
+            updated_at=now
+        )
+        for values in rows
+    ]
+    # No PostgreSQL o RETURNING é ordenado pelos parâmetros sem perder o
+    # INSERT multi-linha. O SQLite não tem sentinel para isso (cairia para uma
+    # linha por INSERT), mas com escritor único os rowids de um mesmo INSERT
+    # são atribuídos em ordem crescente.
+    if db.session.get_bind().dialect.name == 'sqlite':
+        project_ids = sorted(db.session.scalars(insert(Project).returning(Project.id), project_rows))
+    else:
+        project_ids = list(db.session.scalars(
+            insert(Project).returning(Project.id, sort_by_parameter_order=True),
+            project_rows
+        ))
+
+    db.session.execute(insert(ProjectStep), [
+        {
+            'project_id': project_id,
+            'step_number': step['step_number'],
+            'step_name': step['step_name'],
+            'description': step['description'],
+            'status': 'pending',
+            'created_at': now,
+            'updated_at': now
+        }
+        for project_id in project_ids
+        for step in default_steps
+    ])
+
+    db.session.execute(insert(ProjectPermission), [
+        {
+            'project_id': project_id,
+            'user_id': owner_id,
+            'permission_level': 'owner',
+            'granted_by': owner_id,
+            'created_at': now,
+            'updated_at': now
+        }
+        for project_id in project_ids
+    ])
+
+    return project_ids
@@ -0,0 +1,135 @@
+"""
+Resumo do portfólio de projetos por usuário
+
+Os agregados (por status, por prioridade, atrasados, média de conclusão)
+são calculados com um único SELECT agrupado e guardados no cache por
+usuário. Após o commit de qualquer escrita em projetos ou permissões, os
+resumos dos usuários com acesso ao projeto são descartados.
+"""
+
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import case, event, func, select
+from sqlalchemy.orm import Session, object_session
+
+from src.extensions import db, cache
+from src.models.database import Project, ProjectPermission
+from src.services.permissions import filter_accessible_projects
+
+SUMMARY_CACHE_PREFIX = 'project_summary'
+
+
+def _summary_cache_key(user_id):
+    return f"{SUMMARY_CACHE_PREFIX}:{user_id}"
+
+
+def compute_project_summary(user_id):
+    """Calcular o resumo no banco (uma consulta agrupada por status/prioridade)"""
+    overdue = case((Project.is_overdue, 1), else_=0)
+
+    query = filter_accessible_projects(
+        db.session.query(
+            Project.status,
+            Project.priority,
+            func.count(Project.id),
+            func.coalesce(func.sum(Project.completion_percentage), 0),
+            func.coalesce(func.sum(overdue), 0)
+        ),
+        user_id
+    ).group_by(Project.status, Project.priority)
+
+    summary = {
+        'total': 0,
+        'by_status': {status: 0 for status in Project.VALID_STATUSES},
+        'by_priority': {priority: 0 for priority in Project.VALID_PRIORITIES},
+        'overdue': 0,
+        'average_completion': 0,
+        'generated_at': datetime.utcnow().isoformat()
+    }
+
+    completion_sum = 0
+    for status, priority, count, completion, overdue_count in query.all():
+        summary['total'] += count
+        summary['by_status'][status] = summary['by_status'].get(status, 0) + count
+        summary['by_priority'][priority] = summary['by_priority'].get(priority, 0) + count
+        summary['overdue'] += int(overdue_count)
+        completion_sum += int(completion)
+
+    if summary['total']:
+        summary['average_completion'] = round(completion_sum / summary['total'], 2)
+
+    return summary
+
+
+def get_project_summary(user_id):
+    """Resumo do portfólio do usuário, servido do cache quando disponível"""
+    key = _summary_cache_key(user_id)
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_project_summary(user_id)
+        cache.set(key, summary, timeout=current_app.config.get('PROJECT_SUMMARY_CACHE_TIMEOUT', 300))
+    return summary
+
+
+def invalidate_project_summary(*user_ids):
+    """Descartar os resumos em cache dos usuários informados"""
+    if not has_app_context():
+        return
+    for user_id in user_ids:
+        cache.delete(_summary_cache_key(user_id))
+
+
+# =============================================================================
+# INVALIDAÇÃO
+# =============================================================================
+
+def _mark_summary_dirty(target, *user_ids):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('dirty_project_summaries', set()).update(
+            user_id for user_id in user_ids if user_id is not None
+        )
+
+
+def _project_member_ids(connection, project_id):
+    return connection.execute(
+        select(ProjectPermission.user_id).where(ProjectPermission.project_id == project_id)
+    ).scalars().all()
+
+
+@event.listens_for(Project, 'after_insert')
+@event.listens_for(Project, 'after_delete')
+def _project_created_or_deleted(mapper, connection, target):
+    # Na remoção, as permissões apagadas em cascata marcam os demais usuários
+    _mark_summary_dirty(target, target.owner_id)
+
+
+@event.listens_for(Project, 'after_update')
+def _project_updated(mapper, connection, target):
+    previous_owners = db.inspect(target).attrs.owner_id.history.deleted or ()
+    _mark_summary_dirty(
+        target,
+        target.owner_id,
+        *previous_owners,
+        *_project_member_ids(connection, target.id)
+    )
+
+
+@event.listens_for(ProjectPermission, 'after_insert')
+@event.listens_for(ProjectPermission, 'after_update')
+@event.listens_for(ProjectPermission, 'after_delete')
+def _permission_changed(mapper, connection, target):
+    _mark_summary_dirty(target, target.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    user_ids = session.info.pop('dirty_project_summaries', None)
+    if user_ids:
+        invalidate_project_summary(*user_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('dirty_project_summaries', None)
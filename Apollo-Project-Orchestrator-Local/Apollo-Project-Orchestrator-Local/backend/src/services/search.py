@@ -0,0 +1,143 @@
+"""
+Busca textual em projetos
+
+Indexa name, client, objective e description:
+
+- SQLite: tabela virtual FTS5 de conteúdo externo (``projects_fts``),
+  mantida por triggers em ``projects``;
+- PostgreSQL: coluna gerada ``search_vector`` (tsvector) com índice GIN.
+
+O índice é criado junto com a tabela ``projects`` (``db.create_all``) e
+pode ser instalado/reconstruído em bancos existentes com
+``flask init-search-index``.
+"""
+
+import re
+
+from sqlalchemy import DDL, Float, Integer, case, event, func, literal_column, text
+
+from src.extensions import db
+from src.models.database import Project, ProjectPermission
+from src.services.permissions import filter_accessible_projects
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+        name, client, objective, description,
+        content='projects', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, name, client, objective, description)
+        VALUES (new.id, new.name, new.client, new.objective, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, client, objective, description)
+        VALUES ('delete', old.id, old.name, old.client, old.objective, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_au
+    AFTER UPDATE OF name, client, objective, description ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, client, objective, description)
+        VALUES ('delete', old.id, old.name, old.client, old.objective, old.description);
+        INSERT INTO projects_fts(rowid, name, client, objective, description)
+        VALUES (new.id, new.name, new.client, new.objective, new.description);
+    END
+    """,
+]
+
+SQLITE_REBUILD = "INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')"
+
+POSTGRES_SEARCH_DDL = [
+    """
+    ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('portuguese', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('portuguese', coalesce(client, '')), 'B') ||
+        setweight(to_tsvector('portuguese', coalesce(objective, '')), 'C') ||
+        setweight(to_tsvector('portuguese', coalesce(description, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_project_search ON projects USING GIN (search_vector)",
+]
+
+SEARCH_DDL = {
+    'sqlite': SQLITE_SEARCH_DDL,
+    'postgresql': POSTGRES_SEARCH_DDL,
+}
+
+
+def _install_on_create(target, connection, **kw):
+    for statement in SEARCH_DDL.get(connection.dialect.name, []):
+        connection.execute(DDL(statement))
+
+
+event.listen(Project.__table__, 'after_create', _install_on_create)
+
+
+def install_search_index(rebuild=True):
+    """
+    Instalar o índice de busca no banco atual (idempotente)
+
+    Args:
+        rebuild: No SQLite, reindexar os projetos já existentes
+    """
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    for statement in SEARCH_DDL.get(dialect, []):
+        connection.execute(DDL(statement))
+    if dialect == 'sqlite' and rebuild:
+        connection.execute(text(SQLITE_REBUILD))
+    return dialect in SEARCH_DDL
+
+
+def _fts5_query(terms):
+    """Transformar a busca do usuário em uma query FTS5 segura (prefixo, AND implícito)"""
+    words = re.findall(r'\w+', terms, flags=re.UNICODE)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_projects(user_id, terms, limit=20, offset=0):
+    """
+    Buscar projetos acessíveis ao usuário, ordenados por relevância
+
+    Returns:
+        Lista de (Project, permission_level, rank), com até ``limit + 1``
+        itens para o chamador saber se há mais páginas
+    """
+    permission_level = case(
+        (Project.owner_id == user_id, 'owner'),
+        else_=func.coalesce(ProjectPermission.permission_level, 'viewer')
+    ).label('permission_level')
+
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        ts_query = func.websearch_to_tsquery('portuguese', terms)
+        search_vector = literal_column('projects.search_vector')
+        rank = func.ts_rank(search_vector, ts_query).label('rank')
+        query = db.session.query(Project, permission_level, rank).filter(
+            search_vector.op('@@')(ts_query)
+        )
+    else:
+        match = _fts5_query(terms)
+        if not match:
+            return []
+        # Pesos por campo: name > client > objective > description
+        matches = text(
+            "SELECT rowid AS id, bm25(projects_fts, 10.0, 5.0, 2.0, 1.0) AS rank "
+            "FROM projects_fts WHERE projects_fts MATCH :match"
+        ).bindparams(match=match).columns(id=Integer, rank=Float).subquery('fts')
+        # bm25: menor é mais relevante; inverter para manter "maior é melhor"
+        rank = (-matches.c.rank).label('rank')
+        query = db.session.query(Project, permission_level, rank).join(
+            matches, matches.c.id == Project.id
+        )
+
+    query = filter_accessible_projects(query, user_id)
+    return query.order_by(rank.desc(), Project.id.desc()).offset(offset).limit(limit + 1).all()
@@ -0,0 +1,272 @@
+"""
+Registro de sessões de login
+
+Cada login/cadastro abre uma sessão (``UserSession``) identificada pela
+família de refresh token: o id vai como claim ``sid`` no access e no refresh
+token, e os access tokens emitidos por /refresh herdam o mesmo ``sid``.
+
+- Listar e revogar sessões são operações indexadas por usuário
+  (idx_session_user_revoked), independentes do tamanho de audit_logs.
+- O estado revogado de cada sessão e a geração de tokens do usuário ficam
+  no cache (extensão ``cache``) por SESSION_CACHE_TIMEOUT segundos quando o
+  cache é compartilhado (Redis), para que a checagem por requisição não vá
+  ao banco. Com o cache local do processo ('simple'), a invalidação não
+  alcança os outros workers: a validade cai para
+  SESSION_LOCAL_CACHE_TIMEOUT segundos (0 lê sempre do banco).
+- ``last_seen_at`` é acumulado em memória e gravado em lote a cada
+  SESSION_ACTIVITY_FLUSH_INTERVAL segundos (um UPDATE executemany).
+- Todo token leva também a geração do usuário (claim ``gen``, coluna
+  ``users.token_generation``). Revogar todas as sessões, desativar o usuário
+  ou trocar a senha incrementa a geração, invalidando de uma vez todos os
+  tokens já emitidos, sem guardar nada por token.
+"""
+
+import atexit
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from flask import current_app, g, has_request_context
+from sqlalchemy import bindparam, event, select, update
+from sqlalchemy.orm import Session, object_session
+
+from src.extensions import db, cache, is_cache_shared
+from src.models.database import User, UserSession
+from src.utils.helpers import get_client_info
+
+logger = logging.getLogger(__name__)
+
+SESSION_CACHE_PREFIX = 'user_session_revoked'
+TOKEN_GENERATION_CACHE_PREFIX = 'user_token_generation'
+
+
+def _session_cache_key(session_id):
+    return f"{SESSION_CACHE_PREFIX}:{session_id}"
+
+
+def _generation_cache_key(user_id):
+    return f"{TOKEN_GENERATION_CACHE_PREFIX}:{user_id}"
+
+
+def _cache_timeout():
+    if is_cache_shared():
+        return current_app.config.get('SESSION_CACHE_TIMEOUT', 300)
+    return current_app.config.get('SESSION_LOCAL_CACHE_TIMEOUT', 2)
+
+
+def _cache_set(key, value):
+    # timeout 0 no Flask-Caching significa "sem expiração": não gravar
+    timeout = _cache_timeout()
+    if timeout:
+        cache.set(key, value, timeout=timeout)
+
+
+def _cache_revoked(session_id, revoked):
+    _cache_set(_session_cache_key(session_id), revoked)
+
+
+def token_claims(user, session_id=None):
+    """Claims adicionais para create_access_token/create_refresh_token"""
+    claims = {'gen': user.token_generation or 0}
+    if session_id:
+        claims['sid'] = session_id
+    return claims
+
+
+# =============================================================================
+# CICLO DE VIDA
+# =============================================================================
+
+def start_session(user):
+    """
+    Abrir uma sessão para o usuário (adicionada à sessão do banco; o chamador commita)
+
+    Returns:
+        Claims adicionais para create_access_token/create_refresh_token
+    """
+    client_info = get_client_info() if has_request_context() else {}
+    now = datetime.utcnow()
+    session = UserSession(
+        id=uuid.uuid4().hex,
+        user_id=user.id,
+        created_at=now,
+        last_seen_at=now,
+        ip_address=client_info.get('ip_address'),
+        user_agent=(client_info.get('user_agent') or '')[:255] or None
+    )
+    db.session.add(session)
+    return token_claims(user, session.id)
+
+
+def is_session_revoked(session_id):
+    """Verificar se a sessão foi revogada (cache -> banco)"""
+    revoked = cache.get(_session_cache_key(session_id))
+    if revoked is None:
+        revoked_at = db.session.query(UserSession.revoked_at).filter_by(id=session_id).scalar()
+        revoked = revoked_at is not None
+        _cache_revoked(session_id, revoked)
+    return revoked
+
+
+def get_active_session(user_id, session_id):
+    """Sessão ativa do usuário, ou None"""
+    session = db.session.get(UserSession, session_id)
+    if session is None or session.user_id != user_id or not session.is_active:
+        return None
+    return session
+
+
+def list_sessions(user_id):
+    """Sessões ativas do usuário, da mais recente para a mais antiga"""
+    refresh_expires = current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+    sessions = UserSession.query.filter(
+        UserSession.user_id == user_id,
+        UserSession.revoked_at.is_(None),
+        UserSession.created_at >= datetime.utcnow() - refresh_expires
+    ).all()
+
+    # Atividade ainda não gravada
+    for session in sessions:
+        pending = session_activity.pending(session.id)
+        if pending and pending > session.last_seen_at:
+            db.session.expunge(session)
+            session.last_seen_at = pending
+
+    return sorted(sessions, key=lambda session: session.last_seen_at, reverse=True)
+
+
+def revoke_session(user_id, session_id):
+    """Revogar uma sessão do usuário; retorna se havia sessão ativa"""
+    result = db.session.execute(
+        update(UserSession).where(
+            UserSession.id == session_id,
+            UserSession.user_id == user_id,
+            UserSession.revoked_at.is_(None)
+        ).values(revoked_at=datetime.utcnow())
+    )
+    db.session.commit()
+    _cache_revoked(session_id, True)
+    return result.rowcount > 0
+
+
+def revoke_user_sessions(user_id):
+    """Revogar todas as sessões ativas do usuário; retorna quantas"""
+    session_ids = db.session.scalars(select(UserSession.id).where(
+        UserSession.user_id == user_id,
+        UserSession.revoked_at.is_(None)
+    )).all()
+    if session_ids:
+        db.session.execute(
+            update(UserSession).where(UserSession.id.in_(session_ids)).values(revoked_at=datetime.utcnow())
+        )
+    db.session.commit()
+    for session_id in session_ids:
+        _cache_revoked(session_id, True)
+    return len(session_ids)
+
+
+def purge_sessions(older_than=None):
+    """Remover sessões revogadas ou além da validade do refresh token"""
+    cutoff = datetime.utcnow() - (older_than or current_app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+    return UserSession.query.filter(
+        (UserSession.last_seen_at < cutoff) | (UserSession.revoked_at < cutoff)
+    ).delete(synchronize_session=False)
+
+
+# =============================================================================
+# GERAÇÃO DE TOKENS
+# =============================================================================
+
+def get_token_generation(user_id):
+    """Geração atual dos tokens do usuário (cache -> banco); None se o usuário não existe"""
+    key = _generation_cache_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = db.session.query(User.token_generation).filter_by(id=user_id).scalar()
+        if generation is not None:
+            _cache_set(key, generation)
+    return generation
+
+
+def is_token_generation_revoked(user_id, generation):
+    """Token de geração anterior à atual (tokens sem claim contam como geração 0)"""
+    current = get_token_generation(user_id)
+    return current is None or (generation or 0) < current
+
+
+def bump_token_generation(user):
+    """Invalidar todos os tokens já emitidos para o usuário (o chamador commita)"""
+    user.token_generation = User.token_generation + 1
+    (object_session(user) or db.session).info.setdefault('dirty_token_generations', set()).add(user.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop('dirty_token_generations', ()):
+        cache.delete(_generation_cache_key(user_id))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('dirty_token_generations', None)
+
+
+# =============================================================================
+# ATIVIDADE (last_seen_at)
+# =============================================================================
+
+class SessionActivityBuffer:
+    """Acumula o último acesso por sessão e grava em lote"""
+
+    def __init__(self):
+        self.app = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config.get('SESSION_ACTIVITY_FLUSH_INTERVAL', 60)
+        atexit.register(self.flush)
+
+    def touch(self, session_id, seen_at=None):
+        with self._lock:
+            self._pending[session_id] = seen_at or datetime.utcnow()
+
+    def pending(self, session_id):
+        return self._pending.get(session_id)
+
+    def record_request(self):
+        """Registrar a atividade da requisição autenticada atual (after_request)"""
+        decoded = g.get('_jwt_extended_jwt')
+        if decoded and decoded.get('sid'):
+            self.touch(decoded['sid'])
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Gravar os acessos acumulados (um UPDATE executemany)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending or self.app is None:
+            return
+
+        table = UserSession.__table__
+        statement = update(table).where(
+            table.c.id == bindparam('b_id'),
+            table.c.last_seen_at < bindparam('b_seen')
+        ).values(last_seen_at=bindparam('b_seen'))
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(statement, [
+                        {'b_id': session_id, 'b_seen': seen_at} for session_id, seen_at in pending.items()
+                    ])
+        except Exception as e:
+            logger.error(f"Erro ao gravar atividade de {len(pending)} sessões: {e}")
+
+
+session_activity = SessionActivityBuffer()
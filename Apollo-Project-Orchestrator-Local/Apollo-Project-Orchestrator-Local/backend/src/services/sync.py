@@ -0,0 +1,281 @@
+"""
+Sincronização incremental de projetos (delta-sync)
+
+O cliente mantém uma réplica local e pede apenas o que mudou desde o último
+cursor. O cursor guarda, para cada coleção (projetos, etapas, permissões e
+remoções), a posição keyset (updated_at, id) já entregue; cada coleção é lida
+por um índice (updated_at, id).
+
+Remoções e revogações de acesso viram tombstones (``SyncTombstone``),
+gravados na mesma transação por listeners de mapper.
+
+Só são entregues linhas com updated_at até ``agora - SYNC_VISIBILITY_LAG_SECONDS``
+(o horizonte): timestamps são atribuídos no flush, antes do commit, então uma
+transação em andamento ainda pode gravar linhas um pouco "no passado". O
+horizonte evita que o cursor passe por elas. As entregas são idempotentes
+(upsert por id no cliente), então reenviar linhas no limite do horizonte é
+inofensivo.
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from flask import current_app
+from sqlalchemy import and_, or_, case, event, func, insert, select
+
+from src.extensions import db
+from src.models.database import Project, ProjectPermission, ProjectStep, SyncTombstone
+from src.services.permissions import filter_accessible_projects
+
+SYNC_COLLECTIONS = ('projects', 'steps', 'permissions', 'deleted')
+
+
+class SyncCursorExpired(ValueError):
+    """Cursor anterior à retenção de tombstones; o cliente deve recarregar tudo"""
+
+
+# =============================================================================
+# CURSOR
+# =============================================================================
+
+def encode_sync_cursor(positions):
+    """Codificar as posições {coleção: (updated_at, id)} em um token opaco"""
+    raw = json.dumps({
+        name: [updated_at.isoformat(), row_id]
+        for name, (updated_at, row_id) in positions.items()
+    })
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_sync_cursor(cursor):
+    """Decodificar o token de sincronização; ValueError se inválido"""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {
+            name: (datetime.fromisoformat(raw[name][0]), int(raw[name][1]))
+            for name in SYNC_COLLECTIONS
+        }
+    except Exception:
+        raise ValueError('Cursor inválido')
+
+
+def _after_position(query, updated_at_column, id_column, position):
+    if position is None:
+        return query
+    updated_at, row_id = position
+    return query.filter(or_(
+        updated_at_column > updated_at,
+        and_(updated_at_column == updated_at, id_column > row_id)
+    ))
+
+
+def _read_page(query, updated_at_column, id_column, position, horizon, limit):
+    """
+    Ler uma página keyset de uma coleção até o horizonte
+
+    Returns:
+        (linhas, próxima posição, truncada)
+    """
+    query = _after_position(query, updated_at_column, id_column, position)
+    rows = query.filter(updated_at_column <= horizon).order_by(
+        updated_at_column, id_column
+    ).limit(limit + 1).all()
+
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        return rows[:limit], (getattr(last, updated_at_column.key), getattr(last, id_column.key)), True
+
+    # Coleção esgotada: avançar até o horizonte
+    return rows, (horizon, 0), False
+
+
+# =============================================================================
+# CONSULTA DE MUDANÇAS
+# =============================================================================
+
+def get_changes(user_id, positions=None, limit=500):
+    """
+    Mudanças visíveis ao usuário após o cursor
+
+    Args:
+        user_id: Usuário autenticado
+        positions: Cursor decodificado, ou None para a carga inicial
+        limit: Máximo de linhas por coleção nesta página
+
+    Returns:
+        Dict com projects, steps, permissions, deleted, next_cursor e has_more
+
+    Raises:
+        SyncCursorExpired: Se o cursor for anterior à retenção de tombstones
+    """
+    now = datetime.utcnow()
+    horizon = now - timedelta(seconds=current_app.config.get('SYNC_VISIBILITY_LAG_SECONDS', 2))
+    retention = timedelta(days=current_app.config.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+    if positions is None:
+        # Carga inicial: não há réplica para remover nada
+        positions = dict.fromkeys(SYNC_COLLECTIONS)
+        positions['deleted'] = (horizon, 0)
+    elif positions['deleted'][0] < now - retention:
+        raise SyncCursorExpired('Cursor expirado; recarregue os projetos')
+
+    accessible = filter_accessible_projects(db.session.query(Project.id), user_id).subquery()
+    accessible_ids = select(accessible.c.id)
+
+    permission_level = case(
+        (Project.owner_id == user_id, 'owner'),
+        else_=func.coalesce(ProjectPermission.permission_level, 'viewer')
+    ).label('permission_level')
+    projects_query = filter_accessible_projects(db.session.query(Project, permission_level), user_id)
+
+    next_positions = {}
+    has_more = False
+
+    # Projetos
+    rows = _after_position(projects_query, Project.updated_at, Project.id, positions['projects']).filter(
+        Project.updated_at <= horizon
+    ).order_by(Project.updated_at, Project.id).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_positions['projects'] = (rows[-1][0].updated_at, rows[-1][0].id)
+        has_more = True
+    else:
+        next_positions['projects'] = (horizon, 0)
+    projects = {project.id: (project, level) for project, level in rows}
+
+    # Permissões (de todos os membros dos projetos acessíveis)
+    permissions, next_positions['permissions'], truncated = _read_page(
+        ProjectPermission.query.filter(ProjectPermission.project_id.in_(accessible_ids)),
+        ProjectPermission.updated_at, ProjectPermission.id,
+        positions['permissions'], horizon, limit
+    )
+    has_more = has_more or truncated
+
+    # Acesso recém-concedido: o projeto pode não ter mudado, então entra inteiro
+    granted_ids = {
+        permission.project_id for permission in permissions
+        if permission.user_id == user_id and permission.project_id not in projects
+    }
+    if positions['permissions'] is not None and granted_ids:
+        for project, level in projects_query.filter(Project.id.in_(granted_ids)).all():
+            projects[project.id] = (project, level)
+        permissions = {permission.id: permission for permission in permissions}
+        for permission in ProjectPermission.query.filter(ProjectPermission.project_id.in_(granted_ids)).all():
+            permissions[permission.id] = permission
+        permissions = list(permissions.values())
+    else:
+        granted_ids = set()
+
+    # Etapas: can_start depende das irmãs, então os projetos afetados vão completos
+    changed_steps, next_positions['steps'], truncated = _read_page(
+        db.session.query(ProjectStep.id, ProjectStep.project_id, ProjectStep.updated_at).filter(
+            ProjectStep.project_id.in_(accessible_ids)
+        ),
+        ProjectStep.updated_at, ProjectStep.id,
+        positions['steps'], horizon, limit
+    )
+    has_more = has_more or truncated
+
+    steps_data = []
+    step_project_ids = {step.project_id for step in changed_steps} | granted_ids
+    if step_project_ids:
+        steps = ProjectStep.query.filter(ProjectStep.project_id.in_(step_project_ids)).order_by(
+            ProjectStep.project_id, ProjectStep.step_number
+        ).all()
+        for _, project_steps in groupby(steps, key=lambda step: step.project_id):
+            steps_data.extend(ProjectStep.serialize_many(list(project_steps)))
+
+    # Remoções: projeto (por usuário, se ele não tiver mais acesso) e
+    # etapas/permissões de projetos ainda acessíveis
+    tombstones, next_positions['deleted'], truncated = _read_page(
+        SyncTombstone.query.filter(or_(
+            and_(
+                SyncTombstone.entity_type == 'project',
+                SyncTombstone.user_id == user_id,
+                SyncTombstone.entity_id.not_in(accessible_ids)
+            ),
+            and_(
+                SyncTombstone.entity_type != 'project',
+                SyncTombstone.project_id.in_(accessible_ids)
+            )
+        )),
+        SyncTombstone.created_at, SyncTombstone.id,
+        positions['deleted'], horizon, limit
+    )
+    has_more = has_more or truncated
+
+    projects_data = []
+    for project, level in projects.values():
+        project_dict = project.to_dict()
+        project_dict['permission_level'] = level
+        projects_data.append(project_dict)
+
+    return {
+        'projects': projects_data,
+        'steps': steps_data,
+        'permissions': [permission.to_dict() for permission in permissions],
+        # Owner com linha de permissão recebe dois tombstones do mesmo projeto
+        'deleted': list({
+            (tombstone.entity_type, tombstone.entity_id): tombstone.to_dict()
+            for tombstone in tombstones
+        }.values()),
+        'next_cursor': encode_sync_cursor(next_positions),
+        'has_more': has_more
+    }
+
+
+def purge_sync_tombstones(older_than_days=None):
+    """Remover tombstones além da retenção; retorna quantos foram removidos"""
+    if older_than_days is None:
+        older_than_days = current_app.config.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    return SyncTombstone.query.filter(SyncTombstone.created_at < cutoff).delete(synchronize_session=False)
+
+
+# =============================================================================
+# TOMBSTONES
+# =============================================================================
+
+def _record_tombstones(connection, *rows):
+    now = datetime.utcnow()
+    connection.execute(insert(SyncTombstone.__table__), [
+        {
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'project_id': project_id,
+            'user_id': user_id,
+            'created_at': now
+        }
+        for entity_type, entity_id, project_id, user_id in rows
+    ])
+
+
+@event.listens_for(Project, 'after_delete')
+def _project_deleted(mapper, connection, target):
+    # Membros recebem o tombstone pela remoção em cascata das permissões
+    _record_tombstones(connection, ('project', target.id, target.id, target.owner_id))
+
+
+@event.listens_for(Project, 'after_update')
+def _project_owner_changed(mapper, connection, target):
+    previous_owners = db.inspect(target).attrs.owner_id.history.deleted or ()
+    for owner_id in previous_owners:
+        if owner_id is not None:
+            _record_tombstones(connection, ('project', target.id, target.id, owner_id))
+
+
+@event.listens_for(ProjectStep, 'after_delete')
+def _step_deleted(mapper, connection, target):
+    _record_tombstones(connection, ('step', target.id, target.project_id, None))
+
+
+@event.listens_for(ProjectPermission, 'after_delete')
+def _permission_deleted(mapper, connection, target):
+    _record_tombstones(
+        connection,
+        ('permission', target.id, target.project_id, None),
+        # Acesso revogado (ignorado na leitura se o usuário ainda for owner)
+        ('project', target.project_id, target.project_id, target.user_id)
+    )
@@ -0,0 +1,181 @@
+"""
+Revogação de tokens compartilhada entre workers
+
+Substitui o ``set()`` local de jtis revogados por um armazenamento
+compartilhado (banco ou Redis, REVOCATION_STORE), em que cada entrada vale
+só até o ``exp`` do token.
+
+Cada processo mantém um espelho em memória (jti -> exp) das revogações ainda
+válidas e o atualiza de forma incremental a cada
+REVOCATION_SYNC_INTERVAL segundos, buscando só o que foi revogado depois da
+última sincronização. Assim ``check_if_token_revoked`` é uma consulta a um
+dict no caso comum (token não revogado); uma revogação feita em outro worker
+vale aqui em no máximo REVOCATION_SYNC_INTERVAL segundos, e as feitas neste
+processo valem na hora.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from src.extensions import db
+from src.models.database import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Revogações gravadas pouco antes da última leitura podem ainda não estar
+# visíveis (transação em andamento); cada sincronização relê essa margem
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class DatabaseRevocationStore:
+    """Revogações na tabela revoked_tokens (SQLite/PostgreSQL)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def revoke(self, jti, expires_at):
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                exists = connection.execute(
+                    select(RevokedToken.jti).where(RevokedToken.jti == jti)
+                ).first()
+                if not exists:
+                    connection.execute(RevokedToken.__table__.insert().values(
+                        jti=jti, expires_at=expires_at, revoked_at=datetime.utcnow()
+                    ))
+
+    def revoked_since(self, since):
+        """Revogações ainda válidas gravadas depois de ``since``: [(jti, exp)]"""
+        now = datetime.utcnow()
+        with self.app.app_context():
+            with db.engine.connect() as connection:
+                query = select(RevokedToken.jti, RevokedToken.expires_at).where(
+                    RevokedToken.expires_at > now
+                )
+                if since is not None:
+                    query = query.where(RevokedToken.revoked_at > since)
+                return connection.execute(query).all()
+
+    def purge_expired(self):
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                return connection.execute(
+                    delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow())
+                ).rowcount
+
+
+class RedisRevocationStore:
+    """
+    Revogações no Redis
+
+    Cada jti é uma chave com EXPIREAT no exp do token; um sorted set
+    (score = momento da revogação) permite a sincronização incremental.
+    """
+
+    KEY_PREFIX = 'revoked_token:'
+    INDEX_KEY = 'revoked_tokens'
+
+    def __init__(self, app):
+        import redis
+
+        self.redis = redis.Redis.from_url(app.config['REVOCATION_REDIS_URL'])
+
+    def revoke(self, jti, expires_at):
+        pipeline = self.redis.pipeline()
+        pipeline.set(self.KEY_PREFIX + jti, int(expires_at.timestamp()), exat=int(expires_at.timestamp()) + 1)
+        pipeline.zadd(self.INDEX_KEY, {f"{jti}|{int(expires_at.timestamp())}": time.time()})
+        pipeline.execute()
+
+    def revoked_since(self, since):
+        now = time.time()
+        minimum = since.timestamp() if since is not None else '-inf'
+        entries = self.redis.zrangebyscore(self.INDEX_KEY, minimum, '+inf')
+        revoked = []
+        for entry in entries:
+            jti, expires = entry.decode().rsplit('|', 1)
+            if int(expires) > now:
+                revoked.append((jti, datetime.utcfromtimestamp(int(expires))))
+        return revoked
+
+    def purge_expired(self, max_token_lifetime=timedelta(days=30)):
+        # Chaves individuais expiram sozinhas; o índice é aparado pela idade
+        cutoff = time.time() - max_token_lifetime.total_seconds()
+        return self.redis.zremrangebyscore(self.INDEX_KEY, '-inf', cutoff)
+
+
+REVOCATION_BACKENDS = {
+    'database': DatabaseRevocationStore,
+    'redis': RedisRevocationStore,
+}
+
+
+# =============================================================================
+# ESPELHO LOCAL
+# =============================================================================
+
+class TokenRevocation:
+    """Fachada usada pelas rotas e pelo token_in_blocklist_loader"""
+
+    def __init__(self):
+        self.store = None
+        self._revoked = {}
+        self._lock = threading.Lock()
+        self._watermark = None
+        self._last_sync = 0.0
+
+    def init_app(self, app):
+        backend = app.config.get('REVOCATION_STORE', 'database')
+        if backend not in REVOCATION_BACKENDS:
+            raise ValueError(f"REVOCATION_STORE deve ser um dos: {', '.join(REVOCATION_BACKENDS)}")
+        self.store = REVOCATION_BACKENDS[backend](app)
+        self.sync_interval = app.config.get('REVOCATION_SYNC_INTERVAL', 2)
+        self._revoked = {}
+        self._watermark = None
+        self._last_sync = 0.0
+
+    def revoke(self, jwt_payload):
+        """Revogar o token (payload decodificado) até o seu exp"""
+        expires_at = datetime.utcfromtimestamp(jwt_payload['exp'])
+        self.store.revoke(jwt_payload['jti'], expires_at)
+        with self._lock:
+            self._revoked[jwt_payload['jti']] = expires_at
+
+    def is_revoked(self, jti):
+        """Consulta em memória; sincroniza com o armazenamento no máximo a cada intervalo"""
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+        return jti in self._revoked
+
+    def sync(self):
+        """Trazer revogações novas e descartar as expiradas"""
+        started = datetime.utcnow()
+        since = self._watermark - SYNC_OVERLAP if self._watermark is not None else None
+        try:
+            revoked = self.store.revoked_since(since)
+        except Exception as e:
+            # Mantém o espelho atual; nova tentativa no próximo intervalo
+            logger.error(f"Erro ao sincronizar tokens revogados: {e}")
+            self._last_sync = time.monotonic()
+            return
+
+        now = datetime.utcnow()
+        with self._lock:
+            self._revoked.update(revoked)
+            for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+                del self._revoked[jti]
+            self._watermark = started
+            self._last_sync = time.monotonic()
+
+    def purge_expired(self):
+        return self.store.purge_expired()
+
+
+token_revocation = TokenRevocation()
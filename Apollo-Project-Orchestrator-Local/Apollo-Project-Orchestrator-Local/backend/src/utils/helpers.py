@@ -0,0 +1,14 @@
+"""
+Funções auxiliares para o sistema
+"""
+from datetime import datetime
+from flask import request, current_app
+
+def get_client_info():
+    """Obter informações do cliente"""
+    return {
+        'ip_address': request.remote_addr,
+        'user_agent': request.headers.get('User-Agent', ''),
+        'forwarded_for': request.headers.get('X-Forwarded-For', ''),
+        'host': request.headers.get('Host', '')
+    }
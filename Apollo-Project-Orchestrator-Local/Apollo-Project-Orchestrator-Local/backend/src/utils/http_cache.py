@@ -0,0 +1,48 @@
+"""
+GET condicional (ETag / Last-Modified)
+
+Os handlers calculam os validadores com uma consulta barata, respondem 304
+antes de carregar/serializar o recurso quando o cliente já tem a versão
+atual e, caso contrário, anexam os validadores à resposta completa.
+"""
+
+import hashlib
+from datetime import datetime
+
+from flask import make_response, request
+
+
+def compute_etag(*parts):
+    """ETag forte a partir das versões do recurso (timestamps, ids, contagens)"""
+    raw = '|'.join(
+        part.isoformat() if isinstance(part, datetime) else str(part)
+        for part in parts
+    )
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def is_not_modified(etag, last_modified=None):
+    """Verificar If-None-Match (prioritário) ou If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag) or request.if_none_match.star_tag
+
+    if last_modified and request.if_modified_since:
+        # HTTP-date tem resolução de segundos
+        since = request.if_modified_since.replace(tzinfo=None)
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def set_validators(response, etag, last_modified=None):
+    """Anexar ETag/Last-Modified e exigir revalidação a cada uso"""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified_response(etag, last_modified=None):
+    """Resposta 304 sem corpo"""
+    return set_validators(make_response('', 304), etag, last_modified)
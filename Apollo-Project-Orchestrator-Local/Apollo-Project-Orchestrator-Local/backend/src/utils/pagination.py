@@ -0,0 +1,25 @@
+"""
+Cursores de paginação keyset
+
+O cursor é a posição (timestamp, id) do último item entregue, codificada em
+base64 para ser opaca ao cliente.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(timestamp, row_id):
+    """Codificar cursor de paginação (timestamp, id)"""
+    raw = json.dumps([timestamp.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decodificar cursor de paginação; ValueError se inválido"""
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError('Cursor inválido')
@@ -107,19 +107,29 @@ export const ApiService = {
     // console.log('Fetching projects with token:', token);
 
     try {
-      const response = await fetch(`${API_BASE_URL}/projects`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-        },
-      });
+      // A listagem é paginada: seguir next_cursor até a última página
+      const projects = [];
+      let cursor = null;
+
+      do {
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        const response = await fetch(`${API_BASE_URL}/projects${query}`, {
+          headers: {
+            'Authorization': `Bearer ${token}`,
+          },
+        });
 
-      const data = await response.json();
+        const data = await response.json();
 
-      if (!response.ok) {
-        return { error: data.message || 'Erro ao carregar projetos' };
-      }
+        if (!response.ok) {
+          return { error: data.message || 'Erro ao carregar projetos' };
+        }
+
+        projects.push(...data.projects);
+        cursor = data.next_cursor;
+      } while (cursor);
 
-      return { success: true, projects: data.projects };
+      return { success: true, projects };
     } catch (error) {
       console.error('Get projects error:', error);
       return { error: 'Erro de conexão com o servidor' };